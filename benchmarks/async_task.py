@@ -0,0 +1,112 @@
+# Compares the previous async_task implementation, that polled every task with
+# its own 50 ms QTimer, with the current one, that is based on done callbacks
+#
+# poetry run python -m benchmarks.async_task
+import asyncio
+import sys
+import time
+from typing import Callable, List
+
+import qasync
+from PyQt5.QtCore import QCoreApplication, QTimer
+
+from pyqt_rest_client import asyncio_integration
+
+TASKS_COUNT = 1000
+TASK_DURATION_SEC = 2.0
+
+wakeups = 0
+_release_exceptions_timers: List[QTimer] = []
+
+
+def polling_async_task(func) -> Callable:
+    def sync_wrapper_around_async_func(*args, **kwargs):
+        task = asyncio.create_task(func(*args, **kwargs))
+
+        release_exceptions_timer = QTimer()
+        _release_exceptions_timers.append(release_exceptions_timer)
+
+        def check_task_exceptions_if_it_is_done():
+            global wakeups
+            wakeups += 1
+
+            if task.done():
+                _release_exceptions_timers.remove(release_exceptions_timer)
+                release_exceptions_timer.stop()
+                release_exceptions_timer.deleteLater()
+
+                task.result()  # The release exceptions itself
+
+        release_exceptions_timer.timeout.connect(check_task_exceptions_if_it_is_done)
+        release_exceptions_timer.start(50)
+
+    return sync_wrapper_around_async_func
+
+
+def callback_async_task(func) -> Callable:
+    def count_wakeup(_):
+        global wakeups
+        wakeups += 1
+
+    def sync_wrapper_around_async_func(*args, **kwargs):
+        task = asyncio_integration.async_task(func)(*args, **kwargs)
+        task.add_done_callback(count_wakeup)
+
+    return sync_wrapper_around_async_func
+
+
+async def run(decorator: Callable) -> str:
+    global wakeups
+    wakeups = 0
+    done_count = 0
+    raised_at = 0.0
+    surfaced_at = 0.0
+
+    @decorator
+    async def task():
+        nonlocal done_count
+        await asyncio.sleep(TASK_DURATION_SEC)
+        done_count += 1
+
+    @decorator
+    async def failing_task():
+        nonlocal raised_at
+        await asyncio.sleep(TASK_DURATION_SEC / 2)
+        raised_at = time.perf_counter()
+        raise RuntimeError("Expected error")
+
+    def excepthook(*_):
+        nonlocal surfaced_at
+        surfaced_at = time.perf_counter()
+
+    sys.excepthook = excepthook
+    cpu_start = time.process_time()
+
+    for _ in range(TASKS_COUNT):
+        task()
+    failing_task()
+
+    while done_count < TASKS_COUNT or not surfaced_at:
+        await asyncio.sleep(0.01)
+
+    cpu_time = time.process_time() - cpu_start
+    sys.excepthook = sys.__excepthook__
+    return (
+        f"wakeups {wakeups:>6}, cpu {cpu_time * 1000:>6.0f} ms, "
+        f"exception latency {(surfaced_at - raised_at) * 1000:>5.1f} ms"
+    )
+
+
+async def main():
+    print(f"{TASKS_COUNT} tasks for {TASK_DURATION_SEC} sec")
+    print(f"   polling: {await run(polling_async_task)}")
+    print(f"callbacks: {await run(callback_async_task)}")
+    QCoreApplication.quit()
+
+
+if __name__ == "__main__":
+    app = QCoreApplication(sys.argv)
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    with loop:
+        loop.run_until_complete(main())
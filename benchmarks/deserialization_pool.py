@@ -0,0 +1,77 @@
+# Measures how long the event loop is stalled while a big List[Pet] reply
+# is deserialized inline, in a thread pool and in a process pool
+#
+# poetry run python -m benchmarks.deserialization_pool
+import asyncio
+import json
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional
+
+from pyqt_rest_client.deserialization import DeserializationPool
+from usage_example.dataclasses.pet import Pet
+
+PETS_COUNT = 50_000
+TICK_SEC = 0.001
+
+
+def big_payload() -> bytes:
+    pets = [
+        {
+            "id": i,
+            "name": f"pet {i}",
+            "status": "available",
+            "category": {"id": 1, "name": "dogs"},
+            "photoUrls": ["http://example.com/photo.png"],
+            "tags": [{"id": 1, "name": "good"}],
+        }
+        for i in range(PETS_COUNT)
+    ]
+    return json.dumps(pets).encode("utf-8")
+
+
+async def max_loop_stall(executor: Optional[Executor], data: bytes) -> float:
+    # min_size=0 sends everything to the executor, the huge one keeps it inline
+    pool = DeserializationPool(executor, min_size=0 if executor else len(data) + 1)
+    max_stall = 0.0
+    done = False
+
+    async def heartbeat():
+        nonlocal max_stall
+        last_tick = time.perf_counter()
+        while not done:
+            await asyncio.sleep(TICK_SEC)
+            now = time.perf_counter()
+            max_stall = max(max_stall, now - last_tick - TICK_SEC)
+            last_tick = now
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.05)  # Let the heartbeat start
+
+    pets = await pool.cast(data, List[Pet])
+    assert len(pets) == PETS_COUNT
+
+    done = True
+    await heartbeat_task
+    return max_stall
+
+
+async def main():
+    data = big_payload()
+    print(f"payload: {len(data) / 1024 / 1024:.1f} MiB, {PETS_COUNT} pets")
+
+    with ThreadPoolExecutor(1) as threads, ProcessPoolExecutor(1) as processes:
+        # Warm up the process pool, so the worker start is not measured
+        processes.submit(len, b"").result()
+
+        for name, executor in [
+            ("inline", None),
+            ("thread pool", threads),
+            ("process pool", processes),
+        ]:
+            stall = await max_loop_stall(executor, data)
+            print(f"{name:>12}: max event loop stall {stall * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+# Measures how many Requests per second are built in a tight loop by the previous
+# url() implementation, by endpoint() and by an EndpointTemplate
+#
+# poetry run python -m benchmarks.endpoint_construction
+import time
+from typing import Callable
+from urllib.parse import urljoin
+
+import pyqt_rest_client as client
+from pyqt_rest_client import EndpointTemplate, endpoint
+from pyqt_rest_client.request import Request
+from usage_example.dataclasses.pet import Pet
+
+REQUESTS_COUNT = 100_000
+
+
+def previous_endpoint(res_type, url_parts: list, args: dict = None) -> Request:
+    relative_url = f'{"/".join(url_parts)}/'
+    if args:
+        args_pairs = [f"{k}={v}" for k, v in args.items() if v]
+        relative_url += "?" + "&".join(args_pairs)
+    return Request(urljoin(client.login_data.base_url, relative_url), res_type)
+
+
+pet_by_id = EndpointTemplate(Pet, "pet/{id}")
+
+
+def measure(name: str, build: Callable[[int], Request]):
+    start = time.perf_counter()
+    for i in range(REQUESTS_COUNT):
+        build(i)
+    duration = time.perf_counter() - start
+    print(f"{name:>16}: {REQUESTS_COUNT / duration:>9,.0f} requests/sec")
+
+
+def main():
+    client.login("http://server:1234/api/v1.8/", "user", "")
+    print(f"{REQUESTS_COUNT} requests of pet/{{id}}/?fields=name")
+
+    measure(
+        "previous url()",
+        lambda i: previous_endpoint(Pet, ["pet", str(i)], {"fields": "name"}),
+    )
+    measure("endpoint()", lambda i: endpoint(Pet, ["pet", str(i)], {"fields": "name"}))
+    measure("EndpointTemplate", lambda i: pet_by_id(id=i, fields="name"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Scrolls PagedTableModel over a collection of a million rows, that
+# MemoryTransport generates, like a view would: the visible rows are read
+# and fetchMore() is called at the end. The memory of the model should not
+# grow with the scrolled rows, only up to max_pages pages are kept
+#
+# poetry run python -m benchmarks.item_model
+import asyncio
+import sys
+import time
+from typing import List
+
+import qasync
+from pydantic import BaseModel
+from PyQt5.QtCore import QCoreApplication
+
+from benchmarks.load_test import rss_bytes
+from pyqt_rest_client import (
+    Client,
+    MemoryResponse,
+    MemoryTransport,
+    OffsetPagination,
+    PagedTableModel,
+)
+
+ROWS = 1_000_000
+VISIBLE_ROWS = 40
+
+
+class Pet(BaseModel):
+    id: int
+    name: str
+    status: str
+
+
+def page(request) -> MemoryResponse:
+    offset, limit = int(request.query["offset"]), int(request.query["limit"])
+    return MemoryResponse(
+        [
+            {"id": id, "name": f"pet {id}", "status": "available"}
+            for id in range(offset, min(offset + limit, ROWS))
+        ]
+    )
+
+
+async def main():
+    transport = MemoryTransport()
+    transport.add("GET", "pet", page)
+    session = Client("http://server/api/", network_manager=transport)
+    model = PagedTableModel(
+        session.endpoint(List[Pet], ["pet"]),
+        pagination=OffsetPagination(limit=500),
+        max_pages=4,
+    )
+
+    start = time.perf_counter()
+    top_row = 0
+    slowest_frame = 0.0
+    while model.canFetchMore() or top_row + VISIBLE_ROWS < model.rowCount():
+        frame_start = time.perf_counter()
+        for row in range(top_row, min(top_row + VISIBLE_ROWS, model.rowCount())):
+            for column in range(model.columnCount()):
+                model.data(model.index(row, column))
+        slowest_frame = max(slowest_frame, time.perf_counter() - frame_start)
+
+        if top_row + VISIBLE_ROWS >= model.rowCount():
+            model.fetchMore()
+            while model._fetching:
+                await asyncio.gather(*model._fetching.values())
+        else:
+            top_row += VISIBLE_ROWS
+        if top_row % 200_000 == 0:
+            print(f"row {top_row:>7}: rss {rss_bytes() / 2**20:.0f} MiB")
+
+    print(f"{model.rowCount()} rows in {time.perf_counter() - start:.1f} s")
+    print(f"the slowest frame of {VISIBLE_ROWS} rows: {slowest_frame * 1000:.2f} ms")
+    print(f"pages in memory: {len(model._pages)}, rss {rss_bytes() / 2**20:.0f} MiB")
+    QCoreApplication.quit()
+
+
+if __name__ == "__main__":
+    app = QCoreApplication(sys.argv)
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    with loop:
+        loop.run_until_complete(main())
@@ -0,0 +1,269 @@
+# Load test of the client against a local stand-in server, see stand_in_server
+# Every scenario sends requests through a real QNetworkAccessManager and the
+# qasync event loop at a fixed concurrency, with the set server latency,
+# payload size and error rate, and measures:
+#   throughput, p50/p95/p99 latency of the requests, the event loop lag
+#   (the lateness of a 60 fps frame timer) and the RSS of the process
+# The results are saved as json, and compared with the previous results,
+# so regressions between versions are visible
+#
+# poetry run python -m benchmarks.load_test --output results.json
+# poetry run python -m benchmarks.load_test --compare results.json
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, List, Optional
+
+import qasync
+from pydantic import BaseModel
+from PyQt5.QtCore import PYQT_VERSION_STR, QT_VERSION_STR, QCoreApplication, QTimer
+
+from benchmarks import stand_in_server
+from pyqt_rest_client import Client, RequestScheduler
+from pyqt_rest_client.reply import ReplyGotError
+
+FRAME_MS = 16
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+    status: str
+    tags: List[str]
+
+
+class Scenario:
+    def __init__(
+        self,
+        name: str,
+        operation: str = "GET",
+        concurrency: int = 16,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        items: int = 10,  # In the replies of GET and in the bodies of POST
+        error_rate: float = 0,
+    ):
+        self.name = name
+        self.operation = operation
+        self.concurrency = concurrency
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.items = items
+        self.error_rate = error_rate
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+
+SCENARIOS = [
+    Scenario("get small, sequential", concurrency=1),
+    Scenario("get small", concurrency=16),
+    Scenario("get small, high concurrency", concurrency=64),
+    Scenario("get big", items=2000),
+    Scenario("get with latency", concurrency=64, latency_ms=50, jitter_ms=20),
+    Scenario("get with errors", error_rate=0.05),
+    Scenario("post", operation="POST", items=100),
+    Scenario("post, sequential", operation="POST", concurrency=1, items=100),
+]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):  # Not Linux
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # KiB on Linux
+
+
+async def run(
+    base_url: str, scenario: Scenario, requests_count: int, network_threads: int
+) -> dict:
+    session = Client(
+        base_url,
+        scheduler=RequestScheduler(max_per_host=scenario.concurrency),
+        coalesce_gets=False,
+    )
+    session.use_network_threads(network_threads)
+    args = {
+        "latency_ms": scenario.latency_ms,
+        "jitter_ms": scenario.jitter_ms,
+        "items": scenario.items,
+        "error_rate": scenario.error_rate,
+    }
+    body = [{"id": i, "name": f"item {i}"} for i in range(scenario.items)]
+    if scenario.operation == "GET":
+        request = session.endpoint(List[Item], ["items"], args)
+    else:
+        request = session.endpoint(dict, ["items"], args)
+
+    latencies: List[float] = []
+    errors = 0
+    slots = asyncio.Semaphore(scenario.concurrency)
+
+    async def one_request():
+        nonlocal errors
+        async with slots:
+            start = time.perf_counter()
+            try:
+                if scenario.operation == "GET":
+                    await request.get("")
+                else:
+                    await request.post(body, "")
+            except ReplyGotError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    loop_lags: List[float] = []
+    last_frame = time.perf_counter()
+
+    def frame():
+        nonlocal last_frame
+        now = time.perf_counter()
+        loop_lags.append(max(0.0, now - last_frame - FRAME_MS / 1000))
+        last_frame = now
+
+    timer = QTimer()
+    timer.timeout.connect(frame)
+    timer.start(FRAME_MS)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(requests_count)))
+    duration = time.perf_counter() - start
+    timer.stop()
+    session.use_network_threads(0)
+
+    latencies.sort()
+    loop_lags.sort()
+    return {
+        "name": scenario.name,
+        "scenario": scenario.as_dict(),
+        "requests": requests_count,
+        "errors": errors,
+        "duration_s": duration,
+        "throughput_rps": requests_count / duration,
+        "latency_ms": {
+            name: percentile(latencies, fraction) * 1000
+            for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+        },
+        "loop_lag_ms": {
+            "p50": percentile(loop_lags, 0.5) * 1000,
+            "p99": percentile(loop_lags, 0.99) * 1000,
+            "max": (loop_lags[-1] if loop_lags else 0.0) * 1000,
+        },
+        "rss_mib": rss_bytes() / 2**20,
+        "peak_rss_mib": peak_rss_bytes() / 2**20,
+    }
+
+
+def print_result(result: dict, baseline: Optional[dict]):
+    def change(value: float, path: tuple) -> str:
+        if baseline is None:
+            return ""
+        previous: Any = baseline
+        for key in path:
+            previous = previous[key]
+        if not previous:
+            return ""
+        return f" ({(value - previous) / previous * 100:+.0f}%)"
+
+    latency, lag = result["latency_ms"], result["loop_lag_ms"]
+    print(
+        f"{result['name']:<28}"
+        f"{result['throughput_rps']:>8.0f} rps"
+        f"{change(result['throughput_rps'], ('throughput_rps',))}, "
+        f"latency p50 {latency['p50']:.1f} ms"
+        f"{change(latency['p50'], ('latency_ms', 'p50'))}, "
+        f"p95 {latency['p95']:.1f} ms"
+        f"{change(latency['p95'], ('latency_ms', 'p95'))}, "
+        f"p99 {latency['p99']:.1f} ms"
+        f"{change(latency['p99'], ('latency_ms', 'p99'))}, "
+        f"loop lag p99 {lag['p99']:.1f} ms"
+        f"{change(lag['p99'], ('loop_lag_ms', 'p99'))}, "
+        f"errors {result['errors']}, "
+        f"rss {result['rss_mib']:.0f} MiB{change(result['rss_mib'], ('rss_mib',))}"
+    )
+
+
+async def main(base_url: str, options: argparse.Namespace):
+    baseline = {}
+    if options.compare:
+        with open(options.compare) as file:
+            baseline = {
+                result["name"]: result for result in json.load(file)["scenarios"]
+            }
+
+    print(
+        f"{options.requests} requests per scenario, "
+        f"{options.network_threads} network threads"
+    )
+    await run(base_url, SCENARIOS[1], options.requests, options.network_threads)
+
+    results = []
+    for scenario in SCENARIOS:
+        if options.scenario and options.scenario not in scenario.name:
+            continue
+        result = await run(
+            base_url, scenario, options.requests, options.network_threads
+        )
+        results.append(result)
+        print_result(result, baseline.get(scenario.name))
+
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(
+                {
+                    "label": options.label,
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "python": platform.python_version(),
+                    "qt": QT_VERSION_STR,
+                    "pyqt": PYQT_VERSION_STR,
+                    "platform": platform.platform(),
+                    "network_threads": options.network_threads,
+                    "scenarios": results,
+                },
+                file,
+                indent=2,
+            )
+    QCoreApplication.quit()
+
+
+def parse_options() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test of pyqt_rest_client")
+    parser.add_argument("--requests", type=int, default=1000, help="Per scenario")
+    parser.add_argument("--scenario", default="", help="Runs the matching ones")
+    parser.add_argument("--network-threads", type=int, default=0)
+    parser.add_argument("--output", default="", help="The json file for results")
+    parser.add_argument("--compare", default="", help="The json file of baseline")
+    parser.add_argument("--label", default="", help="Like the version under test")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    options = parse_options()
+    server, url = stand_in_server.start()
+
+    app = QCoreApplication(sys.argv)
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    with loop:
+        loop.run_until_complete(main(url, options))
+    server.terminate()
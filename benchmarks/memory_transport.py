@@ -0,0 +1,58 @@
+# Measures how many requests per second go through MemoryTransport, compared
+# with the local stand-in server, it is the cost of the client side only
+#
+# poetry run python -m benchmarks.memory_transport
+import asyncio
+import sys
+import time
+from typing import Any, Dict
+
+import qasync
+from PyQt5.QtCore import QCoreApplication
+
+from benchmarks import stand_in_server
+from pyqt_rest_client import Client, MemoryResponse, MemoryTransport, RequestScheduler
+
+REQUESTS_COUNT = 5000
+CONCURRENCY = 32
+
+
+async def run(session: Client) -> float:
+    request = session.endpoint(list, ["items"], {"items": 10})
+    slots = asyncio.Semaphore(CONCURRENCY)
+
+    async def one_request():
+        async with slots:
+            await request.get("")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(REQUESTS_COUNT)))
+    return REQUESTS_COUNT / (time.perf_counter() - start)
+
+
+async def main(base_url: str):
+    transport = MemoryTransport()
+    transport.add("GET", "items", MemoryResponse(stand_in_server.payload(10)))
+    settings: Dict[str, Any] = dict(
+        scheduler=RequestScheduler(max_per_host=CONCURRENCY), coalesce_gets=False
+    )
+
+    memory = Client(base_url, network_manager=transport, **settings)
+    network = Client(base_url, **settings)
+    await run(memory)  # Warm up
+
+    print(f"{REQUESTS_COUNT} GET requests, {CONCURRENCY} concurrent")
+    print(f"MemoryTransport:   {await run(memory):>6.0f} requests/s")
+    print(f"stand-in server:   {await run(network):>6.0f} requests/s")
+    QCoreApplication.quit()
+
+
+if __name__ == "__main__":
+    server, url = stand_in_server.start()
+
+    app = QCoreApplication(sys.argv)
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    with loop:
+        loop.run_until_complete(main(url))
+    server.terminate()
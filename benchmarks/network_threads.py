@@ -0,0 +1,106 @@
+# Measures the GUI frame latency while 1000 concurrent requests are received
+# by the GUI thread QNetworkAccessManager and by network threads
+# A 60 fps frame timer runs on the event loop, its lateness is the frame latency
+#
+# poetry run python -m benchmarks.network_threads
+import asyncio
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import qasync
+from PyQt5.QtCore import QCoreApplication, QTimer
+
+from pyqt_rest_client import Client, RequestScheduler
+
+REQUESTS_COUNT = 1000
+ITEMS_COUNT = 2000  # In every reply
+FRAME_MS = 16
+
+PAYLOAD = json.dumps(
+    [{"id": i, "name": f"item {i}", "tags": ["a", "b"]} for i in range(ITEMS_COUNT)]
+).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+# The server is in another process, so it does not take the GIL of the GUI
+def serve(port_queue: multiprocessing.Queue):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+async def run(base_url: str, threads_count: int) -> str:
+    session = Client(
+        base_url, scheduler=RequestScheduler(max_per_host=64), coalesce_gets=False
+    )
+    session.use_network_threads(threads_count)
+    request = session.endpoint(bytes, ["items"])
+
+    frame_latencies: List[float] = []
+    last_frame = time.perf_counter()
+
+    def frame():
+        nonlocal last_frame
+        now = time.perf_counter()
+        frame_latencies.append(max(0.0, now - last_frame - FRAME_MS / 1000))
+        last_frame = now
+
+    timer = QTimer()
+    timer.timeout.connect(frame)
+    timer.start(FRAME_MS)
+
+    start = time.perf_counter()
+    replies = await asyncio.gather(*(request.get("") for _ in range(REQUESTS_COUNT)))
+    duration = time.perf_counter() - start
+    timer.stop()
+    session.use_network_threads(0)
+
+    assert all(reply == PAYLOAD for reply in replies)
+    frame_latencies.sort()
+    return (
+        f"{duration:>5.2f} s, frame latency "
+        f"p50 {statistics.median(frame_latencies) * 1000:>5.1f} ms, "
+        f"p95 {frame_latencies[int(len(frame_latencies) * 0.95)] * 1000:>5.1f} ms, "
+        f"max {frame_latencies[-1] * 1000:>5.1f} ms"
+    )
+
+
+async def main(base_url: str):
+    print(f"{REQUESTS_COUNT} concurrent requests, {len(PAYLOAD) / 1024:.0f} KiB each")
+    await run(base_url, 0)  # Warm up
+    print(f"       GUI thread: {await run(base_url, 0)}")
+    print(f" 1 network thread: {await run(base_url, 1)}")
+    print(f"2 network threads: {await run(base_url, 2)}")
+    QCoreApplication.quit()
+
+
+if __name__ == "__main__":
+    port_queue: "multiprocessing.Queue[int]" = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(port_queue,), daemon=True)
+    server.start()
+    url = f"http://127.0.0.1:{port_queue.get()}/"
+
+    app = QCoreApplication(sys.argv)
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    with loop:
+        loop.run_until_complete(main(url))
+    server.terminate()
@@ -0,0 +1,89 @@
+# Records the traffic to the local stand-in server into a cassette and replays
+# it as fast as possible, so the replay measures the client side cost only:
+# scheduling, the replies, deserialization into the models
+# The count of the exchanges can be big, the cassette stays on disk
+#
+# poetry run python -m benchmarks.replay [--requests 100000]
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+import qasync
+from PyQt5.QtCore import QCoreApplication
+
+from benchmarks import stand_in_server
+from benchmarks.load_test import rss_bytes
+from pyqt_rest_client import (
+    Cassette,
+    Client,
+    RecordingTransport,
+    ReplayTransport,
+    RequestScheduler,
+)
+
+CONCURRENCY = 32
+DISTINCT_REQUESTS = 1000  # The rest of the requests repeat them
+
+
+async def run(session: Client, requests_count: int) -> float:
+    slots = asyncio.Semaphore(CONCURRENCY)
+
+    async def one_request(i: int):
+        async with slots:
+            await session.endpoint(
+                list, ["items"], {"items": 10, "page": i % DISTINCT_REQUESTS}
+            ).get("")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request(i) for i in range(requests_count)))
+    return requests_count / (time.perf_counter() - start)
+
+
+async def main(base_url: str, path: str, requests_count: int):
+    settings: Dict[str, Any] = dict(
+        scheduler=RequestScheduler(max_per_host=CONCURRENCY), coalesce_gets=False
+    )
+
+    cassette = Cassette(path)
+    recording = Client(
+        base_url, network_manager=RecordingTransport(cassette), **settings
+    )
+    recorded = await run(recording, requests_count)
+    size = os.path.getsize(path)
+    cassette.close()
+
+    cassette = Cassette(path)
+    replay = Client(
+        base_url, network_manager=ReplayTransport(cassette, realtime=False), **settings
+    )
+    replayed = await run(replay, requests_count)
+
+    print(f"{requests_count} GET requests, {CONCURRENCY} concurrent")
+    print(f"cassette: {len(cassette)} exchanges, {size / 2**20:.1f} MiB")
+    print(f"recording: {recorded:>6.0f} requests/s")
+    print(f"replay:    {replayed:>6.0f} requests/s, rss {rss_bytes() / 2**20:.0f} MiB")
+    cassette.close()
+    QCoreApplication.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=10_000)
+    args = parser.parse_args()
+
+    server, url = stand_in_server.start()
+    directory = tempfile.TemporaryDirectory()
+
+    app = QCoreApplication(sys.argv)
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    with loop:
+        loop.run_until_complete(
+            main(url, os.path.join(directory.name, "replay.cassette"), args.requests)
+        )
+    server.terminate()
+    directory.cleanup()
@@ -0,0 +1,84 @@
+# Local HTTP stand-in of a backend for the benchmarks
+# Every request sets its own behaviour in the query:
+#   latency_ms  - the delay before the reply
+#   jitter_ms   - the random addition to the delay, up to this value
+#   items       - the count of items in the json array of the reply
+#   error_rate  - the share of the replies that are 503 Service Unavailable
+# POST and PUT reply {"received": <body size>}
+# It runs in another process, so it does not take the GIL of the client
+import json
+import multiprocessing
+import random
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+@lru_cache(maxsize=16)
+def payload(items: int) -> bytes:
+    return json.dumps(
+        [
+            {"id": i, "name": f"item {i}", "status": "available", "tags": ["a", "b"]}
+            for i in range(items)
+        ]
+    ).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        params = self._params()
+        if params is not None:
+            self._reply(200, payload(int(params.get("items", 10))))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self._params() is not None:
+            self._reply(200, json.dumps({"received": len(body)}).encode("utf-8"))
+
+    do_PUT = do_POST
+
+    # The params of the request, or None if the error is already replied
+    def _params(self):
+        params = dict(parse_qsl(urlsplit(self.path).query))
+        delay = float(params.get("latency_ms", 0))
+        delay += random.uniform(0, float(params.get("jitter_ms", 0)))
+        if delay:
+            time.sleep(delay / 1000)
+
+        if random.random() < float(params.get("error_rate", 0)):
+            self._reply(503, b'{"detail": "Service Unavailable"}')
+            return None
+        return params
+
+    def _reply(self, code: int, body: bytes):
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Of not accepted connections
+
+
+def _serve(port_queue: multiprocessing.Queue):
+    server = _Server(("127.0.0.1", 0), _Handler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+# Returns the server process and its base url, terminate() it after the use
+def start() -> tuple:
+    port_queue: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(port_queue,), daemon=True)
+    process.start()
+    return process, f"http://127.0.0.1:{port_queue.get()}/"
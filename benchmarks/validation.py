@@ -0,0 +1,52 @@
+# Compares the per-reply deserialization cost of parse_obj_as() with
+# the cached validators and the trusted (not validated) mode
+#
+# poetry run python -m benchmarks.validation
+import json
+import timeit
+from typing import List
+
+from pydantic import parse_obj_as
+
+from pyqt_rest_client.request import cast_data_to_resource
+from pyqt_rest_client.validation import PYDANTIC_V2
+from usage_example.dataclasses.pet import Pet
+
+REPLIES_COUNT = 200
+
+
+def payload(pets_count: int) -> bytes:
+    pets = [
+        {
+            "id": i,
+            "name": f"pet {i}",
+            "status": "available",
+            "category": {"id": 1, "name": "dogs"},
+            "photoUrls": ["http://example.com/photo.png"],
+            "tags": [{"id": 1, "name": "good"}],
+        }
+        for i in range(pets_count)
+    ]
+    return json.dumps(pets).encode("utf-8")
+
+
+def main():
+    print(f"pydantic {'2' if PYDANTIC_V2 else '1'}, {REPLIES_COUNT} replies")
+
+    for pets_count in [1, 10, 1000]:
+        data = payload(pets_count)
+        ways = {
+            "parse_obj_as": lambda: parse_obj_as(List[Pet], json.loads(data)),
+            "validator": lambda: cast_data_to_resource(data, List[Pet]),
+            "trusted": lambda: cast_data_to_resource(data, List[Pet], trusted=True),
+        }
+
+        print(f"List[Pet] of {pets_count} pets, per reply:")
+        for name, way in ways.items():
+            way()  # Warm up the caches
+            sec = timeit.timeit(way, number=REPLIES_COUNT) / REPLIES_COUNT
+            print(f"{name:>14}: {sec * 1_000_000:>9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,51 @@
-import base64
-from typing import List
+from concurrent.futures import Executor
+from typing import List, Optional
 
-from PyQt5.QtCore import QObject, pyqtSignal
 from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkReply
 
 # This is here so users can import these objects from pyqt_rest_client directly
 from pyqt_rest_client.asyncio_integration import async_task  # noqa: F401
-from pyqt_rest_client.request import endpoint  # noqa: F401
-
-
-class Login:
-    base_url: str
-    username: str
-    secret: bytes
-
-    def __init__(self, base_url: str, username: str, secret: str):
-        self.base_url = base_url
-        self.username = username
-        self.secret = base64.b64decode(secret)
-
+from pyqt_rest_client.auth import Sha256Signer, Signer  # noqa: F401
+from pyqt_rest_client.batch import gather_requests, requests_as_completed  # noqa: F401
+from pyqt_rest_client.cache import ResponseCache
+from pyqt_rest_client.cassette import (  # noqa: F401
+    Cassette,
+    RecordingTransport,
+    ReplayTransport,
+)
+from pyqt_rest_client.compression import Compression  # noqa: F401
+from pyqt_rest_client.deserialization import DeserializationPool
+from pyqt_rest_client.item_model import PagedTableModel  # noqa: F401
+from pyqt_rest_client.memory_transport import (  # noqa: F401
+    MemoryResponse,
+    MemoryTransport,
+)
+from pyqt_rest_client.metrics import MetricsCollector
+from pyqt_rest_client.pagination import (  # noqa: F401
+    CursorPagination,
+    LinkHeaderPagination,
+    OffsetPagination,
+    paginate,
+)
+from pyqt_rest_client.request import EndpointTemplate, endpoint  # noqa: F401
+from pyqt_rest_client.retry import CircuitBreaker, RetryPolicy  # noqa: F401
+from pyqt_rest_client.scheduler import Priority, RequestScheduler  # noqa: F401
+from pyqt_rest_client.session import (  # noqa: F401
+    Client,
+    Login,
+    NetworkManager,
+    Session,
+    _RequestNotifier,
+    create_deserialization_pool,
+    create_network_manager,
+    create_response_cache,
+)
+from pyqt_rest_client.sync import (  # noqa: F401
+    ConditionalSync,
+    PageETagSync,
+    SyncedCollection,
+    UpdatedSinceSync,
+)
 
 login_data = Login("", "", "")
 
@@ -28,15 +55,65 @@ def login(base_url: str, username: str, secret: str):
     login_data = Login(base_url, username, secret)
 
 
-class _RequestNotifier(QObject):
-    # The str there is a description that programmer can attach to the request
-    request_started = pyqtSignal(str)
-    request_finished = pyqtSignal(str)
-
-
 # This is made for client apps to have the ability to manually log requests
 request_notifier = _RequestNotifier()
 
 
-network_manager = QNetworkAccessManager()
+network_manager: NetworkManager = QNetworkAccessManager()
 active_requests: List[QNetworkReply] = []
+
+
+# The requests are sent from QNetworkAccessManagers in threads_count QThreads,
+# so the GUI thread only gets the received data, pass 0 to turn it off
+# Note that the disk cache of use_response_cache() is not supported with it
+def use_network_threads(threads_count: int = 1):
+    global network_manager
+    network_manager = create_network_manager(network_manager, threads_count)
+
+
+# Limits the requests to the same host and starts them by priority
+scheduler = RequestScheduler()
+
+
+# Identical GETs, that are in flight at the same time, share the result
+# Note that the shared deserialized resources should not be modified
+coalesce_gets = True
+
+
+# Transient failures are retried if the policy is set, like RetryPolicy()
+retry_policy: Optional[RetryPolicy] = None
+# Requests to failing hosts fail fast if it is set, like CircuitBreaker()
+circuit_breaker: Optional[CircuitBreaker] = None
+
+
+# Requests timings are measured if it is set, like MetricsCollector()
+metrics: Optional[MetricsCollector] = None
+
+
+deserialization_pool: Optional[DeserializationPool] = None
+
+
+# Replies bigger than min_size (in bytes) will be deserialized in the executor
+# and json bodies with min_body_items (see DeserializationPool) will be serialized
+# Pass executor=None to do everything inline again
+def use_deserialization_pool(
+    executor: Optional[Executor],
+    min_size: int = 64 * 1024,
+    min_body_items: int = 1000,
+):
+    global deserialization_pool
+    deserialization_pool = create_deserialization_pool(
+        executor, min_size, min_body_items
+    )
+
+
+response_cache: Optional[ResponseCache] = None
+
+
+# GET replies are cached in memory up to max_size bytes, pass None to turn it off
+# With disk_cache_dir Qt also keeps the replies on disk, between app launches
+def use_response_cache(
+    max_size: Optional[int] = 32 * 1024 * 1024, disk_cache_dir: str = ""
+):
+    global response_cache
+    response_cache = create_response_cache(network_manager, max_size, disk_cache_dir)
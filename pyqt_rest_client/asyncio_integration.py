@@ -1,27 +1,54 @@
 import asyncio
-from typing import Callable, List
+from collections import defaultdict
+from functools import partial
+from typing import Callable, Coroutine, Dict, Optional, Set
 
 from PyQt5.QtCore import QTimer
 
-_release_exceptions_timers: List[QTimer] = []
+# Group name -> running tasks, "" is the group of tasks started without a group
+_task_groups: Dict[str, Set["asyncio.Task"]] = defaultdict(set)
 
 
-def async_task(func) -> Callable:
-    def sync_wrapper_around_async_func(*args, **kwargs):
-        task = asyncio.create_task(func(*args, **kwargs))
+def _release_exceptions(task: "asyncio.Task"):
+    if not task.cancelled() and task.exception():
+        # Raise it from a Qt slot, so it is handled like exceptions of sync slots
+        QTimer.singleShot(0, task.result)
 
-        release_exceptions_timer = QTimer()
-        _release_exceptions_timers.append(release_exceptions_timer)
 
-        def check_task_exceptions_if_it_is_done():
-            if task.done():
-                _release_exceptions_timers.remove(release_exceptions_timer)
-                release_exceptions_timer.stop()
-                release_exceptions_timer.deleteLater()
+# Runs the coroutine as a task, its exception is raised as soon as it is done
+def start_task(coroutine: Coroutine, group: str = "") -> "asyncio.Task":
+    task = asyncio.create_task(coroutine)
+    tasks = _task_groups[group]
+    tasks.add(task)
 
-                task.result()  # The release exceptions itself
+    def on_done(task: "asyncio.Task"):
+        tasks.discard(task)
+        if not tasks and _task_groups.get(group) is tasks:
+            del _task_groups[group]
+        _release_exceptions(task)
 
-        release_exceptions_timer.timeout.connect(check_task_exceptions_if_it_is_done)
-        release_exceptions_timer.start(50)
+    task.add_done_callback(on_done)
+    return task
+
+
+# For example to cancel all the tasks of the closed window
+def cancel_task_group(group: str):
+    for task in list(_task_groups.get(group, ())):
+        task.cancel()
+
+
+def running_tasks_count(group: Optional[str] = None) -> int:
+    if group is None:
+        return sum(len(tasks) for tasks in _task_groups.values())
+    return len(_task_groups.get(group, ()))
+
+
+def async_task(func: Callable = None, *, group: str = "") -> Callable:
+    if func is None:  # Used as @async_task(group="...")
+        return partial(async_task, group=group)
+    coroutine_function = func  # It is not Optional in the closure
+
+    def sync_wrapper_around_async_func(*args, **kwargs) -> "asyncio.Task":
+        return start_task(coroutine_function(*args, **kwargs), group)
 
     return sync_wrapper_around_async_func
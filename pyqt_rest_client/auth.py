@@ -0,0 +1,77 @@
+import asyncio
+import hashlib
+import weakref
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from typing import Dict, Optional, Union
+
+from .upload import UploadBody
+
+Headers = Dict[bytes, bytes]
+
+
+# Returns the authentication headers of the request body
+# The signer of the Login is used by default, it can be replaced per endpoint
+# to plug in other authentication schemes, see Request.signer
+class Signer(ABC):
+    @abstractmethod
+    async def sign(self, body: Union[bytes, UploadBody]) -> Headers:
+        ...
+
+
+# Authentication: username:sha256(secret + body)
+# The hash state seeded by the secret is copied for every body, the signature
+# of the empty body (GET, DELETE) is calculated once, and the bodies bigger
+# than worker_min_size are hashed in the executor (hashlib releases the GIL)
+class Sha256Signer(Signer):
+    def __init__(
+        self,
+        username: str,
+        secret: bytes,
+        worker_min_size: int = 1024 * 1024,  # bytes
+        executor: Optional[Executor] = None,  # None is the asyncio default one
+    ):
+        self.username = username
+        self.worker_min_size = worker_min_size
+        self.executor = executor
+        self._seeded = hashlib.sha256(secret)
+        self._empty_body_headers = self._headers(self._seeded.copy())
+        # Upload bodies are hashed once, even if they are sent again by retries
+        self._upload_headers: "weakref.WeakKeyDictionary[UploadBody, Headers]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def sign(self, body: Union[bytes, UploadBody]) -> Headers:
+        if isinstance(body, UploadBody):
+            headers = self._upload_headers.get(body)
+            if headers is None:
+                if body.thread_safe():
+                    headers = await self._in_worker(self.sign_upload, body)
+                else:
+                    headers = self.sign_upload(body)
+                self._upload_headers[body] = headers
+            return headers
+
+        if not body:
+            return self._empty_body_headers
+        if len(body) >= self.worker_min_size:
+            return await self._in_worker(self.sign_bytes, body)
+        return self.sign_bytes(body)
+
+    def sign_bytes(self, body: bytes) -> Headers:
+        digest = self._seeded.copy()
+        digest.update(body)
+        return self._headers(digest)
+
+    def sign_upload(self, body: UploadBody) -> Headers:
+        digest = self._seeded.copy()
+        body.update(digest)
+        return self._headers(digest)
+
+    async def _in_worker(self, sign, body) -> Headers:
+        return await asyncio.get_event_loop().run_in_executor(self.executor, sign, body)
+
+    def _headers(self, digest) -> Headers:
+        return {
+            b"Authentication": bytes(f"{self.username}:{digest.hexdigest()}", "utf-8")
+        }
@@ -0,0 +1,109 @@
+import asyncio
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .reply import ReplyGotError
+from .request import Request, default_session, endpoint
+from .scheduler import Priority
+
+if TYPE_CHECKING:
+    from .session import Client
+
+# Request or (url_parts, args) for endpoint(res_type, url_parts, args, session)
+BatchItem = Union[Request, Tuple[list, dict]]
+
+
+class BatchResult:
+    def __init__(self):
+        # Both are indexed by the position of the request in the batch
+        self.successes: Dict[int, Any] = {}
+        self.errors: Dict[int, ReplyGotError] = {}
+
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _to_requests(
+    items: Sequence[BatchItem], res_type, session: Optional["Client"]
+) -> List[Request]:
+    return [
+        item
+        if isinstance(item, Request)
+        else endpoint(res_type, *item, session=session)
+        for item in items
+    ]
+
+
+# GETs the requests with at most max_parallel at the same time
+# Yields (index, resource or ReplyGotError) in completion order
+# The progress is emitted with request_notifier.batch_progress of the session of
+# the requests, the tuples are the requests of session, the module by default
+async def requests_as_completed(
+    items: Sequence[BatchItem],
+    res_type=None,
+    max_parallel: int = 8,
+    descr: str = "",
+    priority: Priority = Priority.INTERACTIVE,
+    session: Optional["Client"] = None,
+) -> AsyncIterator[Tuple[int, Union[Any, ReplyGotError]]]:
+    requests = _to_requests(items, res_type, session)
+    notifier = (
+        requests[0]._session if requests else default_session(session)
+    ).request_notifier
+    semaphore = asyncio.Semaphore(max_parallel)
+
+    async def get(index: int, request: Request):
+        async with semaphore:
+            try:
+                # Without descr, the requests are not reported one by one
+                return index, await request.get("", priority)
+            except ReplyGotError as error:
+                return index, error
+
+    tasks = [asyncio.ensure_future(get(i, r)) for i, r in enumerate(requests)]
+
+    if descr:
+        notifier.request_started.emit(descr)
+    try:
+        for done_count, next_done in enumerate(asyncio.as_completed(tasks), 1):
+            index, result = await next_done
+            notifier.batch_progress.emit(descr, done_count, len(tasks))
+            yield index, result
+
+    finally:
+        for task in tasks:  # If the iteration is stopped early
+            task.cancel()
+
+        if descr:
+            notifier.request_finished.emit(descr)
+
+
+# The same as requests_as_completed(), but waits for all of them
+async def gather_requests(
+    items: Sequence[BatchItem],
+    res_type=None,
+    max_parallel: int = 8,
+    descr: str = "",
+    priority: Priority = Priority.INTERACTIVE,
+    session: Optional["Client"] = None,
+) -> BatchResult:
+    result = BatchResult()
+
+    async for index, resource in requests_as_completed(
+        items, res_type, max_parallel, descr, priority, session
+    ):
+        if isinstance(resource, ReplyGotError):
+            result.errors[index] = resource
+        else:
+            result.successes[index] = resource
+
+    return result
@@ -0,0 +1,132 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .reply import Reply
+
+# (url, username, signer) the same url can return different data for different
+# users, and for the endpoints that are signed by another authentication scheme
+CacheKey = Tuple[str, str, Any]
+
+
+class CacheEntry:
+    def __init__(self, reply: Reply, expires_at: float):
+        self.data = reply.data
+        self.etag = reply.header("ETag")
+        self.last_modified = reply.header("Last-Modified")
+        self.expires_at = expires_at  # time.monotonic() based
+
+        # Already deserialized data by (res_type, trusted), so hits skip the parsing
+        # They are shared between requests, so don't modify them
+        self.resources: Dict[Any, Any] = {}
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    # Headers to ask the server whether the cached data is still valid
+    def validation_headers(self) -> Dict[bytes, bytes]:
+        headers = {}
+        if self.etag:
+            headers[b"If-None-Match"] = self.etag.encode("utf-8")
+        if self.last_modified:
+            headers[b"If-Modified-Since"] = self.last_modified.encode("utf-8")
+        return headers
+
+    # Deserialized resources are assumed to take as much memory as raw data
+    def size(self) -> int:
+        return len(self.data) * (1 + len(self.resources))
+
+
+# Returns None if the reply must not be stored, otherwise the expiration time
+def expiration_time(reply: Reply) -> Optional[float]:
+    directives = {}
+    for directive in reply.header("Cache-Control").lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        directives[name] = value.strip('"')
+
+    if "no-store" in directives:
+        return None
+
+    if "no-cache" not in directives and directives.get("max-age", "").isdigit():
+        return time.monotonic() + int(directives["max-age"])
+
+    # Without max-age the cached data is useful only if it can be revalidated
+    if reply.header("ETag") or reply.header("Last-Modified"):
+        return 0.0
+
+    return None
+
+
+# In memory LRU cache of GET replies, that honors Cache-Control
+# and revalidates stale entries with If-None-Match and If-Modified-Since
+class ResponseCache:
+    def __init__(self, max_size: int = 32 * 1024 * 1024):
+        self.max_size = max_size  # bytes
+        self.size = 0
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+
+        # Statistics
+        self.hits = 0  # Fresh entries returned without network requests
+        self.revalidations = 0  # Stale entries confirmed by 304 Not Modified
+        self.misses = 0  # Full data downloaded
+        self.resource_hits = 0  # Deserializations skipped
+        self.saved_bytes = 0  # Data not downloaded due to hits and revalidations
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: CacheKey) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry:
+            self._entries.move_to_end(key)
+        return entry
+
+    # Returns the entry for the reply even if it is not stored
+    def store(self, key: CacheKey, reply: Reply) -> CacheEntry:
+        self.remove(key)
+
+        expires_at = expiration_time(reply)
+        entry = CacheEntry(reply, expires_at or 0.0)
+        if expires_at is not None and entry.size() <= self.max_size:
+            self._entries[key] = entry
+            self.size += entry.size()
+            self._evict()
+        return entry
+
+    # The server confirmed that the entry is still valid
+    def refresh(self, key: CacheKey, entry: CacheEntry, reply: Reply):
+        expires_at = expiration_time(reply)
+        if expires_at is None:
+            self.remove(key)
+        else:
+            entry.expires_at = expires_at
+
+    def store_resource(
+        self, key: CacheKey, entry: CacheEntry, resource_key: tuple, resource
+    ):
+        if self._entries.get(key) is not entry:
+            return  # The entry was not stored or is already evicted
+
+        self.size -= entry.size()
+        entry.resources[resource_key] = resource
+        self.size += entry.size()
+        self._evict()
+
+    def remove(self, key: CacheKey):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self.size -= entry.size()
+
+    # Is used when the data is modified by POST, PUT or DELETE
+    def invalidate(self, url: str):
+        for key in [key for key in self._entries if key[0] == url]:
+            self.remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def _evict(self):
+        while self.size > self.max_size:
+            _, entry = self._entries.popitem(last=False)
+            self.size -= entry.size()
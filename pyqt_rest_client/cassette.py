@@ -0,0 +1,346 @@
+import hashlib
+import json
+import os
+import struct
+import time
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from PyQt5.QtCore import QIODevice, QUrl
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
+
+from .memory_transport import MemoryRequest, MemoryResponse, MemoryTransport
+from .network_threads import ThreadedReply, Transport
+from .reply import OPERATIONS
+
+# The cassette file is b"PQRC1\n" and the records one after another:
+#   struct RECORD (meta size, body size), json meta, body
+# The index file (<cassette>.index) has an ENTRY per record:
+#   blake2b of (operation, url, request body sha256), record offset, record size
+# Both are only appended, so a recording can be continued, and the index lets
+# the replay find the records without reading the whole cassette
+MAGIC = b"PQRC1\n"
+RECORD = struct.Struct("<IQ")
+ENTRY = struct.Struct("<16sQQ")
+HASHED_CHUNK_SIZE = 1024 * 1024
+
+
+def request_key(operation: str, url: str, body_sha256: str) -> bytes:
+    return hashlib.blake2b(
+        f"{operation} {url} {body_sha256}".encode("utf-8"), digest_size=16
+    ).digest()
+
+
+# A recorded request and its reply
+class Exchange:
+    def __init__(
+        self,
+        operation: str,
+        url: str,
+        body_sha256: str,  # Of the request body
+        status: Optional[int],  # None if there was no reply, like on network errors
+        headers: List[Tuple[str, str]],
+        error: int,  # QNetworkReply.NetworkError
+        error_string: str,
+        started: float,  # Seconds since the start of the recording
+        time_to_first_byte: float,  # seconds
+        duration: float,  # seconds
+        body: bytes = b"",
+    ):
+        self.operation = operation
+        self.url = url
+        self.body_sha256 = body_sha256
+        self.status = status
+        self.headers = headers
+        self.error = error
+        self.error_string = error_string
+        self.started = started
+        self.time_to_first_byte = time_to_first_byte
+        self.duration = duration
+        self.body = body
+
+    def key(self) -> bytes:
+        return request_key(self.operation, self.url, self.body_sha256)
+
+    def meta(self) -> dict:
+        meta = dict(vars(self))
+        del meta["body"]
+        return meta
+
+
+# Append-only file of the exchanges, only the index is kept in memory
+# and the bodies are read from the disk when the exchanges are replayed
+# A record that is cut by a crash is dropped when the cassette is opened again
+class Cassette:
+    def __init__(self, path: str):
+        self.path = path
+        self._offsets: Dict[bytes, List[int]] = {}  # request key -> the records
+        self._count = 0
+
+        exists = os.path.exists(path) and os.path.getsize(path) >= len(MAGIC)
+        self._file: BinaryIO = open(path, "r+b" if exists else "w+b")
+        if not exists:
+            self._file.write(MAGIC)
+        elif self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ValueError(f"'{path}' is not a cassette")
+
+        self._index: BinaryIO = open(path + ".index", "a+b")
+        self._load_index()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, exchange: Exchange):
+        meta = json.dumps(exchange.meta()).encode("utf-8")
+        offset = self._file.seek(0, os.SEEK_END)
+        size = RECORD.size + len(meta) + len(exchange.body)
+        self._file.write(RECORD.pack(len(meta), len(exchange.body)))
+        self._file.write(meta)
+        self._file.write(exchange.body)
+        self._file.flush()
+
+        key = exchange.key()
+        self._index.write(ENTRY.pack(key, offset, size))
+        self._index.flush()
+        self._add(key, offset)
+
+    # The recorded exchanges of the request, in the order of the recording
+    def offsets(self, operation: str, url: str, body_sha256: str) -> List[int]:
+        return self._offsets.get(request_key(operation, url, body_sha256), [])
+
+    def read(self, offset: int) -> Exchange:
+        self._file.seek(offset)
+        meta_size, body_size = RECORD.unpack(self._file.read(RECORD.size))
+        meta = json.loads(self._file.read(meta_size))
+        meta["headers"] = [tuple(header) for header in meta["headers"]]
+        return Exchange(**meta, body=self._file.read(body_size))
+
+    # All the exchanges, one by one
+    def __iter__(self) -> Iterator[Exchange]:
+        for offset, _ in self._scan(len(MAGIC)):
+            yield self.read(offset)
+
+    def close(self):
+        self._file.close()
+        self._index.close()
+
+    def _add(self, key: bytes, offset: int):
+        self._offsets.setdefault(key, []).append(offset)
+        self._count += 1
+
+    def _load_index(self):
+        self._index.seek(0)
+        data = self._index.read()
+        data = data[: len(data) - len(data) % ENTRY.size]  # Not written entry
+
+        file_size = self._file.seek(0, os.SEEK_END)
+        end = len(MAGIC)
+        for key, offset, size in ENTRY.iter_unpack(data):
+            if offset + size > file_size:
+                break
+            self._add(key, offset)
+            end = offset + size
+
+        # The records without the entries, like if the index is deleted
+        indexed = self._count
+        entries = []
+        for offset, size in self._scan(end):
+            meta_size = RECORD.unpack(self._read_at(offset, RECORD.size))[0]
+            meta = json.loads(self._read_at(offset + RECORD.size, meta_size))
+            key = request_key(meta["operation"], meta["url"], meta["body_sha256"])
+            entries.append(ENTRY.pack(key, offset, size))
+            self._add(key, offset)
+            end = offset + size
+
+        # Both files are rewritten to the valid state, the rest is appended
+        self._file.truncate(end)
+        self._index.truncate(indexed * ENTRY.size)
+        self._index.seek(0, os.SEEK_END)
+        self._index.write(b"".join(entries))
+        self._index.flush()
+
+    # (offset, size) of the complete records from the offset
+    def _scan(self, offset: int) -> Iterator[Tuple[int, int]]:
+        file_size = self._file.seek(0, os.SEEK_END)
+        while offset + RECORD.size <= file_size:
+            meta_size, body_size = RECORD.unpack(self._read_at(offset, RECORD.size))
+            size = RECORD.size + meta_size + body_size
+            if offset + size > file_size:
+                return
+            yield offset, size
+            offset += size
+
+    def _read_at(self, offset: int, size: int) -> bytes:
+        self._file.seek(offset)
+        return self._file.read(size)
+
+
+def body_sha256(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+# The transport that sends the requests with another network manager,
+# QNetworkAccessManager by default, and appends the exchanges to the cassette
+# as they are finished. The replies are ThreadedReply, like of MemoryTransport
+# The aborted requests are not recorded
+class RecordingTransport(Transport):
+    def __init__(self, cassette: Cassette, network_manager=None):
+        super().__init__()
+        self.cassette = cassette
+        self.network_manager = network_manager or QNetworkAccessManager()
+        self._replies: Dict[int, QNetworkReply] = {}  # Of the network manager
+        self._started = time.perf_counter()
+
+    def setCache(self, cache):
+        self.network_manager.setCache(cache)
+
+    def _send(self, operation: int, request: QNetworkRequest, data) -> ThreadedReply:
+        reply = self._reply(operation, request)
+        ticket = reply._ticket
+        data, sha256 = _hashed_body(data)
+        sent_at = time.perf_counter()
+
+        if operation == QNetworkAccessManager.GetOperation:
+            inner = self.network_manager.get(request)
+        elif operation == QNetworkAccessManager.HeadOperation:
+            inner = self.network_manager.head(request)
+        elif operation == QNetworkAccessManager.DeleteOperation:
+            inner = self.network_manager.deleteResource(request)
+        elif operation == QNetworkAccessManager.PostOperation:
+            inner = self.network_manager.post(request, data)
+        else:
+            inner = self.network_manager.put(request, data)
+        if isinstance(data, QIODevice):
+            data.setParent(inner)
+        self._replies[ticket] = inner
+
+        body: List[bytes] = []
+        first_byte_at: List[float] = []
+
+        def on_meta_data_changed():
+            if not first_byte_at:
+                first_byte_at.append(time.perf_counter())
+            reply._set_meta_data(
+                inner.attribute(QNetworkRequest.HttpStatusCodeAttribute),
+                inner.rawHeaderPairs(),
+            )
+
+        def on_ready_read():
+            data = inner.readAll()
+            if data.size():
+                body.append(data.data())
+                reply._append(data)
+
+        def on_finished():
+            on_ready_read()
+            finished_at = time.perf_counter()
+            del self._replies[ticket]
+            inner.disconnect()
+            inner.deleteLater()
+
+            self.cassette.append(
+                Exchange(
+                    OPERATIONS[operation],
+                    request.url().toString(QUrl.FullyEncoded),
+                    sha256,
+                    inner.attribute(QNetworkRequest.HttpStatusCodeAttribute),
+                    [
+                        (bytes(name).decode("latin-1"), bytes(value).decode("latin-1"))
+                        for name, value in inner.rawHeaderPairs()
+                    ],
+                    inner.error(),
+                    inner.errorString(),
+                    sent_at - self._started,
+                    (first_byte_at[0] if first_byte_at else finished_at) - sent_at,
+                    finished_at - sent_at,
+                    b"".join(body),
+                )
+            )
+            reply._finish(inner.error(), inner.errorString())
+
+        inner.metaDataChanged.connect(on_meta_data_changed)
+        inner.readyRead.connect(on_ready_read)
+        inner.downloadProgress.connect(reply.downloadProgress)
+        inner.uploadProgress.connect(reply.uploadProgress)
+        inner.finished.connect(on_finished)
+        return reply
+
+    # ThreadedReply calls them
+    def _abort(self, ticket: int):
+        inner = self._replies.pop(ticket, None)
+        if inner is not None:
+            inner.disconnect()
+            inner.abort()
+            inner.deleteLater()
+
+
+# The sha256 of the body and the body to send, the devices that can be read
+# again, like files, are hashed by chunks, the rest is read into memory
+def _hashed_body(data) -> Tuple[Union[QIODevice, bytes, None], str]:
+    if data is None:
+        return None, body_sha256(b"")
+    if not isinstance(data, QIODevice):
+        data = bytes(data)
+        return data, body_sha256(data)
+    if data.isSequential():
+        data = data.readAll().data()
+        return data, body_sha256(data)
+
+    start = data.pos()
+    sha256 = hashlib.sha256()
+    while not data.atEnd():
+        sha256.update(data.read(HASHED_CHUNK_SIZE))
+    data.seek(start)
+    return data, sha256.hexdigest()
+
+
+# MemoryTransport that replies the requests by the cassette: the n-th same
+# request (the operation, the url and the body) gets the n-th recorded reply,
+# the last one is repeated after that. The requests that are not recorded are
+# put into missed and get 404 ContentNotFoundError, like of MemoryTransport
+# The replies take the recorded times to the headers and to the end of the body
+# divided by speed, or no time at all if realtime is False
+# The routes that are added with add() take precedence over the cassette,
+# they are shared with the clones, but the cassette replies are counted and
+# missed per transport
+class ReplayTransport(MemoryTransport):
+    def __init__(self, cassette: Cassette, realtime: bool = True, speed: float = 1.0):
+        super().__init__()
+        if speed <= 0:
+            raise ValueError(f"speed: {speed} should be positive")
+        self.cassette = cassette
+        self.realtime = realtime
+        self.speed = speed
+        self.missed: List[MemoryRequest] = []
+        self._replayed: Dict[Tuple[str, str, str], int] = {}  # Request -> count
+
+    def clone(self) -> "ReplayTransport":
+        transport = ReplayTransport(self.cassette, self.realtime, self.speed)
+        transport._routes = self._routes
+        return transport
+
+    def _unrouted(self, request: MemoryRequest) -> MemoryResponse:
+        key = (request.operation, request.url, body_sha256(request.body))
+        offsets = self.cassette.offsets(*key)
+        if not offsets:
+            self.missed.append(request)
+            return MemoryResponse(b"", 404)
+
+        count = self._replayed.get(key, 0)
+        self._replayed[key] = count + 1
+        exchange = self.cassette.read(offsets[min(count, len(offsets) - 1)])
+
+        latency_ms = download_ms = 0
+        if self.realtime:
+            latency_ms = round(exchange.time_to_first_byte * 1000 / self.speed)
+            download_ms = round(
+                (exchange.duration - exchange.time_to_first_byte) * 1000 / self.speed
+            )
+        return MemoryResponse(
+            status=exchange.status,
+            headers=dict(exchange.headers),
+            error=exchange.error,
+            latency_ms=latency_ms,
+            chunks=[exchange.body],  # It is finished after the download time
+            chunk_delay_ms=download_ms,
+        )
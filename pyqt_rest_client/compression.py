@@ -0,0 +1,151 @@
+import asyncio
+import zlib
+from concurrent.futures import Executor
+from typing import Callable, Dict, Optional, Sequence, Tuple, Union
+
+from .auth import Headers
+from .reply import Reply, ReplyGotError
+from .upload import UploadBody
+from .validation import Buffer
+
+try:
+    import brotli
+except ImportError:  # pip install brotli
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pip install zstandard
+    zstandard = None
+
+# Decompresses the next chunk of the body
+Decompressor = Callable[[Buffer], bytes]
+
+
+class DecompressionError(ReplyGotError):
+    pass
+
+
+def _gzip(data: bytes) -> bytes:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+# Content-Encoding -> a new incremental decompressor
+# brotli and zstd are available if their optional packages are installed
+DECOMPRESSORS: Dict[str, Callable[[], Decompressor]] = {
+    # 32 + MAX_WBITS accepts both gzip and zlib headers
+    "gzip": lambda: zlib.decompressobj(32 + zlib.MAX_WBITS).decompress,
+    "deflate": lambda: zlib.decompressobj().decompress,
+}
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {"gzip": _gzip}
+
+if brotli is not None:
+    DECOMPRESSORS["br"] = lambda: brotli.Decompressor().process
+    COMPRESSORS["br"] = lambda data: brotli.compress(data, quality=5)
+
+if zstandard is not None:
+    DECOMPRESSORS["zstd"] = (
+        lambda: zstandard.ZstdDecompressor().decompressobj().decompress
+    )
+    COMPRESSORS["zstd"] = lambda data: zstandard.ZstdCompressor(level=3).compress(data)
+
+
+# Opt-in compression of a Request, see Request.compression
+# The reply encodings are asked by Accept-Encoding, the first one is preferred,
+# and the replies are decompressed before they are deserialized
+# The json bodies bigger than min_request_size are sent compressed by
+# request_encoding, the server should accept the Content-Encoding then
+# The bodies bigger than worker_min_size are (de)compressed in the executor,
+# zlib, brotli and zstandard release the GIL
+class Compression:
+    def __init__(
+        self,
+        accept: Optional[Sequence[str]] = None,  # All the available by default
+        request_encoding: Optional[str] = None,  # Request bodies are not compressed
+        min_request_size: int = 16 * 1024,  # bytes
+        worker_min_size: int = 256 * 1024,  # bytes
+        executor: Optional[Executor] = None,  # None is the asyncio default one
+    ):
+        if accept is None:
+            accept = [name for name in ("zstd", "br", "gzip") if name in DECOMPRESSORS]
+        for encoding in accept:
+            if encoding not in DECOMPRESSORS:
+                raise ValueError(f"Encoding '{encoding}' is not available")
+        if request_encoding is not None and request_encoding not in COMPRESSORS:
+            raise ValueError(f"Encoding '{request_encoding}' is not available")
+
+        self.accept = list(accept)
+        self.request_encoding = request_encoding
+        self.min_request_size = min_request_size
+        self.worker_min_size = worker_min_size
+        self.executor = executor
+        self._accept_headers = {b"Accept-Encoding": ", ".join(self.accept).encode()}
+
+    # Accept-Encoding, Qt decompresses gzip by itself only if it is not set
+    def request_headers(self) -> Headers:
+        return self._accept_headers
+
+    # Returns the body to send and the headers, uploads are sent as is
+    async def compress(
+        self, body: Union[bytes, UploadBody]
+    ) -> Tuple[Union[bytes, UploadBody], Headers]:
+        if (
+            self.request_encoding is None
+            or isinstance(body, UploadBody)
+            or len(body) < self.min_request_size
+        ):
+            return body, self._accept_headers
+
+        compress = COMPRESSORS[self.request_encoding]
+        if len(body) >= self.worker_min_size:
+            body = await self._in_worker(compress, body)
+        else:
+            body = compress(body)
+        return body, {
+            **self._accept_headers,
+            b"Content-Encoding": self.request_encoding.encode(),
+        }
+
+    # The body of the reply is replaced by the decompressed one
+    async def decompress(self, reply: Reply):
+        encoding = reply.header("Content-Encoding").strip().lower()
+        if encoding in ("", "identity") or not reply.body_size():
+            return
+
+        try:
+            decompress = self.decompressor(encoding)
+            if reply.body_size() >= self.worker_min_size:
+                data = await self._in_worker(decompress, reply.body())
+            else:
+                data = decompress(reply.body())
+        except ValueError as error:
+            raise DecompressionError(reply) from error
+
+        reply.data = data
+        if reply.metrics is not None:
+            reply.metrics.uncompressed_bytes_received = len(data)
+
+    # Decompresses the body chunk by chunk, like for Request.stream_get()
+    # Raises ValueError if the data is corrupted
+    def decompressor(self, encoding: str) -> Decompressor:
+        encoding = encoding.strip().lower()
+        if encoding in ("", "identity"):
+            return bytes
+        if encoding not in DECOMPRESSORS:
+            raise ValueError(f"Encoding '{encoding}' is not available")
+
+        decompress = DECOMPRESSORS[encoding]()
+
+        def checked(chunk: Buffer) -> bytes:
+            try:
+                return decompress(chunk)
+            except Exception as error:  # zlib.error, brotli.error, ZstdError
+                raise ValueError(f"The body is not valid {encoding}: {error}")
+
+        return checked
+
+    async def _in_worker(self, function, data):
+        return await asyncio.get_event_loop().run_in_executor(
+            self.executor, function, data
+        )
@@ -0,0 +1,53 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Optional, Union
+
+from .request import cast_data_to_resource
+from .validation import Buffer, json_dumps
+
+
+# Big replies are decoded in the executor, so the Qt event loop is not frozen
+# by json.loads and pydantic validation. Note that with ThreadPoolExecutor the
+# GIL is still shared with the GUI thread, ProcessPoolExecutor avoids it
+# but requires res_type to be picklable (defined on a module level)
+# Big json bodies of the requests are serialized in the executor too
+class DeserializationPool:
+    def __init__(
+        self,
+        executor: Optional[Executor],  # None is the default executor of the loop
+        min_size: int = 64 * 1024,
+        min_body_items: int = 1000,
+    ):
+        self.executor = executor
+        self.min_size = min_size  # Smaller replies are decoded inline, in bytes
+        # Bodies with less items, on the top and the next levels, are dumped inline
+        self.min_body_items = min_body_items
+
+    async def cast(
+        self, data: Buffer, res_type, cast_function: Callable = cast_data_to_resource
+    ):
+        if len(data) < self.min_size:
+            return cast_function(data, res_type)
+
+        if isinstance(self.executor, ProcessPoolExecutor):
+            data = bytes(data)  # memoryview can't be pickled
+
+        return await asyncio.get_event_loop().run_in_executor(
+            self.executor, cast_function, data, res_type
+        )
+
+    async def dumps(self, body: Union[list, dict]) -> bytes:
+        if _items_count(body) < self.min_body_items:
+            return json_dumps(body)
+
+        return await asyncio.get_event_loop().run_in_executor(
+            self.executor, json_dumps, body
+        )
+
+
+# The estimation of the body size that does not walk through the whole body
+def _items_count(body: Union[list, dict]) -> int:
+    values = body.values() if isinstance(body, dict) else body
+    return len(body) + sum(
+        len(value) for value in values if isinstance(value, (list, dict))
+    )
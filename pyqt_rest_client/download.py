@@ -0,0 +1,53 @@
+import hashlib
+import mmap
+from typing import BinaryIO, Optional, Union
+
+from .validation import Buffer
+
+
+class DownloadChecksumError(Exception):
+    pass
+
+
+# Writes the downloaded chunks to a file or to a pre-sized mmap
+# and calculates their sha256 on the fly, so the data is never kept in memory
+class DownloadWriter:
+    def __init__(self, destination: Union[str, mmap.mmap]):
+        self.destination = destination
+        self.size = 0  # Written bytes
+        self._sha256 = hashlib.sha256()
+        self._file: Optional[BinaryIO] = None
+        self._mmap: Optional[mmap.mmap] = None
+        if isinstance(destination, str):
+            self._file = open(destination, "wb")
+        else:
+            self._mmap = destination
+
+    def write(self, chunk: Buffer):
+        if self._file:
+            self._file.write(chunk)
+        elif self._mmap is not None:
+            start, end = self.size, self.size + len(chunk)
+            if end > len(self._mmap):
+                raise ValueError(
+                    f"The download is bigger than the mmap: {len(self._mmap)}"
+                )
+            self._mmap[start:end] = chunk
+
+        self._sha256.update(chunk)
+        self.size += len(chunk)
+
+    # The server sent the whole data instead of the requested range
+    def restart(self):
+        if self._file:
+            self._file.seek(0)
+            self._file.truncate()
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    def close(self):
+        if self._file:
+            self._file.close()
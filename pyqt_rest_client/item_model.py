@@ -0,0 +1,194 @@
+import asyncio
+from bisect import bisect_right
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+
+from .asyncio_integration import start_task
+from .pagination import OffsetPagination, Page, fetch_page
+from .reply import ReplyGotError
+from .request import Request, list_item_type
+from .scheduler import Priority
+from .sync import field
+
+
+# The fields of the pydantic model, in their order
+def model_fields(item_type) -> List[str]:
+    fields = getattr(item_type, "__fields__", None)
+    if fields is None:
+        raise ValueError(f"columns should be set for the items of '{item_type}'")
+    return list(fields)
+
+
+# The value of the field, or of the nested field like "category.name"
+def column_value(item, column: str):
+    for name in column.split("."):
+        if item is None:
+            return None
+        item = field(item, name)
+    return item
+
+
+# Qt views show the plain values, the rest is shown as its text
+def display_value(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+# The table of the items of a paginated list endpoint, for QTableView or
+# QListView (the first column). The rows are appended page by page as the view
+# scrolls to them, by canFetchMore()/fetchMore(), so the first rows are shown
+# before the rest of the collection is fetched
+# Only up to max_pages pages are kept in memory, the least recently shown ones
+# are evicted, and fetched again if the view shows them again, their rows are
+# empty meanwhile. So max_pages should take more rows than the view shows
+# The columns are the fields of the items, like ["id", "name", "category.name"],
+# all the fields of the pydantic model of res_type (List[Pet]) by default
+# The item of the row is the data of ItemRole
+class PagedTableModel(QAbstractTableModel):
+    ItemRole = Qt.UserRole
+    fetch_failed = pyqtSignal(object)  # ReplyGotError
+
+    def __init__(
+        self,
+        request: Request,
+        columns: Optional[List[str]] = None,
+        pagination=None,
+        max_pages: int = 10,
+        descr: str = "",
+        priority: Priority = Priority.INTERACTIVE,
+        parent=None,
+    ):
+        super().__init__(parent)
+        if max_pages < 1:
+            raise ValueError(f"max_pages: {max_pages} should be positive")
+        self.request = request
+        self.columns = columns or model_fields(list_item_type(request.res_type))
+        self.pagination = pagination or OffsetPagination()
+        self.max_pages = max_pages
+        self.descr = descr
+        self.priority = priority
+        self._pages: "OrderedDict[int, list]" = OrderedDict()  # Least recent first
+        # Every fetched page without its items, to fetch the next or the evicted
+        # pages by their cursors, and the first rows of the pages
+        self._fetched: List[Page] = []
+        self._starts: List[int] = []
+        self._row_count = 0
+        self._fetching: Dict[int, "asyncio.Task[None]"] = {}  # By page index
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.columns[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if role not in (Qt.DisplayRole, Qt.EditRole, self.ItemRole):
+            return None
+        item = self.item(index.row())
+        if item is None or role == self.ItemRole:
+            return item
+        return display_value(column_value(item, self.columns[index.column()]))
+
+    # The item of the row, None if its page is not in memory, it is fetched then
+    def item(self, row: int) -> Any:
+        if not 0 <= row < self._row_count:
+            return None
+        index = bisect_right(self._starts, row) - 1
+        items = self._pages.get(index)
+        if items is None:
+            self._fetch(index)
+            return None
+        self._pages.move_to_end(index)
+        offset = row - self._starts[index]
+        return items[offset] if offset < len(items) else None
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if parent.isValid():
+            return False
+        return not self._fetched or not self._fetched[-1].is_last
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if self.canFetchMore(parent):
+            self._fetch(len(self._fetched))
+
+    # Forgets all the rows, like if the collection is changed, the view fetches
+    # them again
+    def reset(self):
+        for task in self._fetching.values():
+            task.cancel()
+        self.beginResetModel()
+        self._pages.clear()
+        self._fetched.clear()
+        self._starts.clear()
+        self._row_count = 0
+        self._fetching.clear()
+        self.endResetModel()
+
+    def _fetch(self, index: int):
+        if index not in self._fetching:
+            self._fetching[index] = start_task(self._fetch_page(index))
+
+    async def _fetch_page(self, index: int):
+        previous = self._fetched[index - 1] if index else None
+        try:
+            page = await fetch_page(
+                self.request,
+                self.pagination,
+                index,
+                previous,
+                self.descr,
+                self.priority,
+            )
+        except ReplyGotError as error:
+            self.fetch_failed.emit(error)
+            return
+        finally:
+            if self._fetching.get(index) is asyncio.current_task():  # Not reset
+                del self._fetching[index]
+
+        if index == len(self._fetched):
+            self._append_page(index, page)
+        else:
+            self._refill_page(index, page)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def _append_page(self, index: int, page: Page):
+        start = self._row_count
+        if page.items:
+            self.beginInsertRows(QModelIndex(), start, start + len(page.items) - 1)
+        self._pages[index] = page.items
+        self._starts.append(start)
+        self._row_count += len(page.items)
+        page_link = Page([], page.size, page.next_page)
+        page_link.is_last = page.is_last
+        self._fetched.append(page_link)
+        if page.items:
+            self.endInsertRows()
+
+    # The evicted page is fetched again, its rows stay, even if the collection
+    # is changed since it was fetched the first time
+    def _refill_page(self, index: int, page: Page):
+        start = self._starts[index]
+        end = (
+            self._starts[index + 1]
+            if index + 1 < len(self._starts)
+            else self._row_count
+        )
+        if end == start:
+            return
+        self._pages[index] = page.items[: end - start]
+        self.dataChanged.emit(
+            self.index(start, 0), self.index(end - 1, len(self.columns) - 1)
+        )
@@ -0,0 +1,81 @@
+import codecs
+import json
+from typing import Any, List
+
+
+# Decodes items of a top level json array while it is received chunk by chunk
+# Only the not yet decoded tail of the array is kept in memory
+class JsonArrayDecoder:
+    def __init__(self):
+        self._bytes_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False  # '[' is found
+        self._finished = False  # ']' is found
+        self._expect_item = True  # Otherwise ',' or ']' is expected
+        self._has_items = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        self._buffer += self._bytes_decoder.decode(chunk)
+        items = []
+        pos = 0
+
+        while True:
+            pos = self._skip_whitespaces(pos)
+            if pos == len(self._buffer):
+                break
+
+            char = self._buffer[pos]
+            if self._finished:
+                raise ValueError(f"Extra data after the json array: '{char}'")
+
+            if not self._started:
+                if char != "[":
+                    raise ValueError(f"Json array expected, got: '{char}'")
+                self._started = True
+                pos += 1
+
+            elif char == "]" and (not self._expect_item or not self._has_items):
+                self._finished = True
+                pos += 1
+
+            elif not self._expect_item:
+                if char != ",":
+                    raise ValueError(f"',' or ']' expected, got: '{char}'")
+                self._expect_item = True
+                pos += 1
+
+            else:
+                try:
+                    item, end = self._json_decoder.raw_decode(self._buffer, pos)
+                except json.JSONDecodeError:
+                    break  # The item is not fully received yet
+
+                # Numbers can be cut by the chunk border, like 12|3 or 12.|3
+                # So the item is taken only when the separator after it is received
+                next_pos = self._skip_whitespaces(end)
+                if next_pos == len(self._buffer):
+                    break
+                if self._buffer[next_pos] not in ",]":
+                    if next_pos == end and isinstance(item, (int, float)):
+                        break
+                    raise ValueError(
+                        f"',' or ']' expected, got: '{self._buffer[next_pos]}'"
+                    )
+
+                items.append(item)
+                self._has_items = True
+                self._expect_item = False
+                pos = end
+
+        self._buffer = self._buffer[pos:]
+        return items
+
+    def close(self):
+        if not self._finished:
+            raise ValueError(f"Json array is not complete: '{self._buffer[:100]}'")
+
+    def _skip_whitespaces(self, pos: int) -> int:
+        while pos < len(self._buffer) and self._buffer[pos] in " \t\n\r":
+            pos += 1
+        return pos
@@ -0,0 +1,273 @@
+import json
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Pattern, Tuple, Union
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from PyQt5.QtCore import QByteArray, QIODevice, Qt, QTimer, QUrl
+from PyQt5.QtNetwork import QNetworkReply, QNetworkRequest
+
+from .network_threads import ThreadedReply, Transport
+from .reply import OPERATIONS
+
+# QNetworkReply errors of the HTTP codes, like QNetworkAccessManager sets them
+HTTP_ERRORS = {
+    401: QNetworkReply.AuthenticationRequiredError,
+    403: QNetworkReply.ContentAccessDenied,
+    404: QNetworkReply.ContentNotFoundError,
+    405: QNetworkReply.ContentOperationNotPermittedError,
+    407: QNetworkReply.ProxyAuthenticationRequiredError,
+    409: QNetworkReply.ContentConflictError,
+    410: QNetworkReply.ContentGoneError,
+    418: QNetworkReply.ProtocolInvalidOperationError,
+    500: QNetworkReply.InternalServerError,
+    501: QNetworkReply.OperationNotImplementedError,
+    503: QNetworkReply.ServiceUnavailableError,
+}
+
+
+def http_error(status: int) -> int:
+    if status < 400:
+        return QNetworkReply.NoError
+    if status in HTTP_ERRORS:
+        return HTTP_ERRORS[status]
+    if status < 500:
+        return QNetworkReply.UnknownContentError
+    return QNetworkReply.UnknownServerError
+
+
+# The request as MemoryTransport received it, it is passed to the handlers
+class MemoryRequest:
+    def __init__(self, operation: str, request: QNetworkRequest, body: bytes):
+        self.operation = operation  # "GET", "POST" and so on
+        self.url = request.url().toString(QUrl.FullyEncoded)
+        self.body = body
+        self.params: Dict[str, str] = {}  # Of the path template of the route
+        self._request = request
+
+    # The headers and the query are parsed only if the handler needs them
+    @property
+    def headers(self) -> Dict[bytes, bytes]:
+        return {
+            bytes(name): bytes(self._request.rawHeader(name))
+            for name in self._request.rawHeaderList()
+        }
+
+    @property
+    def query(self) -> Dict[str, str]:
+        return dict(parse_qsl(urlsplit(self.url).query, keep_blank_values=True))
+
+    def json(self):
+        return json.loads(self.body)
+
+
+# The reply that MemoryTransport sends, the body can be bytes, str, or a list
+# or a dict that is dumped to json. chunks are sent one by one after
+# chunk_delay_ms each, like a streamed reply
+# error is set by the status like Qt does it, if it is not set, like
+# MemoryResponse(status=None, error=QNetworkReply.ConnectionRefusedError)
+class MemoryResponse:
+    def __init__(
+        self,
+        body: Union[bytes, str, list, dict] = b"",
+        status: Optional[int] = 200,  # None for network errors, without a reply
+        headers: Optional[Dict[str, str]] = None,  # Sent as latin-1, like Qt
+        error: Optional[int] = None,  # QNetworkReply.NetworkError
+        latency_ms: Optional[int] = None,  # MemoryTransport.latency_ms by default
+        chunks: Optional[Iterable[bytes]] = None,  # Instead of the body
+        chunk_delay_ms: int = 0,
+    ):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        elif isinstance(body, (list, dict)):
+            body = json.dumps(body).encode("utf-8")
+        self.body = body
+        self.status = status
+        self.headers = headers or {}
+        if error is None:
+            error = QNetworkReply.NoError if status is None else http_error(status)
+        self.error = error
+        self.latency_ms = latency_ms
+        self.chunks = chunks
+        self.chunk_delay_ms = chunk_delay_ms
+
+
+Handler = Callable[[MemoryRequest], MemoryResponse]
+
+
+# The route matches urls by a template like "pet/{id}", its params are put
+# into MemoryRequest.params. Relative templates match the end of the url path,
+# absolute ones, like "http://server/api/pet/{id}", the whole url
+# If the template has a query, the query of the url should be the same,
+# in any order. The trailing "/" is optional
+# A compiled regex is matched with the whole url, including the query
+class _Route:
+    def __init__(
+        self,
+        operation: str,
+        template: Union[str, Pattern],
+        response: Union[MemoryResponse, Handler],
+    ):
+        self.operation = operation
+        self.response = response
+        self.query: Optional[List[Tuple[str, str]]] = None
+        self.is_absolute = False
+
+        if isinstance(template, Pattern):
+            self.pattern = template
+            self.is_regex = True
+            return
+
+        self.is_regex = False
+        template, _, query = template.partition("?")
+        if query:
+            self.query = sorted(parse_qsl(query, keep_blank_values=True))
+        self.is_absolute = bool(urlsplit(template).scheme)
+        regex = "".join(
+            f"(?P<{piece[1:-1]}>[^/]+)" if piece.startswith("{") else re.escape(piece)
+            for piece in re.split(r"(\{\w+\})", template.rstrip("/"))
+        )
+        prefix = "" if self.is_absolute else r"(?:.*/)?"
+        self.pattern = re.compile(f"{prefix}{regex}/?")
+
+    def match(self, request: MemoryRequest) -> bool:
+        if self.operation != request.operation:
+            return False
+
+        if self.is_regex:
+            match = self.pattern.fullmatch(request.url)
+        else:
+            parts = urlsplit(request.url)
+            if self.is_absolute:
+                match = self.pattern.fullmatch(
+                    f"{parts.scheme}://{parts.netloc}{parts.path}"
+                )
+            else:
+                match = self.pattern.fullmatch(parts.path)
+            if match is not None and self.query is not None:
+                if self.query != sorted(parse_qsl(parts.query, keep_blank_values=True)):
+                    return False
+
+        if match is None:
+            return False
+        request.params = {
+            name: unquote(value) for name, value in match.groupdict().items()
+        }
+        return True
+
+    def respond(self, request: MemoryRequest) -> MemoryResponse:
+        if isinstance(self.response, MemoryResponse):
+            return self.response
+        return self.response(request)
+
+
+# In-memory transport that is set as client.network_manager, or as the network
+# manager of a Client, instead of QNetworkAccessManager. No sockets are used:
+# the requests are matched with the routes, the last added route first, and
+# replied after the simulated latency. The replies are usual QNetworkReplies
+# for the rest of the code, like ThreadedReply, so all the features, retries,
+# streaming and so on, work as with the network
+# The not matched requests are replied by 404 ContentNotFoundError
+class MemoryTransport(Transport):
+    def __init__(self, latency_ms: int = 0):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self.requests: List[MemoryRequest] = []  # All the received ones
+        self._routes: List[_Route] = []
+        self._timers: Dict[int, QTimer] = {}
+
+    # response is a MemoryResponse or a function that returns it by the request
+    def add(
+        self,
+        operation: str,
+        template: Union[str, Pattern],
+        response: Union[MemoryResponse, Handler],
+    ):
+        if operation not in OPERATIONS[1:]:
+            raise ValueError(f"operation: '{operation}' is not one of {OPERATIONS[1:]}")
+        self._routes.append(_Route(operation, template, response))
+
+    # The transport with the same routes, like for another Client
+    # The routes are shared, but the received requests are not
+    def clone(self) -> "MemoryTransport":
+        transport = MemoryTransport(self.latency_ms)
+        transport._routes = self._routes
+        return transport
+
+    def clear(self):
+        self._routes.clear()
+        self.requests.clear()
+
+    def _send(self, operation: int, request: QNetworkRequest, data) -> ThreadedReply:
+        reply = self._reply(operation, request)
+        ticket = reply._ticket
+
+        if isinstance(data, QIODevice):
+            data = data.readAll().data()
+        memory_request = MemoryRequest(OPERATIONS[operation], request, data or b"")
+        self.requests.append(memory_request)
+
+        for route in reversed(self._routes):
+            if route.match(memory_request):
+                response = route.respond(memory_request)
+                break
+        else:
+            response = self._unrouted(memory_request)
+
+        latency_ms = self.latency_ms
+        if response.latency_ms is not None:
+            latency_ms = response.latency_ms
+        chunks = iter(() if response.chunks is None else response.chunks)
+
+        def headers():
+            if response.status is not None:  # Network errors have no reply
+                reply._set_meta_data(
+                    response.status,
+                    [
+                        (
+                            QByteArray(name.encode("latin-1")),
+                            QByteArray(value.encode("latin-1")),
+                        )
+                        for name, value in response.headers.items()
+                    ],
+                )
+            # The body that is not streamed is sent at once, without more timers
+            if response.chunks is None and response.body and not reply.isFinished():
+                reply._append(QByteArray(response.body))
+            if not reply.isFinished():  # It can be aborted by the handlers
+                next_chunk()
+
+        def next_chunk():
+            chunk = next(chunks, None)
+            if chunk is None:
+                self._timers.pop(ticket).deleteLater()
+                reply._finish(response.error, f"MemoryTransport: {response.status}")
+                return
+            if chunk:
+                reply._append(QByteArray(chunk))
+            if not reply.isFinished():
+                self._schedule(ticket, response.chunk_delay_ms, next_chunk)
+
+        self._schedule(ticket, latency_ms, headers)
+        return reply
+
+    # The response to the request that no route matched
+    def _unrouted(self, request: MemoryRequest) -> MemoryResponse:
+        return MemoryResponse(b"", 404)
+
+    def _schedule(self, ticket: int, delay_ms: int, callback: Callable[[], None]):
+        timer = self._timers.get(ticket)
+        if timer is None:
+            timer = self._timers[ticket] = QTimer(self)
+            timer.setSingleShot(True)
+            timer.setTimerType(Qt.PreciseTimer)
+        else:
+            timer.timeout.disconnect()
+        timer.timeout.connect(callback)
+        timer.start(delay_ms)
+
+    # ThreadedReply calls them
+    def _abort(self, ticket: int):
+        timer = self._timers.pop(ticket, None)
+        if timer is not None:
+            timer.stop()
+            timer.deleteLater()
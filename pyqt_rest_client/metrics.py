@@ -0,0 +1,163 @@
+import bisect
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# Phases of the request, all of them are in seconds
+# Qt5 does not report DNS and connection timings of a reply, so they are
+# included into time_to_first_byte (from the request start to the reply headers)
+PHASES = (
+    "queue_wait",
+    "time_to_first_byte",
+    "download",
+    "json_parse",
+    "validation",
+    "total",
+)
+
+
+class RequestMetrics:
+    def __init__(self, template: str, url: str, operation: str, bytes_sent: int):
+        self.template = template
+        self.url = url
+        self.operation = operation
+        self.http_code: Optional[int] = None
+        self.retries = 0
+        # Of the bodies as they are sent, compressed if Request.compression is set
+        self.bytes_sent = bytes_sent
+        self.bytes_received = 0
+        # Of the bodies before compression and after decompression
+        self.uncompressed_bytes_sent = bytes_sent
+        self.uncompressed_bytes_received = 0
+
+        self.queue_wait = 0.0
+        self.time_to_first_byte = 0.0
+        self.download = 0.0
+        self.json_parse = 0.0
+        self.validation = 0.0
+
+    @property
+    def total(self) -> float:
+        return sum(getattr(self, phase) for phase in PHASES[:-1])
+
+    def as_dict(self) -> dict:
+        return {
+            **{
+                name: getattr(self, name)
+                for name in (
+                    "template",
+                    "url",
+                    "operation",
+                    "http_code",
+                    "retries",
+                    "bytes_sent",
+                    "bytes_received",
+                    "uncompressed_bytes_sent",
+                    "uncompressed_bytes_received",
+                )
+            },
+            **{phase: getattr(self, phase) for phase in PHASES},
+        }
+
+
+# Upper bounds of the histogram buckets in seconds, the last one is for the rest
+BUCKETS = (
+    0.001,
+    0.002,
+    0.005,
+    0.01,
+    0.02,
+    0.05,
+    0.1,
+    0.2,
+    0.5,
+    1.0,
+    2.0,
+    5.0,
+    10.0,
+    float("inf"),
+)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts: List[int] = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    # The upper bound of the bucket with the percentile, like 0.95
+    def percentile(self, fraction: float) -> float:
+        threshold = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if count and seen >= threshold:
+                return min(bound, self.max)
+        return 0.0
+
+
+class EndpointStats:
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = {phase: Histogram() for phase in PHASES}
+        self.http_codes: Dict[Optional[int], int] = defaultdict(int)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.uncompressed_bytes_sent = 0
+        self.uncompressed_bytes_received = 0
+
+
+# Ids in urls, like pet/123, are replaced, so such urls are aggregated together
+def endpoint_template(url: str) -> str:
+    path = urlparse(url).path
+    return re.sub(r"/(\d+|[0-9a-fA-F-]{32,36})(?=/|$)", "/{id}", path)
+
+
+# Is set to client.metrics to measure the requests, it is None by default
+# so there is no overhead if the metrics are not needed
+class MetricsCollector(QObject):
+    request_measured = pyqtSignal(object)  # RequestMetrics
+
+    def __init__(self):
+        super().__init__()
+        self.endpoints: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+
+    def record(self, metrics: RequestMetrics):
+        stats = self.endpoints[metrics.template]
+        for phase in PHASES:
+            stats.histograms[phase].add(getattr(metrics, phase))
+        stats.http_codes[metrics.http_code] += 1
+        stats.bytes_sent += metrics.bytes_sent
+        stats.bytes_received += metrics.bytes_received
+        stats.uncompressed_bytes_sent += metrics.uncompressed_bytes_sent
+        stats.uncompressed_bytes_received += metrics.uncompressed_bytes_received
+
+        self.request_measured.emit(metrics)
+
+    # {template: {phase: {"count", "mean", "p50", "p95", "max"}}}
+    def summary(self) -> dict:
+        return {
+            template: {
+                phase: {
+                    "count": histogram.count,
+                    "mean": histogram.mean(),
+                    "p50": histogram.percentile(0.5),
+                    "p95": histogram.percentile(0.95),
+                    "max": histogram.max,
+                }
+                for phase, histogram in stats.histograms.items()
+            }
+            for template, stats in self.endpoints.items()
+        }
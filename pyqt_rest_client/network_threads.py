@@ -0,0 +1,398 @@
+import itertools
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple, Union
+
+from PyQt5.QtCore import (
+    QBuffer,
+    QByteArray,
+    QCoreApplication,
+    QFile,
+    QIODevice,
+    QObject,
+    Qt,
+    QThread,
+    pyqtSignal,
+    pyqtSlot,
+)
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
+
+# Bodies are sent to the worker threads as data, Qt devices can't be shared
+# between threads: a file is opened again in the worker by its name
+WorkerBody = Union[QByteArray, bytes, Tuple[str, str]]  # ("file", name)
+
+
+# Lives in the network thread, owns its QNetworkAccessManager and replies
+# and sends their events back to the GUI thread with the ticket of the request
+class _NetworkWorker(QObject):
+    # They are emitted from the GUI thread, so the slots are queued to the worker
+    send_requested = pyqtSignal(int, int, object, object)
+    abort_requested = pyqtSignal(int)
+    stream_requested = pyqtSignal(int)
+    stop_requested = pyqtSignal()
+
+    meta_data_changed = pyqtSignal(int, object)  # ticket, (http_code, headers)
+    ready_read = pyqtSignal(int, object)  # ticket, QByteArray
+    download_progress = pyqtSignal(int, object, object)  # ticket, received, total
+    upload_progress = pyqtSignal(int, object, object)  # ticket, sent, total
+    encrypted = pyqtSignal(int)  # ticket
+    finished = pyqtSignal(int, int, str)  # ticket, QNetworkReply error, its string
+
+    def __init__(self):
+        super().__init__()
+        self._manager: Optional[QNetworkAccessManager] = None
+        self._replies: Dict[int, QNetworkReply] = {}
+        self.send_requested.connect(self.send)
+        self.abort_requested.connect(self.abort)
+        self.stream_requested.connect(self.stream)
+
+    @pyqtSlot(int, int, object, object)
+    def send(self, ticket: int, operation: int, request: QNetworkRequest, body):
+        if self._manager is None:  # It is created in the thread of the worker
+            self._manager = QNetworkAccessManager(self)
+
+        if operation == QNetworkAccessManager.GetOperation:
+            reply = self._manager.get(request)
+        elif operation == QNetworkAccessManager.DeleteOperation:
+            reply = self._manager.deleteResource(request)
+        elif operation == QNetworkAccessManager.HeadOperation:
+            reply = self._manager.head(request)
+        else:
+            device = _open_body(body)
+            if operation == QNetworkAccessManager.PostOperation:
+                reply = self._manager.post(request, device)
+            else:
+                reply = self._manager.put(request, device)
+            device.setParent(reply)
+
+        # The slots are methods of the worker, so they are called in its thread
+        reply.setProperty("ticket", ticket)
+        self._replies[ticket] = reply
+        reply.metaDataChanged.connect(self._on_meta_data_changed)
+        reply.uploadProgress.connect(self._on_upload_progress)
+        reply.encrypted.connect(self._on_encrypted)
+        reply.finished.connect(self._on_finished)
+
+    @pyqtSlot(int)
+    def abort(self, ticket: int):
+        reply = self._replies.pop(ticket, None)
+        if reply is not None:
+            self._forget(reply)
+            reply.abort()
+
+    # The data is sent to the GUI thread as it is received, not only when finished
+    # Every chunk takes the GIL there, so it is done only for the streamed replies
+    @pyqtSlot(int)
+    def stream(self, ticket: int):
+        reply = self._replies.get(ticket)
+        if reply is not None:
+            reply.readyRead.connect(self._on_ready_read)
+            reply.downloadProgress.connect(self._on_download_progress)
+
+    # Is called before the thread is stopped
+    @pyqtSlot()
+    def stop(self):
+        for ticket in list(self._replies):
+            self.abort(ticket)
+
+    def _forget(self, reply: QNetworkReply):
+        reply.disconnect()
+        reply.deleteLater()
+
+    @pyqtSlot()
+    def _on_meta_data_changed(self):
+        reply = self.sender()
+        self.meta_data_changed.emit(
+            reply.property("ticket"),
+            (
+                reply.attribute(QNetworkRequest.HttpStatusCodeAttribute),
+                reply.rawHeaderPairs(),
+            ),
+        )
+
+    @pyqtSlot()
+    def _on_ready_read(self):
+        reply = self.sender()
+        self.ready_read.emit(reply.property("ticket"), reply.readAll())
+
+    @pyqtSlot("qint64", "qint64")
+    def _on_download_progress(self, received: int, total: int):
+        self.download_progress.emit(self.sender().property("ticket"), received, total)
+
+    @pyqtSlot("qint64", "qint64")
+    def _on_upload_progress(self, sent: int, total: int):
+        self.upload_progress.emit(self.sender().property("ticket"), sent, total)
+
+    @pyqtSlot()
+    def _on_encrypted(self):
+        self.encrypted.emit(self.sender().property("ticket"))
+
+    @pyqtSlot()
+    def _on_finished(self):
+        reply = self.sender()
+        ticket = reply.property("ticket")
+        self._replies.pop(ticket, None)
+        data = reply.readAll()
+        if data.size():
+            self.ready_read.emit(ticket, data)
+        self.finished.emit(ticket, reply.error(), reply.errorString())
+        self._forget(reply)
+
+
+def _open_body(body: WorkerBody) -> QIODevice:
+    if isinstance(body, tuple):
+        device = QFile(body[1])
+    else:
+        device = QBuffer()
+        device.setData(QByteArray(body))
+    device.open(QIODevice.ReadOnly)
+    return device
+
+
+# The GUI thread side of the reply that is sent in a network thread
+# It is a usual QNetworkReply for the rest of the code: its data, headers,
+# errors and signals are filled and emitted from the events of the worker
+class ThreadedReply(QNetworkReply):
+    def __init__(
+        self,
+        manager: "Transport",
+        ticket: int,
+        operation: int,
+        request: QNetworkRequest,
+    ):
+        super().__init__()
+        self._manager = manager
+        self._ticket = ticket
+        self._chunks: Deque[QByteArray] = deque()  # Received, but not read
+        self._size = 0
+        self.setRequest(request)
+        self.setUrl(request.url())
+        self.setOperation(operation)
+        self.open(QIODevice.ReadOnly | QIODevice.Unbuffered)
+
+    def isSequential(self) -> bool:
+        return True
+
+    def bytesAvailable(self) -> int:
+        return self._size + super().bytesAvailable()
+
+    # The readers of the data by chunks set it, see Request.stream_get()
+    def setReadBufferSize(self, size: int):
+        super().setReadBufferSize(size)
+        self._manager._stream(self._ticket)
+
+    def readData(self, max_size: int) -> bytes:
+        if not self._chunks:
+            return b""
+        chunk = self._chunks.popleft()
+        if chunk.size() > max_size:
+            self._chunks.appendleft(chunk.mid(max_size))
+            chunk = chunk.left(max_size)
+        self._size -= chunk.size()
+        return chunk.data()
+
+    # It is faster than QIODevice.readAll(), the received data is not copied
+    def readAll(self) -> QByteArray:
+        data = self._chunks.popleft() if len(self._chunks) == 1 else QByteArray()
+        while self._chunks:
+            data.append(self._chunks.popleft())
+        self._size = 0
+        return data
+
+    def abort(self):
+        if not self.isFinished():
+            self._manager._abort(self._ticket)
+            self._finish(QNetworkReply.OperationCanceledError, "Operation canceled")
+
+    def _set_meta_data(self, http_code: Optional[int], headers: list):
+        if http_code is not None:
+            self.setAttribute(QNetworkRequest.HttpStatusCodeAttribute, http_code)
+        for name, value in headers:
+            self.setRawHeader(name, value)
+        self.metaDataChanged.emit()
+
+    def _append(self, data: QByteArray):
+        self._chunks.append(data)
+        self._size += data.size()
+        self.readyRead.emit()
+
+    def _finish(self, error: int, error_string: str):
+        if error != QNetworkReply.NoError:
+            self.setError(error, error_string)
+        self.setFinished(True)
+        self.finished.emit()
+
+
+# The base of the transports that are used instead of QNetworkAccessManager and
+# reply with ThreadedReply: ThreadedNetworkManager, MemoryTransport and so on
+# The subclasses implement _send(), fill the replies by their _set_meta_data(),
+# _append() and _finish(), and implement _abort() and _stream() of the tickets,
+# that ThreadedReply calls
+class Transport(QObject):
+    def __init__(self):
+        super().__init__()
+        self._tickets = itertools.count()
+
+    def get(self, request: QNetworkRequest) -> ThreadedReply:
+        return self._send(QNetworkAccessManager.GetOperation, request, None)
+
+    def head(self, request: QNetworkRequest) -> ThreadedReply:
+        return self._send(QNetworkAccessManager.HeadOperation, request, None)
+
+    def deleteResource(self, request: QNetworkRequest) -> ThreadedReply:
+        return self._send(QNetworkAccessManager.DeleteOperation, request, None)
+
+    def post(self, request: QNetworkRequest, data) -> ThreadedReply:
+        return self._send(QNetworkAccessManager.PostOperation, request, data)
+
+    def put(self, request: QNetworkRequest, data) -> ThreadedReply:
+        return self._send(QNetworkAccessManager.PutOperation, request, data)
+
+    # The Qt disk cache works only with QNetworkAccessManager
+    def setCache(self, cache):
+        if cache is not None:
+            raise ValueError(
+                f"The disk cache is not supported by {type(self).__name__}"
+            )
+
+    def _reply(self, operation: int, request: QNetworkRequest) -> ThreadedReply:
+        return ThreadedReply(self, next(self._tickets), operation, request)
+
+    def _send(self, operation: int, request: QNetworkRequest, data) -> ThreadedReply:
+        raise NotImplementedError
+
+    def _abort(self, ticket: int):
+        raise NotImplementedError
+
+    def _stream(self, ticket: int):
+        pass  # The data is appended to the reply as it is received by default
+
+
+# Sends the requests from QNetworkAccessManagers that run in dedicated QThreads,
+# so the network I/O and the Qt reply internals do not compete with painting.
+# The replies are ThreadedReply, so it is used instead of client.network_manager,
+# see client.use_network_threads()
+# The data of the replies is moved to the GUI thread when they are finished,
+# or as it is received if setReadBufferSize() is called, but it does not limit
+# the download then
+class ThreadedNetworkManager(Transport):
+    def __init__(self, threads_count: int = 1):
+        super().__init__()
+        self._replies: Dict[int, ThreadedReply] = {}
+        self._threads: List[QThread] = []
+        self._workers: List[_NetworkWorker] = []
+        self._in_flight: Dict[int, int] = {}  # Ticket -> the worker index
+
+        for _ in range(threads_count):
+            thread = QThread()
+            worker = _NetworkWorker()
+            worker.moveToThread(thread)
+            worker.stop_requested.connect(worker.stop, Qt.BlockingQueuedConnection)
+            thread.finished.connect(worker.deleteLater)
+
+            worker.meta_data_changed.connect(self._on_meta_data_changed)
+            worker.ready_read.connect(self._on_ready_read)
+            worker.download_progress.connect(self._on_download_progress)
+            worker.upload_progress.connect(self._on_upload_progress)
+            worker.encrypted.connect(self._on_encrypted)
+            worker.finished.connect(self._on_finished)
+
+            thread.start()
+            self._threads.append(thread)
+            self._workers.append(worker)
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def threads(self) -> List[QThread]:
+        return list(self._threads)
+
+    def in_flight_count(self) -> int:
+        return len(self._replies)
+
+    # Stops the threads, the requests in flight are aborted
+    def shutdown(self):
+        for reply in list(self._replies.values()):
+            reply.abort()
+        for worker, thread in zip(self._workers, self._threads):
+            worker.stop_requested.emit()  # Waits for it
+            thread.quit()
+            thread.wait()
+        self._threads.clear()
+        self._workers.clear()
+
+    def _send(self, operation: int, request: QNetworkRequest, data) -> ThreadedReply:
+        if not self._workers:
+            raise ValueError("The network threads are shut down")
+
+        reply = self._reply(operation, request)
+        ticket = reply._ticket
+        self._replies[ticket] = reply
+
+        # The least busy worker gets the request
+        loads = [0] * len(self._workers)
+        for index in self._in_flight.values():
+            loads[index] += 1
+        index = loads.index(min(loads))
+        self._in_flight[ticket] = index
+
+        self._workers[index].send_requested.emit(
+            ticket, operation, QNetworkRequest(request), _worker_body(data)
+        )
+        return reply
+
+    def _stream(self, ticket: int):
+        index = self._in_flight.get(ticket)
+        if index is not None:
+            self._workers[index].stream_requested.emit(ticket)
+
+    def _abort(self, ticket: int):
+        index = self._in_flight.pop(ticket, None)
+        self._replies.pop(ticket, None)
+        if index is not None and index < len(self._workers):
+            self._workers[index].abort_requested.emit(ticket)
+
+    @pyqtSlot(int, object)
+    def _on_meta_data_changed(self, ticket: int, meta_data):
+        if ticket in self._replies:
+            self._replies[ticket]._set_meta_data(*meta_data)
+
+    @pyqtSlot(int, object)
+    def _on_ready_read(self, ticket: int, data: QByteArray):
+        if ticket in self._replies:
+            self._replies[ticket]._append(data)
+
+    @pyqtSlot(int, object, object)
+    def _on_download_progress(self, ticket: int, received: int, total: int):
+        if ticket in self._replies:
+            self._replies[ticket].downloadProgress.emit(received, total)
+
+    @pyqtSlot(int, object, object)
+    def _on_upload_progress(self, ticket: int, sent: int, total: int):
+        if ticket in self._replies:
+            self._replies[ticket].uploadProgress.emit(sent, total)
+
+    @pyqtSlot(int)
+    def _on_encrypted(self, ticket: int):
+        if ticket in self._replies:
+            self._replies[ticket].encrypted.emit()
+
+    @pyqtSlot(int, int, str)
+    def _on_finished(self, ticket: int, error: int, error_string: str):
+        self._in_flight.pop(ticket, None)
+        reply = self._replies.pop(ticket, None)
+        if reply is not None:
+            reply._finish(error, error_string)
+
+
+# The devices of the GUI thread are read here, except files
+def _worker_body(data) -> WorkerBody:
+    if data is None:
+        return b""
+    elif isinstance(data, QFile):
+        return "file", data.fileName()
+    elif isinstance(data, QBuffer):
+        return data.data()
+    elif isinstance(data, QIODevice):
+        return data.readAll()
+    return bytes(data)
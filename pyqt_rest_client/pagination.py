@@ -0,0 +1,224 @@
+import asyncio
+import copy
+import re
+from collections import deque
+from typing import Any, AsyncIterator, Deque, List, Optional
+from urllib.parse import parse_qsl, urljoin, urlsplit, urlunsplit
+
+from .reply import Reply
+from .request import Request, cast_item, list_item_type
+from .scheduler import Priority
+from .url import query
+
+
+class Page:
+    def __init__(self, items: list, size: int, next_page: Any = None):
+        self.items = items
+        self.size = size  # Of the reply body, in bytes
+        self.next_page: Any = next_page  # The cursor or the url of the next page
+        self.is_last = False
+
+
+# Pages are requested by offset=<index * limit>&limit=<limit>, so their urls
+# are known beforehand and they are prefetched concurrently
+# The page with less than limit items is the last one
+# res_type of the request is the list of items, like List[Pet]
+class OffsetPagination:
+    needs_previous_page = False
+
+    def __init__(
+        self, limit: int = 100, offset_param: str = "offset", limit_param: str = "limit"
+    ):
+        self.limit = limit
+        self.offset_param = offset_param
+        self.limit_param = limit_param
+
+    def page_url(self, url: str, index: int, previous: Optional[Page]) -> str:
+        return with_query(
+            url, {self.offset_param: index * self.limit, self.limit_param: self.limit}
+        )
+
+    async def page(self, request: Request, reply: Reply) -> Page:
+        items = await request._cast(reply.body())
+        page = Page(items, reply.body_size())
+        page.is_last = len(items) < self.limit
+        return page
+
+
+# The reply is an object like {"items": [...], "next_cursor": "..."}
+# and the next page is requested with ?cursor=<next_cursor>
+# The page without the next cursor is the last one
+# res_type of the request is the list of items, like List[Pet]
+class CursorPagination:
+    needs_previous_page = True
+
+    def __init__(
+        self,
+        cursor_param: str = "cursor",
+        items_field: str = "items",
+        next_cursor_field: str = "next_cursor",
+    ):
+        self.cursor_param = cursor_param
+        self.items_field = items_field
+        self.next_cursor_field = next_cursor_field
+
+    def page_url(self, url: str, index: int, previous: Optional[Page]) -> str:
+        if previous is None:
+            return url
+        return with_query(url, {self.cursor_param: previous.next_page})
+
+    async def page(self, request: Request, reply: Reply) -> Page:
+        item_type = list_item_type(request.res_type)
+        data = reply.json()
+        if not isinstance(data, dict):
+            raise ValueError(f"The page of '{reply.url()}' should be a json object")
+        items = [cast_item(item, item_type) for item in data[self.items_field]]
+        page = Page(items, reply.body_size(), data.get(self.next_cursor_field))
+        page.is_last = not page.next_page
+        return page
+
+
+# The next page url is in the Link header: <url>; rel="next", like on GitHub
+# The page without it is the last one
+# res_type of the request is the list of items, like List[Pet]
+class LinkHeaderPagination:
+    needs_previous_page = True
+
+    def page_url(self, url: str, index: int, previous: Optional[Page]) -> str:
+        return url if previous is None else previous.next_page
+
+    async def page(self, request: Request, reply: Reply) -> Page:
+        items = await request._cast(reply.body())
+        next_url = next_link(reply.header("Link"))
+        page = Page(
+            items, reply.body_size(), next_url and urljoin(reply.url(), next_url)
+        )
+        page.is_last = not next_url
+        return page
+
+
+_LINK = re.compile(r"<([^>]*)>\s*((?:;\s*[^;,]*)*)")
+_REL = re.compile(r'rel\s*=\s*"?([^";,]*)"?')
+
+
+# The url with rel="next" of the Link header or ""
+def next_link(link_header: str) -> str:
+    for link, params in _LINK.findall(link_header):
+        rel = _REL.search(params)
+        if rel and "next" in rel.group(1).split():
+            return link
+    return ""
+
+
+# The params are added to the query of the url, or replace its ones
+# The other args are kept as they are, including the repeated ones
+def with_query(url: str, params: dict) -> str:
+    parts = urlsplit(url)
+    args: dict = {}
+    for name, value in parse_qsl(parts.query, keep_blank_values=True):
+        if name not in params:
+            args.setdefault(name, []).append(value)
+    args.update(params)
+    return urlunsplit(parts._replace(query=query(args)[1:]))
+
+
+# Requests the page by its index, previous is the page before it, it is needed
+# if pagination.needs_previous_page
+async def fetch_page(
+    request: Request,
+    pagination,
+    index: int,
+    previous: Optional[Page],
+    descr: str = "",
+    priority: Priority = Priority.INTERACTIVE,
+) -> Page:
+    page_request = copy.copy(request)
+    page_request.url = pagination.page_url(request.url, index, previous)
+    reply = await page_request._request_and_return_bare_reply(
+        lambda r, _: page_request._session.network_manager.get(r),
+        b"",
+        descr,
+        priority=priority,
+    )
+    if not reply.ok():
+        raise reply.exception()
+    return await pagination.page(page_request, reply)
+
+
+# Yields the items of all the pages, pagination is OffsetPagination,
+# CursorPagination or LinkHeaderPagination
+# Up to prefetch next pages are requested while the current one is consumed,
+# but only while the pages that are fetched and not consumed yet, are expected
+# to take less than max_buffered_bytes. Their size is estimated by the fetched
+# pages, so the first page is always requested alone
+# The next pages of cursor and link paginations are known only when the previous
+# one is received, so their prefetches are chained one after another
+# If the iteration is stopped early, the prefetches are cancelled
+async def paginate(
+    request: Request,
+    pagination,
+    descr: str = "",
+    prefetch: int = 2,
+    max_buffered_bytes: int = 8 * 1024 * 1024,
+    priority: Priority = Priority.INTERACTIVE,
+) -> AsyncIterator[Any]:
+    tasks: Deque["asyncio.Task[Optional[Page]]"] = deque()
+    last_task: Optional["asyncio.Task[Optional[Page]]"] = None
+    page_sizes: List[int] = []
+    next_index = 0
+
+    async def fetch(index: int, previous_task) -> Optional[Page]:
+        previous = None
+        if previous_task is not None and pagination.needs_previous_page:
+            previous = await asyncio.shield(previous_task)
+            if previous is None or previous.is_last:
+                return None
+
+        page = await fetch_page(request, pagination, index, previous, descr, priority)
+        page_sizes.append(page.size)
+        return page
+
+    def start_fetch():
+        nonlocal last_task, next_index
+        last_task = asyncio.ensure_future(fetch(next_index, last_task))
+        tasks.append(last_task)
+        next_index += 1
+
+    def prefetch_pages():
+        while len(tasks) < prefetch and page_sizes:
+            page_size = sum(page_sizes) / len(page_sizes)
+            buffered = sum(
+                task.result().size if _has_page(task) else page_size for task in tasks
+            )
+            if buffered + page_size > max_buffered_bytes:
+                return
+            start_fetch()
+
+    try:
+        while True:
+            if not tasks:
+                start_fetch()
+            page = await tasks.popleft()
+            if page is None:
+                return
+
+            if not page.is_last:
+                prefetch_pages()
+            for item in page.items:
+                yield item
+            if page.is_last:
+                return
+
+    finally:
+        for task in tasks:
+            if _failed(task):
+                task.exception()  # Not needed pages, like after the last one
+            task.cancel()
+
+
+def _has_page(task: "asyncio.Task[Optional[Page]]") -> bool:
+    return task.done() and not _failed(task) and task.result() is not None
+
+
+def _failed(task: "asyncio.Task[Optional[Page]]") -> bool:
+    return task.done() and not task.cancelled() and task.exception() is not None
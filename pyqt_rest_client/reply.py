@@ -1,53 +1,133 @@
-import json
-from typing import Union, cast
+from typing import Optional, Union, cast
 
+from PyQt5.QtCore import QByteArray
 from PyQt5.QtNetwork import QNetworkReply, QNetworkRequest
 
+from .metrics import RequestMetrics
+from .validation import json_loads
+
+# Error replies are kept inside exceptions, so their bodies are cut to this size
+ERROR_BODY_LIMIT = 64 * 1024  # bytes
+
+# Indexed by QNetworkAccessManager.Operation
+OPERATIONS = [
+    "Error, operation is not valid",
+    "HEAD",
+    "GET",
+    "PUT",
+    "POST",
+    "DELETE",
+    "CUSTOM",
+]
+
 
 class ReplyGotError(Exception):
     pass
 
 
+# The reply is aborted because of one of the Request deadlines
+class ReplyTimeoutError(ReplyGotError):
+    pass
+
+
+# The request is not sent at all, so there is no reply, like CircuitOpenError
+# Its Reply is not ok(), has no http_code() and the message of the error
+class RequestNotSentError(ReplyGotError):
+    pass
+
+
+# The stand-in of the reply of the request that is not sent
+class _NotSentReply(QNetworkReply):
+    def __init__(self, error_string: str):
+        super().__init__()
+        self.setError(QNetworkReply.UnknownNetworkError, error_string)
+        self.setFinished(True)
+
+    def abort(self):
+        pass
+
+    def readData(self, max_size: int) -> bytes:
+        return b""
+
+
 # It is a more convenient wrapper around QNetworkReply
 class Reply:
     def __init__(self, reply: Union[QNetworkReply, ReplyGotError]):
-        if type(reply) is QNetworkReply:
+        if isinstance(reply, QNetworkReply):  # Or ThreadedReply
             self.reply = reply
             self.request_body: bytes = b""
-            self.data: bytes = reply.readAll().data()
+            # The body stays in the Qt buffer until data is needed as bytes
+            self._body: Union[QByteArray, bytes] = reply.readAll()
+            self._data: Optional[bytes] = None
             self.descr: str = ""
+            self.timeout_phase: str = ""  # The missed deadline, if any
+            self.metrics: Optional[RequestMetrics] = None  # If client.metrics is set
+
+        elif isinstance(reply, RequestNotSentError):
+            self.reply = _NotSentReply(str(reply))
+            self.request_body = b""
+            self._body = b""
+            self._data = b""
+            self.descr = ""
+            self.timeout_phase = ""
+            self.metrics = None
 
-        elif type(reply) is ReplyGotError:  # Cast back from exception
+        elif isinstance(reply, ReplyGotError):  # Cast back from exception
             origin: Reply = cast(Reply, reply.args[0])
             self.reply = origin.reply
             self.request_body = origin.request_body
-            self.data = origin.data
+            self._body = origin._body
+            self._data = origin._data
             self.descr = origin.descr
+            self.timeout_phase = origin.timeout_phase
+            self.metrics = origin.metrics
 
         else:
             raise ValueError(
                 f"reply: '{reply}' should be QNetworkReply or ReplyGotError"
             )
 
+    # It is a copy of the body, prefer body() if bytes are not required
+    @property
+    def data(self) -> bytes:
+        if self._data is None:
+            self._data = cast(QByteArray, self._body).data()
+            self._body = self._data  # To not keep the body twice
+        return self._data
+
+    @data.setter
+    def data(self, data: bytes):
+        self._body = self._data = data
+
+    # Zero copy view of the body
+    def body(self) -> memoryview:
+        return memoryview(self._body)
+
+    def body_size(self) -> int:
+        return len(self._body)
+
+    # ReplyTimeoutError if the reply is aborted by a deadline
+    def exception(self) -> ReplyGotError:
+        # The body of the error is needed only to see what went wrong
+        if self.body_size() > ERROR_BODY_LIMIT:
+            self.data = bytes(self.body()[:ERROR_BODY_LIMIT])
+        self.request_body = self.request_body[:ERROR_BODY_LIMIT]
+
+        if self.timeout_phase:
+            return ReplyTimeoutError(self)
+        return ReplyGotError(self)
+
     def operation(self) -> str:
-        return [
-            "Error, operation is not valid",
-            "HEAD",
-            "GET",
-            "PUT",
-            "POST",
-            "DELETE",
-            "CUSTOM",
-        ][self.reply.operation()]
+        return OPERATIONS[self.reply.operation()]
 
     def url(self) -> str:
         return self.reply.url().url()
 
     def text(self) -> str:
-        return self.data.decode("utf-8")
+        return str(self.body(), "utf-8")
 
     def json(self) -> Union[list, dict]:
-        return json.loads(self.data)
+        return json_loads(self.body())
 
     def ok(self) -> bool:
         return self.reply.error() == QNetworkReply.NoError
@@ -55,5 +135,9 @@ class Reply:
     def http_code(self) -> int:
         return self.reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
 
+    # Returns "" if there is no such header
+    def header(self, name: str) -> str:
+        return self.reply.rawHeader(name.encode("utf-8")).data().decode("utf-8")
+
     def qt_error_string(self) -> str:
         return self.reply.errorString()
@@ -1,150 +1,741 @@
 import asyncio
 import hashlib
-import json
-from typing import Any, Callable, Union
-
-from pydantic import parse_obj_as
-from PyQt5.QtCore import QTimer, QUrl
-from PyQt5.QtNetwork import QNetworkReply, QNetworkRequest
+import mmap
+import time
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+    get_args,
+    get_origin,
+)
+from urllib.parse import urlparse
+
+from PyQt5.QtCore import QIODevice, QTimer, QUrl
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
 
 import pyqt_rest_client as client
 
-from .reply import Reply, ReplyGotError
-from .url import url
+from .auth import Signer
+from .cache import ResponseCache
+from .compression import Compression
+from .download import DownloadChecksumError, DownloadWriter
+from .json_stream import JsonArrayDecoder
+from .metrics import RequestMetrics, endpoint_template
+from .reply import OPERATIONS, Reply
+from .retry import is_transient_failure
+from .scheduler import Priority
+from .upload import Source, UploadBody, is_upload_source
+from .url import UrlTemplate, url
+from .validation import Buffer, json_dumps, json_loads, validator
+
+if TYPE_CHECKING:
+    from .session import Client, Session
+
+STREAM_READ_BUFFER_SIZE = 256 * 1024  # bytes
+
+
+# Bytes or json bodies, or the sources of uploaded bodies, see UploadBody
+Body = Union[bytes, list, dict, Source]
 
 
+# Requests are signed by Sha256Signer, see Login.signer
 def create_authentication_header(username: str, secret: bytes, message: bytes) -> bytes:
     encoded_message = hashlib.sha256(secret + message).hexdigest()
     return bytes(f"{username}:{encoded_message}", "utf-8")
 
 
-def cast_body_to_bytes(body: Union[bytes, list, dict]) -> bytes:
+def cast_body_to_bytes(body: Body) -> bytes:
     if type(body) in (dict, list):
-        body = json.dumps(body).encode("utf-8")
-    elif type(body) not in (bytes, bytearray):
-        raise ValueError(
-            f"Body type: '{type(body).__name__}' must be bytes, bytearray, list or dict"
-        )
-    return bytes(body)
+        return json_dumps(body)
+    elif type(body) in (bytes, bytearray):
+        return bytes(cast(Union[bytes, bytearray], body))
+    raise ValueError(
+        f"Body type: '{type(body).__name__}' must be bytes, bytearray, list or dict"
+    )
 
 
-def cast_reply_to_resource(reply: Reply, res_type):
+# It works with bare bytes, not with Reply, so it can be sent to a process pool
+# Trusted data is not validated, see Validator.construct()
+def cast_data_to_resource(data: Buffer, res_type, trusted: bool = False):
     if res_type in (bytes, bytearray):
-        return res_type(reply.data)
+        return res_type(data)  # bytes(bytes) is not a copy
     elif res_type is str:
-        return reply.data.decode("utf-8")
+        return str(data, "utf-8")
+    elif trusted:
+        return validator(res_type).construct(json_loads(data))
     else:
-        return parse_obj_as(res_type, reply.json())
+        return validator(res_type).validate_json(data)
+
+
+# The same as cast_data_to_resource(), but also returns json parse and validation time
+def timed_cast_data_to_resource(
+    data: Buffer, res_type, trusted: bool = False
+) -> Tuple[Any, float, float]:
+    start = time.perf_counter()
+    if res_type in (bytes, bytearray, str):
+        return cast_data_to_resource(data, res_type), time.perf_counter() - start, 0.0
+
+    obj = json_loads(data)
+    parsed = time.perf_counter()
+    if trusted:
+        resource = validator(res_type).construct(obj)
+    else:
+        resource = validator(res_type).validate_python(obj)
+    return resource, parsed - start, time.perf_counter() - parsed
+
+
+def cast_reply_to_resource(reply: Reply, res_type):
+    return cast_data_to_resource(reply.body(), res_type)
+
+
+# Returns None for list and List, so items are returned as is
+def list_item_type(res_type):
+    if res_type in (list, List):
+        return None
+    elif get_origin(res_type) is list:
+        return get_args(res_type)[0]
+    else:
+        raise ValueError(f"res_type: '{res_type}' should be a list to stream it")
+
+
+# The module is the default session, it has the same attributes as Client
+def default_session(session: Optional["Client"]) -> "Session":
+    return cast("Session", client) if session is None else session
+
+
+def cast_item(item, item_type):
+    return item if item_type is None else validator(item_type).validate_python(item)
+
+
+# (session, url, res_type, trusted, username, signer) -> the task of the GET request
+_in_flight_gets: Dict[
+    Tuple["Session", str, Any, bool, str, Signer], "asyncio.Task[Any]"
+] = {}
+# The task of the GET request -> count of its awaiters
+_in_flight_awaiters: Dict["asyncio.Task[Any]", int] = {}
 
 
 class Request:
-    def __init__(self, full_url: str, res_type=None, timeout_ms=5000):
+    def __init__(
+        self,
+        full_url: str,
+        res_type=None,
+        timeout_ms=5000,
+        connect_timeout_ms=0,
+        first_byte_timeout_ms=0,
+    ):
         self.url = full_url
         self.res_type = res_type
-        self.timeout = timeout_ms  # 1 sec == 1000 ms
+        # 1 sec == 1000 ms, 0 means no deadline
+        self.timeout = timeout_ms  # Of the whole request
+        # Qt5 has no signal about the established connection, so the connection
+        # is considered established when the request body or the reply is sent
+        self.connect_timeout = connect_timeout_ms
+        self.first_byte_timeout = first_byte_timeout_ms  # Till the reply headers
+        # Requests with the same template are aggregated in client.metrics
+        # By default it is the url path, where ids are replaced by {id}
+        self.template = ""
+        # Replies of trusted endpoints are not validated, see Validator.construct()
+        self.trusted = False
+        # Signs the requests instead of the client.login_data.signer, if it is set
+        self.signer: Optional[Signer] = None
+        # Opt-in compression of the replies and the bodies, see Compression
+        self.compression: Optional[Compression] = None
+        # The Client to send the requests with, the module globals if it is None
+        self.session: Optional["Client"] = None
 
     async def _request(
         self,
         request_type_dependant_operation: Callable[
-            [QNetworkRequest, bytes], QNetworkReply
+            [QNetworkRequest, Union[bytes, QIODevice]], QNetworkReply
         ],
-        body: Union[bytes, list, dict],
+        body: Body,
         descr: str,
+        priority: Priority = Priority.INTERACTIVE,
     ) -> Union[Reply, Any]:
         reply = await self._request_and_return_bare_reply(
-            request_type_dependant_operation, body, descr
+            request_type_dependant_operation,
+            body,
+            descr,
+            priority=priority,
+            record_metrics=False,
         )
 
-        if reply.ok():
-            return cast_reply_to_resource(reply, self.res_type)
+        try:
+            if reply.ok():
+                return await self._cast(reply.body(), reply.metrics)
+            else:
+                raise reply.exception()
+        finally:
+            self._record_metrics(reply)
+
+    async def _cast(self, data: Buffer, metrics: RequestMetrics = None) -> Any:
+        if metrics is None:
+            cast_function = cast_data_to_resource
+        else:
+            cast_function = timed_cast_data_to_resource
+        if self.trusted:
+            cast_function = partial(cast_function, trusted=True)
+
+        pool = self._session.deserialization_pool
+        if pool:
+            result = await pool.cast(data, self.res_type, cast_function)
         else:
-            raise ReplyGotError(reply)
+            result = cast_function(data, self.res_type)
+
+        if metrics is None:
+            return result
+
+        resource, metrics.json_parse, metrics.validation = result
+        return resource
+
+    def _record_metrics(self, reply: Reply):
+        if reply.metrics is not None and self._session.metrics is not None:
+            self._session.metrics.record(reply.metrics)
+
+    # GET through the client.response_cache
+    async def _cached_get(
+        self, cache: ResponseCache, descr: str, priority: Priority
+    ) -> Any:
+        session = self._session
+        key = (self.url, session.login_data.username, self._signer)
+        entry = cache.lookup(key)
+        reply = None
+
+        if entry and entry.is_fresh():
+            cache.hits += 1
+            cache.saved_bytes += len(entry.data)
+        else:
+            reply = await self._request_and_return_bare_reply(
+                lambda r, _: session.network_manager.get(r),
+                b"",
+                descr,
+                entry.validation_headers() if entry else {},
+                priority,
+                record_metrics=False,
+            )
+
+            if entry and reply.http_code() == 304:  # Not Modified
+                cache.revalidations += 1
+                cache.saved_bytes += len(entry.data)
+                cache.refresh(key, entry, reply)
+            elif reply.ok():
+                cache.misses += 1
+                entry = cache.store(key, reply)
+            else:
+                self._record_metrics(reply)
+                raise reply.exception()
+
+        # Trusted resources are not validated, so they are not shared with the rest
+        resource_key = (self.res_type, self.trusted)
+        if resource_key in entry.resources:
+            cache.resource_hits += 1
+            resource = entry.resources[resource_key]
+        else:
+            resource = await self._cast(entry.data, reply.metrics if reply else None)
+            cache.store_resource(key, entry, resource_key, resource)
+
+        if reply:
+            self._record_metrics(reply)
+        return resource
 
     async def _request_and_return_bare_reply(
         self,
         request_type_dependant_operation: Callable[
-            [QNetworkRequest, bytes], QNetworkReply
+            [QNetworkRequest, Union[bytes, QIODevice]], QNetworkReply
         ],
-        body: Union[bytes, list, dict],
+        body: Body,
         descr: str,
-    ):
-        body = cast_body_to_bytes(body)
-
-        request = QNetworkRequest(QUrl(self.url))
-        request.setRawHeader(
-            b"Authentication",
-            create_authentication_header(
-                client.login_data.username, client.login_data.secret, body
-            ),
-        )
-        request.setRawHeader(b"Content-Type", b"application/json")
-
-        qt_reply = request_type_dependant_operation(request, body)
-        client.active_requests += [qt_reply]
+        headers: Dict[bytes, bytes] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        record_metrics: bool = True,  # False if it is recorded after deserialization
+    ) -> Reply:
+        session = self._session
+        body = await self._prepare_body(body)
+        if self.compression is not None:
+            uncompressed_size = body.size if isinstance(body, UploadBody) else len(body)
+            body, compression_headers = await self.compression.compress(body)
+            headers = {**compression_headers, **(headers or {})}
+
+        # Transient failures are retried with the client.retry_policy
+        # and the requests to failing hosts are rejected by client.circuit_breaker
+        host = self._host()
+        attempt = 0
+        while True:
+            if session.circuit_breaker is not None:
+                session.circuit_breaker.check(host)
+
+            qt_reply, reply_future = await self._send(
+                request_type_dependant_operation, body, descr, headers, priority
+            )
+            try:
+                reply = await reply_future
+            except asyncio.CancelledError:
+                qt_reply.abort()  # Nobody waits for the data anymore
+                raise
+
+            if self.compression is not None:
+                await self.compression.decompress(reply)
+                if reply.metrics is not None:
+                    reply.metrics.uncompressed_bytes_sent = uncompressed_size
+            if session.circuit_breaker is not None:
+                session.circuit_breaker.record(host, reply)
+
+            policy = session.retry_policy
+            if policy is None or not policy.should_retry(reply, attempt):
+                if reply.metrics is not None:
+                    reply.metrics.retries = attempt
+                if record_metrics:
+                    self._record_metrics(reply)
+                return reply
+
+            attempt += 1
+            policy.retries += 1
+            await asyncio.sleep(policy.delay(reply, attempt))
+
+    # The body is prepared once, not on every retry
+    # Big json bodies are serialized in the client.deserialization_pool
+    async def _prepare_body(self, body: Body) -> Union[bytes, UploadBody]:
+        pool = self._session.deserialization_pool
+        if isinstance(body, UploadBody):
+            return body
+        elif is_upload_source(body):
+            return UploadBody(body)
+        elif type(body) in (dict, list) and pool is not None:
+            return await pool.dumps(cast(Union[list, dict], body))
+        return cast_body_to_bytes(body)
+
+    # The identity of the requests, the replies of the others are not shared
+    @property
+    def _signer(self) -> Signer:
+        return self.signer or self._session.login_data.signer
+
+    @property
+    def _session(self) -> "Session":
+        return default_session(self.session)
+
+    def _host(self) -> str:
+        return urlparse(self.url).netloc
+
+    # Starts the request and returns the future that is done when the reply finished
+    # The QNetworkReply is returned too, to read the data while it is received
+    # The request waits in the client.scheduler queue before it is started
+    async def _send(
+        self,
+        request_type_dependant_operation: Callable[
+            [QNetworkRequest, Union[bytes, QIODevice]], QNetworkReply
+        ],
+        body: Body,
+        descr: str,
+        headers: Dict[bytes, bytes] = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Tuple[QNetworkReply, "asyncio.Future[Reply]"]:
+        session = self._session
+        if not isinstance(body, UploadBody):
+            body = cast_body_to_bytes(body)
+        # It is signed before the queue, to not hold the slot while hashing
+        auth_headers = await self._signer.sign(body)
+
+        scheduler = session.scheduler
+        host = self._host()
+        queued_at = time.perf_counter()
+        await scheduler.acquire(host, priority)
+        sent_at = time.perf_counter()
+
+        # The slot is released when the reply is finished, or here if the request
+        # is not even started, like if the transport raises
+        try:
+            request = QNetworkRequest(QUrl(self.url))
+            request.setRawHeader(b"Content-Type", b"application/json")
+            for name, value in {**auth_headers, **(headers or {})}.items():
+                request.setRawHeader(name, value)
+
+            if isinstance(body, UploadBody):
+                # Qt reads the device by chunks while sending
+                device = body.device()
+                qt_reply = request_type_dependant_operation(request, device)
+                if body.owns(device):
+                    device.setParent(qt_reply)
+                body_size, body_head = body.size, body.head
+            else:
+                qt_reply = request_type_dependant_operation(request, body)
+                body_size, body_head = len(body), body
+        except BaseException:
+            scheduler.release(host)
+            raise
+        session.active_requests += [qt_reply]
+
+        # The cached data is not valid anymore if it is modified
+        if session.response_cache is not None and qt_reply.operation() not in (
+            QNetworkAccessManager.GetOperation,
+            QNetworkAccessManager.HeadOperation,
+        ):
+            session.response_cache.invalidate(self.url)
 
         future = asyncio.get_event_loop().create_future()
+        future.add_done_callback(lambda _: scheduler.release(host))
+
+        missed_deadline: List[str] = []
+        metrics = None
+        if session.metrics is not None:
+            metrics = RequestMetrics(
+                self.template or endpoint_template(self.url),
+                self.url,
+                OPERATIONS[qt_reply.operation()],
+                body_size,
+            )
+            metrics.queue_wait = sent_at - queued_at
+
+            def _on_headers():
+                if not metrics.time_to_first_byte:
+                    metrics.time_to_first_byte = time.perf_counter() - sent_at
+
+            qt_reply.metaDataChanged.connect(_on_headers)
 
         def _on_finished():
             reply = Reply(qt_reply)
-            reply.request_body = body
+            reply.request_body = body_head
             reply.descr = descr
-
-            client.active_requests.remove(qt_reply)
-            future.set_result(reply)
+            reply.timeout_phase = missed_deadline[0] if missed_deadline else ""
+
+            if metrics is not None:
+                duration = time.perf_counter() - sent_at
+                if not metrics.time_to_first_byte:  # No headers, like on errors
+                    metrics.time_to_first_byte = duration
+                metrics.download = duration - metrics.time_to_first_byte
+                metrics.http_code = reply.http_code()
+                metrics.bytes_received = reply.body_size()
+                metrics.uncompressed_bytes_received = reply.body_size()
+                reply.metrics = metrics
+
+            session.active_requests.remove(qt_reply)
+            if not future.done():  # It is cancelled if the awaiter is cancelled
+                future.set_result(reply)
 
         # Between qt request start and finish unhandled exception will be invisible
         qt_reply.finished.connect(_on_finished)
-        QTimer.singleShot(self.timeout, qt_reply.close)
+
+        def set_deadline(phase: str, timeout_ms: int, *phase_end_signals):
+            if not timeout_ms:
+                return
+
+            # The timer is a child of the reply and is stopped when the phase ends
+            timer = QTimer(qt_reply)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda: missed_deadline.append(phase))
+            timer.timeout.connect(qt_reply.abort)
+            for signal in (qt_reply.finished, *phase_end_signals):
+                signal.connect(timer.stop)
+            timer.start(timeout_ms)
+
+        set_deadline("total", self.timeout)
+        set_deadline("first byte", self.first_byte_timeout, qt_reply.metaDataChanged)
+        set_deadline(
+            "connect",
+            self.connect_timeout,
+            qt_reply.metaDataChanged,
+            qt_reply.uploadProgress,
+            qt_reply.encrypted,
+        )
 
         if descr:
-            client.request_notifier.request_started.emit(descr)
+            session.request_notifier.request_started.emit(descr)
             qt_reply.finished.connect(
-                lambda: client.request_notifier.request_finished.emit(descr)
+                lambda: session.request_notifier.request_finished.emit(descr)
             )
 
         self.to_patch(qt_reply)
-        return await future
+        return qt_reply, future
+
+    async def get(self, descr: str, priority: Priority = Priority.INTERACTIVE) -> Any:
+        if not self._session.coalesce_gets:
+            return await self._get(descr, priority)
+
+        # Identical GETs that are already in flight share one request and
+        # one deserialization, the descr of the first one is used
+        session = self._session
+        key = (
+            session,
+            self.url,
+            self.res_type,
+            self.trusted,
+            session.login_data.username,
+            self._signer,
+        )
+        task = _in_flight_gets.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._get(descr, priority))
+            _in_flight_gets[key] = task
+            _in_flight_awaiters[task] = 0
+
+            def forget(task):
+                if _in_flight_gets.get(key) is task:
+                    del _in_flight_gets[key]
+                _in_flight_awaiters.pop(task, None)
+
+            task.add_done_callback(forget)
+
+        # Cancellation of one awaiter does not cancel the others
+        # But the request is cancelled if all of them are cancelled
+        _in_flight_awaiters[task] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                _in_flight_awaiters[task] -= 1
+                if not _in_flight_awaiters[task]:
+                    # The next identical GET starts a new request, and does not
+                    # join the cancelled one
+                    if _in_flight_gets.get(key) is task:
+                        del _in_flight_gets[key]
+                    task.cancel()
+            raise
+
+    async def _get(self, descr: str, priority: Priority) -> Any:
+        cache = self._session.response_cache
+        if cache is not None:
+            return await self._cached_get(cache, descr, priority)
 
-    async def get(self, descr: str) -> Any:
         return await self._request(
-            lambda r, _: client.network_manager.get(r), b"", descr
+            lambda r, _: self._session.network_manager.get(r), b"", descr, priority
         )
 
-    async def post(self, body: Union[bytes, list, dict], descr: str) -> Any:
-        return await self._request(client.network_manager.post, body, descr)
+    async def post(
+        self,
+        body: Body,
+        descr: str,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Any:
+        return await self._request(
+            self._session.network_manager.post, body, descr, priority
+        )
 
-    async def put(self, body: Union[bytes, list, dict], descr: str) -> Any:
-        return await self._request(client.network_manager.put, body, descr)
+    async def put(
+        self,
+        body: Body,
+        descr: str,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Any:
+        return await self._request(
+            self._session.network_manager.put, body, descr, priority
+        )
 
-    async def delete(self, descr: str) -> Any:
+    async def delete(
+        self, descr: str, priority: Priority = Priority.INTERACTIVE
+    ) -> Any:
         return await self._request(
-            lambda r, _: client.network_manager.deleteResource(r), b"", descr
+            lambda r, _: self._session.network_manager.deleteResource(r),
+            b"",
+            descr,
+            priority,
+        )
+
+    # Yields items of a top level json array while the reply is still downloading
+    # So the first items can be shown long before the whole list is received
+    # res_type should be a list, like List[Pet], to stream its items
+    async def stream_get(
+        self, descr: str, priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[Any]:
+        item_type = list_item_type(self.res_type)
+        decoder = JsonArrayDecoder()
+        compression = self.compression
+
+        qt_reply, reply_future = await self._send(
+            lambda r, _: self._session.network_manager.get(r),
+            b"",
+            descr,
+            compression.request_headers() if compression else None,
+            priority,
+        )
+        # Qt stops to read from the socket when the buffer is full
+        # so not consumed items do not pile up in memory
+        qt_reply.setReadBufferSize(STREAM_READ_BUFFER_SIZE)
+
+        streamed_bytes = 0
+        uncompressed_bytes = 0
+        decompress: Optional[Callable[[Buffer], bytes]] = None
+        data_available = asyncio.Event()
+        qt_reply.readyRead.connect(data_available.set)
+        reply_future.add_done_callback(lambda _: data_available.set())
+
+        # Compressed chunks are decompressed on the fly, before the decoder
+        async def decode(chunk: Buffer) -> list:
+            nonlocal decompress, uncompressed_bytes
+            try:
+                if compression is not None:
+                    if decompress is None:
+                        decompress = compression.decompressor(
+                            qt_reply.rawHeader(b"Content-Encoding").data().decode()
+                        )
+                    chunk = decompress(chunk)
+                uncompressed_bytes += len(chunk)
+                return decoder.feed(chunk)
+            except ValueError:
+                reply = await reply_future  # Error replies are not json arrays
+                if not reply.ok():
+                    raise reply.exception()
+                raise
+
+        try:
+            while True:
+                await data_available.wait()
+                data_available.clear()
+
+                # The rest of data is read into the Reply when it is finished
+                if reply_future.done():
+                    break
+
+                chunk = qt_reply.readAll().data()
+                streamed_bytes += len(chunk)
+                for item in await decode(chunk):
+                    yield cast_item(item, item_type)
+
+            reply = reply_future.result()
+            rest = await decode(reply.body()) if reply.ok() else []
+            if reply.metrics is not None:
+                reply.metrics.bytes_received += streamed_bytes
+                if reply.ok():
+                    reply.metrics.uncompressed_bytes_received = uncompressed_bytes
+                self._record_metrics(reply)
+            if not reply.ok():
+                raise reply.exception()
+
+            for item in rest:
+                yield cast_item(item, item_type)
+            decoder.close()
+
+        finally:
+            if not reply_future.done():  # The consumer stopped the iteration early
+                qt_reply.abort()
+
+    # Writes the reply to the file path or to the pre-sized mmap while it is
+    # downloading, so the memory usage does not depend on the data size
+    # Interrupted downloads, like by timeout, are resumed with the Range header
+    # Returns the size of the downloaded data
+    async def download(
+        self,
+        destination: Union[str, mmap.mmap],
+        descr: str,
+        expected_sha256: str = "",
+        max_resumes: int = 3,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> int:
+        writer = DownloadWriter(destination)
+        try:
+            for resume in range(max_resumes + 1):
+                reply, is_complete = await self._download_once(writer, descr, priority)
+                if is_complete:
+                    break
+                if resume == max_resumes or not (
+                    reply.ok()  # But shorter than its Content-Length
+                    or is_transient_failure(reply)
+                    or reply.reply.error() == QNetworkReply.OperationCanceledError
+                ):
+                    raise reply.exception()
+        finally:
+            writer.close()
+
+        if expected_sha256 and writer.sha256() != expected_sha256.lower():
+            raise DownloadChecksumError(
+                f"sha256 of '{self.url}' is {writer.sha256()}, not {expected_sha256}"
+            )
+        return writer.size
+
+    # Returns the reply and whether the whole data is received
+    # Qt can report a connection closed in the middle of the body as a success,
+    # so the received size is checked by the Content-Length too
+    async def _download_once(
+        self, writer: DownloadWriter, descr: str, priority: Priority
+    ) -> Tuple[Reply, bool]:
+        session = self._session
+        offset = writer.size
+        headers = {b"Range": f"bytes={offset}-".encode("utf-8")} if offset else {}
+
+        qt_reply, reply_future = await self._send(
+            lambda r, _: session.network_manager.get(r),
+            b"",
+            descr,
+            headers,
+            priority,
+        )
+        qt_reply.setReadBufferSize(STREAM_READ_BUFFER_SIZE)
+
+        is_success: List[bool] = []  # It is checked once, on the first chunk
+        write_errors: List[Exception] = []
+        received = 0
+
+        def write(chunk: Buffer):
+            nonlocal received
+            if not is_success:
+                http_code = qt_reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+                is_success.append(bool(http_code) and 200 <= http_code < 300)
+                if is_success[0] and offset and http_code != 206:
+                    writer.restart()  # The server ignored the Range header
+
+            # Error bodies are left in the Reply
+            if is_success[0] and not write_errors:
+                try:
+                    writer.write(chunk)
+                    received += len(chunk)
+                except (OSError, ValueError) as error:
+                    write_errors.append(error)
+                    qt_reply.abort()
+
+        qt_reply.readyRead.connect(lambda: write(memoryview(qt_reply.readAll())))
+        qt_reply.downloadProgress.connect(
+            lambda received, total: session.request_notifier.download_progress.emit(
+                descr, offset + received, offset + total if total >= 0 else -1
+            )
         )
 
+        try:
+            reply = await reply_future
+        except asyncio.CancelledError:
+            qt_reply.abort()
+            raise
+
+        if reply.ok():
+            write(reply.body())  # The rest of data is read into the Reply
+            reply.data = b""
+        if write_errors:
+            raise write_errors[0]
+
+        self._record_metrics(reply)
+        content_length = reply.header("Content-Length")
+        is_complete = reply.ok() and (
+            not content_length.isdigit() or received >= int(content_length)
+        )
+        return reply, is_complete
+
     # Requests with bare replies(not deserialized) firstly is needed for debug purposes
     # Normally these requests supposed to return deserialized pydantic dataclasses
     async def get_and_return_bare_reply(self, descr: str) -> Reply:
         return await self._request_and_return_bare_reply(
-            lambda r, _: client.network_manager.get(r), b"", descr
+            lambda r, _: self._session.network_manager.get(r), b"", descr
         )
 
-    async def post_and_return_bare_reply(
-        self, body: Union[bytes, list, dict], descr: str
-    ) -> Reply:
+    async def post_and_return_bare_reply(self, body: Body, descr: str) -> Reply:
         return await self._request_and_return_bare_reply(
-            client.network_manager.post, body, descr
+            self._session.network_manager.post, body, descr
         )
 
-    async def put_and_return_bare_reply(
-        self, body: Union[bytes, list, dict], descr: str
-    ) -> Reply:
+    async def put_and_return_bare_reply(self, body: Body, descr: str) -> Reply:
         return await self._request_and_return_bare_reply(
-            client.network_manager.put, body, descr
+            self._session.network_manager.put, body, descr
         )
 
     async def delete_and_return_bare_reply(self, descr: str) -> Reply:
         return await self._request_and_return_bare_reply(
-            lambda r, _: client.network_manager.deleteResource(r), b"", descr
+            lambda r, _: self._session.network_manager.deleteResource(r), b"", descr
         )
 
     # This method is used to implement something like `requests-mock`
@@ -153,5 +744,51 @@ class Request:
         pass
 
 
-def endpoint(res_type, url_parts: list, args: dict = None):
-    return Request(url(url_parts, args), res_type)
+def endpoint(
+    res_type,
+    url_parts: list,
+    args: dict = None,
+    trusted: bool = False,
+    signer: Optional[Signer] = None,
+    session: Optional["Client"] = None,
+    compression: Optional[Compression] = None,
+):
+    base_url = default_session(session).login_data.base_url
+    request = Request(url(url_parts, args, base_url), res_type)
+    request.trusted = trusted
+    request.signer = signer
+    request.session = session
+    request.compression = compression
+    return request
+
+
+# Declarative endpoint, like pet_by_id = EndpointTemplate(Pet, "pet/{id}")
+# The template is parsed once, and pet_by_id(id=1) only fills the params in
+# The params that are not in the path are sent in the query, None is skipped
+class EndpointTemplate:
+    def __init__(
+        self,
+        res_type,
+        template: str,
+        trusted: bool = False,
+        signer: Optional[Signer] = None,
+        session: Optional["Client"] = None,
+        compression: Optional[Compression] = None,
+    ):
+        self.res_type = res_type
+        self.url_template = UrlTemplate(template)
+        self.trusted = trusted
+        self.signer = signer
+        self.session = session
+        self.compression = compression
+
+    def __call__(self, **params) -> Request:
+        base_url = default_session(self.session).login_data.base_url
+        url, path_template = self.url_template.url_and_path_template(base_url, params)
+        request = Request(url, self.res_type)
+        request.template = path_template
+        request.trusted = self.trusted
+        request.signer = self.signer
+        request.session = self.session
+        request.compression = self.compression
+        return request
@@ -0,0 +1,134 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Dict, Tuple
+
+from PyQt5.QtNetwork import QNetworkReply
+
+from .reply import Reply, RequestNotSentError
+
+# Failures that can disappear by themselves, so it makes sense to retry
+TRANSIENT_HTTP_CODES = (429, 502, 503, 504)
+TRANSIENT_QT_ERRORS = (
+    QNetworkReply.ConnectionRefusedError,
+    QNetworkReply.RemoteHostClosedError,
+    QNetworkReply.TimeoutError,
+    QNetworkReply.TemporaryNetworkFailureError,
+    QNetworkReply.NetworkSessionFailedError,
+    QNetworkReply.ProxyConnectionClosedError,
+    QNetworkReply.ProxyTimeoutError,
+    QNetworkReply.UnknownNetworkError,
+)
+IDEMPOTENT_OPERATIONS = ("HEAD", "GET", "PUT", "DELETE")
+
+
+def is_transient_failure(reply: Reply) -> bool:
+    return (
+        bool(reply.timeout_phase)
+        or reply.http_code() in TRANSIENT_HTTP_CODES
+        or reply.reply.error() in TRANSIENT_QT_ERRORS
+    )
+
+
+# Exponential backoff with full jitter, the server Retry-After has the priority
+# POST requests are not retried unless retry_post=True, they are not idempotent
+class RetryPolicy:
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.25,  # sec
+        max_delay: float = 30.0,  # sec
+        retry_post: bool = False,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_post = retry_post
+
+        # Statistics
+        self.retries = 0
+        self.gave_up = 0  # Transient failures returned after all the retries
+
+    def should_retry(self, reply: Reply, attempt: int) -> bool:
+        if not is_transient_failure(reply):
+            return False
+        if reply.operation() not in IDEMPOTENT_OPERATIONS and not self.retry_post:
+            return False
+        if attempt >= self.max_retries:
+            self.gave_up += 1
+            return False
+        return True
+
+    # attempt is the number of the retry, starting from 1
+    def delay(self, reply: Reply, attempt: int) -> float:
+        retry_after = retry_after_delay(reply.header("Retry-After"))
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+# Retry-After is either seconds or an HTTP date
+def retry_after_delay(retry_after: str):
+    if not retry_after:
+        return None
+    if retry_after.isdigit():
+        return float(retry_after)
+
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# It is a ReplyGotError, so the callers handle it as any failed request
+class CircuitOpenError(RequestNotSentError):
+    pass
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"  # Requests are sent
+    OPEN = "open"  # Requests fail fast without sending
+    HALF_OPEN = "half-open"  # Trial requests are sent to check the host
+
+
+# Fails fast the requests to the host that failed failure_threshold times in a row
+# After reset_timeout the host is checked again with the next requests
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout  # sec
+        # host -> (consecutive failures, time when the circuit was opened)
+        self._hosts: Dict[str, Tuple[int, float]] = {}
+
+        # Statistics
+        self.opened = 0
+        self.rejected = 0
+
+    def state(self, host: str) -> CircuitState:
+        failures, opened_at = self._hosts.get(host, (0, 0.0))
+        if failures < self.failure_threshold:
+            return CircuitState.CLOSED
+        if time.monotonic() - opened_at < self.reset_timeout:
+            return CircuitState.OPEN
+        return CircuitState.HALF_OPEN
+
+    def check(self, host: str):
+        if self.state(host) is CircuitState.OPEN:
+            self.rejected += 1
+            raise CircuitOpenError(f"Requests to '{host}' are failing, try later")
+
+    def record(self, host: str, reply: Reply):
+        if not is_transient_failure(reply):
+            self._hosts.pop(host, None)
+            return
+
+        was_open = self.state(host) is CircuitState.OPEN
+        failures, opened_at = self._hosts.get(host, (0, 0.0))
+        failures += 1
+
+        if failures >= self.failure_threshold and not was_open:
+            opened_at = time.monotonic()  # Opened or reopened after a failed trial
+            self.opened += 1
+        self._hosts[host] = failures, opened_at
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+from enum import IntEnum
+from typing import Deque, Dict, Optional, Tuple
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # Requests that the user waits for
+    BACKGROUND = 1  # Refreshes, prefetches and so on
+
+
+# Limits the count of requests that are sent to the same host at the same time
+# Queued requests are started by priority, in FIFO order within the priority
+class RequestScheduler:
+    # 6 is the same as the QNetworkAccessManager connections limit per host
+    def __init__(self, max_per_host: int = 6):
+        self.max_per_host = max_per_host
+        self._active: Dict[str, int] = defaultdict(int)
+        # host -> priority -> (future to start the request, enqueue time)
+        self._queues: Dict[str, Dict[Priority, Deque[Tuple[asyncio.Future, float]]]]
+        self._queues = defaultdict(lambda: {priority: deque() for priority in Priority})
+
+        # Statistics
+        self.started = 0
+        self.total_wait_time = 0.0  # sec
+        self.max_wait_time = 0.0  # sec
+
+    def queue_depth(self, priority: Optional[Priority] = None) -> int:
+        return sum(
+            len(queue)
+            for queues in self._queues.values()
+            for queue_priority, queue in queues.items()
+            if priority is None or queue_priority == priority
+        )
+
+    def active_count(self, host: str) -> int:
+        return self._active[host]
+
+    def average_wait_time(self) -> float:
+        return self.total_wait_time / self.started if self.started else 0.0
+
+    # Waits until the request to the host can be started
+    # Every acquire() should be followed by release() when the request is finished
+    async def acquire(self, host: str, priority: Priority = Priority.INTERACTIVE):
+        if self._active[host] < self.max_per_host and not self._is_queued(host):
+            self._start(host, 0.0)
+            return
+
+        future = asyncio.get_event_loop().create_future()
+        entry = (future, time.monotonic())
+        self._queues[host][priority].append(entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(host)  # The slot was given, but is not needed anymore
+            elif entry in self._queues[host][priority]:
+                self._queues[host][priority].remove(entry)
+            raise
+
+    def release(self, host: str):
+        self._active[host] -= 1
+
+        for queue in self._queues[host].values():  # From the highest priority
+            while queue:
+                future, enqueued_at = queue.popleft()
+                # Cancelled in this loop iteration, before acquire() removed it
+                if future.done():
+                    continue
+                self._start(host, time.monotonic() - enqueued_at)
+                future.set_result(None)
+                return
+
+    def _start(self, host: str, wait_time: float):
+        self._active[host] += 1
+        self.started += 1
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def _is_queued(self, host: str) -> bool:
+        return host in self._queues and any(self._queues[host].values())
@@ -0,0 +1,157 @@
+import base64
+from concurrent.futures import Executor
+from typing import List, Optional, Protocol, Union
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkDiskCache, QNetworkReply
+
+from .auth import Sha256Signer, Signer
+from .cache import ResponseCache
+from .deserialization import DeserializationPool
+from .metrics import MetricsCollector
+from .network_threads import ThreadedNetworkManager, Transport
+from .request import EndpointTemplate, Request, endpoint
+from .retry import CircuitBreaker, RetryPolicy
+from .scheduler import RequestScheduler
+
+
+class Login:
+    base_url: str
+    username: str
+    secret: bytes
+    signer: Signer
+
+    def __init__(self, base_url: str, username: str, secret: str):
+        self.base_url = base_url
+        self.username = username
+        self.secret = base64.b64decode(secret)
+        # Sets the Authentication header, replace it for other auth schemes
+        self.signer = Sha256Signer(username, self.secret)
+
+
+class _RequestNotifier(QObject):
+    # The str there is a description that programmer can attach to the request
+    request_started = pyqtSignal(str)
+    request_finished = pyqtSignal(str)
+    # Batch description, done requests count, total requests count
+    batch_progress = pyqtSignal(str, int, int)
+    # Download description, received bytes, total bytes or -1 if it is unknown
+    download_progress = pyqtSignal(str, int, int)
+
+
+def create_deserialization_pool(
+    executor: Optional[Executor], min_size: int, min_body_items: int
+) -> Optional[DeserializationPool]:
+    return DeserializationPool(executor, min_size, min_body_items) if executor else None
+
+
+# Any object with get(), head(), deleteResource(), post(), put() and setCache()
+# of QNetworkAccessManager, that return QNetworkReplies, is a transport
+NetworkManager = Union[QNetworkAccessManager, Transport]
+
+
+# The threads of the previous manager are stopped
+def create_network_manager(
+    previous: NetworkManager, threads_count: int
+) -> NetworkManager:
+    if isinstance(previous, ThreadedNetworkManager):
+        previous.shutdown()
+    if threads_count:
+        return ThreadedNetworkManager(threads_count)
+    return QNetworkAccessManager()
+
+
+def create_response_cache(
+    network_manager: NetworkManager,
+    max_size: Optional[int],
+    disk_cache_dir: str,
+) -> Optional[ResponseCache]:
+    if disk_cache_dir:
+        disk_cache = QNetworkDiskCache()
+        disk_cache.setCacheDirectory(disk_cache_dir)
+        network_manager.setCache(disk_cache)
+    else:
+        network_manager.setCache(None)
+
+    return ResponseCache(max_size) if max_size else None
+
+
+# The attributes that requests use, of a Client or of the pyqt_rest_client
+# module, that is the default session
+class Session(Protocol):
+    login_data: Login
+    request_notifier: _RequestNotifier
+    network_manager: NetworkManager
+    active_requests: List[QNetworkReply]
+    scheduler: RequestScheduler
+    coalesce_gets: bool
+    retry_policy: Optional[RetryPolicy]
+    circuit_breaker: Optional[CircuitBreaker]
+    metrics: Optional[MetricsCollector]
+    deserialization_pool: Optional[DeserializationPool]
+    response_cache: Optional[ResponseCache]
+
+
+# A session with its own backend, identity, network manager, cache, scheduler
+# and statistics, so several backends can be used from one app at the same time
+# The module globals of pyqt_rest_client are the default session, they have
+# the same names and meaning as the attributes there
+class Client:
+    def __init__(
+        self, base_url: str = "", username: str = "", secret: str = "", **settings
+    ):
+        self.login_data = Login(base_url, username, secret)
+        self.request_notifier = _RequestNotifier()
+        self.network_manager: NetworkManager = QNetworkAccessManager()
+        self.active_requests: List[QNetworkReply] = []
+        self.scheduler = RequestScheduler()
+        self.coalesce_gets = True
+        self.retry_policy: Optional[RetryPolicy] = None
+        self.circuit_breaker: Optional[CircuitBreaker] = None
+        self.metrics: Optional[MetricsCollector] = None
+        self.deserialization_pool: Optional[DeserializationPool] = None
+        self.response_cache: Optional[ResponseCache] = None
+
+        # Like Client(url, retry_policy=RetryPolicy(), metrics=MetricsCollector())
+        for name, value in settings.items():
+            if not hasattr(self, name):
+                raise ValueError(f"Client has no setting: '{name}'")
+            setattr(self, name, value)
+
+    def login(self, base_url: str, username: str, secret: str):
+        self.login_data = Login(base_url, username, secret)
+
+    # The same as pyqt_rest_client.use_deserialization_pool()
+    def use_deserialization_pool(
+        self,
+        executor: Optional[Executor],
+        min_size: int = 64 * 1024,
+        min_body_items: int = 1000,
+    ):
+        self.deserialization_pool = create_deserialization_pool(
+            executor, min_size, min_body_items
+        )
+
+    # The same as pyqt_rest_client.use_network_threads()
+    def use_network_threads(self, threads_count: int = 1):
+        self.network_manager = create_network_manager(
+            self.network_manager, threads_count
+        )
+
+    # The same as pyqt_rest_client.use_response_cache()
+    def use_response_cache(
+        self, max_size: Optional[int] = 32 * 1024 * 1024, disk_cache_dir: str = ""
+    ):
+        self.response_cache = create_response_cache(
+            self.network_manager, max_size, disk_cache_dir
+        )
+
+    # The endpoint of this session, url_parts are relative to its base_url
+    def endpoint(
+        self, res_type, url_parts: list, args: dict = None, **options
+    ) -> Request:
+        return endpoint(res_type, url_parts, args, session=self, **options)
+
+    # The endpoint template of this session, see EndpointTemplate
+    def template(self, res_type, template: str, **options) -> EndpointTemplate:
+        return EndpointTemplate(res_type, template, session=self, **options)
@@ -0,0 +1,209 @@
+import asyncio
+import copy
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from .pagination import Page, with_query
+from .reply import Reply
+from .request import Request
+from .scheduler import Priority
+
+# The changes that a sync strategy fetched: the received items, the removed
+# ones, like tombstones, and whether the received items are the whole
+# collection, so the rest of the stored items are removed too
+Changes = Tuple[list, list, bool]
+
+
+# The whole collection is requested with If-None-Match and If-Modified-Since
+# of the previous reply, so nothing is downloaded if it is not modified (304)
+# The received collection is compared with the stored one by the items
+class ConditionalSync:
+    def __init__(self):
+        self._validation_headers: Dict[bytes, bytes] = {}
+
+    async def fetch(self, request: Request, descr: str, priority: Priority) -> Changes:
+        reply = await _get(request, self._validation_headers, descr, priority)
+        if reply.http_code() == 304:  # Not Modified
+            return [], [], False
+        self._validation_headers = validation_headers(reply)
+        return await request._cast(reply.body()), [], True
+
+
+# Only the items that are changed since the previous sync are requested,
+# by ?updated_since=<the latest updated_field of the received items>
+# The removed items are received too, with deleted_field set, like tombstones
+# If updated_field is None, the Date header of the previous reply is sent
+class UpdatedSinceSync:
+    def __init__(
+        self,
+        since_param: str = "updated_since",
+        updated_field: Optional[str] = "updated_at",
+        deleted_field: Optional[str] = "deleted",
+    ):
+        self.since_param = since_param
+        self.updated_field = updated_field
+        self.deleted_field = deleted_field
+        self.since: Any = None  # Of the next sync
+
+    async def fetch(self, request: Request, descr: str, priority: Priority) -> Changes:
+        if self.since is not None:
+            request = copy.copy(request)
+            request.url = with_query(request.url, {self.since_param: self.since})
+        reply = await _get(request, {}, descr, priority)
+        items = await request._cast(reply.body())
+
+        if self.updated_field is None:
+            self.since = reply.header("Date") or self.since
+        else:
+            since = max(
+                (field(item, self.updated_field) for item in items), default=None
+            )
+            if since is not None:
+                self.since = since.isoformat() if hasattr(since, "isoformat") else since
+
+        if self.deleted_field is None:
+            return items, [], False
+        removed = [item for item in items if field(item, self.deleted_field)]
+        items = [item for item in items if not field(item, self.deleted_field)]
+        return items, removed, False
+
+
+# The pages of pagination, OffsetPagination, CursorPagination or
+# LinkHeaderPagination, are requested one by one with If-None-Match of their
+# previous ETag, so only the modified pages are downloaded. The not modified
+# pages keep their items, and the items that are not on any page are removed
+class PageETagSync:
+    def __init__(self, pagination):
+        self.pagination = pagination
+        self._pages: Dict[str, Tuple[Dict[bytes, bytes], Page]] = {}  # By url
+
+    async def fetch(self, request: Request, descr: str, priority: Priority) -> Changes:
+        items: list = []
+        pages: Dict[str, Tuple[Dict[bytes, bytes], Page]] = {}
+        previous: Optional[Page] = None
+        index = 0
+        while previous is None or not previous.is_last:
+            page_request = copy.copy(request)
+            page_request.url = self.pagination.page_url(request.url, index, previous)
+            stored = self._pages.get(page_request.url)
+            headers = stored[0] if stored else {}
+
+            reply = await _get(page_request, headers, descr, priority)
+            if stored and reply.http_code() == 304:  # Not Modified
+                page = stored[1]
+            else:
+                page = await self.pagination.page(page_request, reply)
+                headers = validation_headers(reply)
+            items += page.items
+            pages[page_request.url] = headers, page
+            previous = page
+            index += 1
+
+        self._pages = pages
+        return items, [], True
+
+
+# Keeps the items of the collection by their key field, like "id", and updates
+# them by the changes that the strategy fetches, ConditionalSync by default,
+# see UpdatedSinceSync and PageETagSync
+# Only the added, changed and removed items are emitted after every sync(),
+# so the views are updated by the changes, and not rebuilt
+# res_type of the request is the list of items, like List[Pet], they are
+# compared by ==, and the items can be pydantic models or dicts
+class SyncedCollection(QObject):
+    items_added = pyqtSignal(list)
+    items_changed = pyqtSignal(list)  # The new versions of the items
+    items_removed = pyqtSignal(list)  # The last stored versions of the items
+
+    def __init__(self, request: Request, strategy=None, key: str = "id"):
+        super().__init__()
+        self.request = request
+        self.strategy = strategy or ConditionalSync()
+        self.key = key
+        self._items: Dict[Any, Any] = {}
+        self._lock = asyncio.Lock()  # The syncs are applied one after another
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items.values())
+
+    def __contains__(self, key) -> bool:
+        return key in self._items
+
+    def __getitem__(self, key):
+        return self._items[key]
+
+    # Fetches the changes and applies them, the signals are emitted before
+    # it returns. ReplyGotError is raised if a request fails, or is not sent,
+    # like CircuitOpenError, then nothing is changed
+    async def sync(self, descr: str = "", priority: Priority = Priority.BACKGROUND):
+        async with self._lock:
+            items, removed, is_complete = await self.strategy.fetch(
+                self.request, descr, priority
+            )
+            self._apply(items, removed, is_complete)
+
+    def _apply(self, items: list, removed: list, is_complete: bool):
+        added: List[Any] = []
+        changed: List[Any] = []
+        received = set()
+        for item in items:
+            key = field(item, self.key)
+            received.add(key)
+            previous = self._items.get(key)
+            if previous is None:
+                added.append(item)
+            elif previous is not item and previous != item:
+                changed.append(item)
+            else:
+                continue
+            self._items[key] = item
+
+        removed_keys = [field(item, self.key) for item in removed]
+        if is_complete:
+            removed_keys += [key for key in self._items if key not in received]
+        removed_items = [
+            self._items.pop(key) for key in removed_keys if key in self._items
+        ]
+
+        if removed_items:
+            self.items_removed.emit(removed_items)
+        if changed:
+            self.items_changed.emit(changed)
+        if added:
+            self.items_added.emit(added)
+
+
+# The field of a pydantic model or of a dict
+def field(item, name: str):
+    if isinstance(item, dict):
+        return item.get(name)
+    return getattr(item, name, None)
+
+
+# Headers to ask the server whether the reply is modified
+def validation_headers(reply: Reply) -> Dict[bytes, bytes]:
+    headers = {}
+    if reply.header("ETag"):
+        headers[b"If-None-Match"] = reply.header("ETag").encode("utf-8")
+    if reply.header("Last-Modified"):
+        headers[b"If-Modified-Since"] = reply.header("Last-Modified").encode("utf-8")
+    return headers
+
+
+async def _get(
+    request: Request, headers: Dict[bytes, bytes], descr: str, priority: Priority
+) -> Reply:
+    reply = await request._request_and_return_bare_reply(
+        lambda r, _: request._session.network_manager.get(r),
+        b"",
+        descr,
+        headers,
+        priority,
+    )
+    if not reply.ok():
+        raise reply.exception()
+    return reply
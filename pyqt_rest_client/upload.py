@@ -0,0 +1,142 @@
+import os
+from collections.abc import Iterable
+from typing import Iterator, Optional, Union, cast
+
+from PyQt5.QtCore import QBuffer, QByteArray, QFile, QIODevice
+
+from .validation import Buffer
+
+UPLOAD_CHUNK_SIZE = 256 * 1024  # bytes
+UPLOAD_HEAD_SIZE = 64 * 1024  # bytes, the start of the body kept for error messages
+
+# The sources of the bodies that are uploaded without joining them into one bytes
+Source = Union[os.PathLike, QIODevice, Iterable]
+
+
+# Path, QIODevice or an iterable of bytes chunks, unlike json bodies: dict and list
+def is_upload_source(body) -> bool:
+    if isinstance(body, (UploadBody, os.PathLike, QIODevice)):
+        return True
+    return isinstance(body, Iterable) and not isinstance(
+        body, (str, bytes, bytearray, memoryview, dict, list)
+    )
+
+
+# The body is read by chunks, and they are hashed and sent by Qt as is
+# One-shot sources, iterables and sequential devices, are buffered on the first
+# read in a QByteArray, so they can be sent again on retries
+# Random access devices are sent from their current position and are not closed
+class UploadBody:
+    def __init__(self, source: Source):
+        self.source = source
+        self._start = 0  # Position of the random access device
+        self._buffer: Optional[QByteArray] = None
+        self._read = False
+        self.size = 0
+        self.head = b""
+
+        if isinstance(source, QIODevice) and not source.isSequential():
+            self._start = source.pos()
+
+    # Feeds the body to the hash object, like hashlib.sha256()
+    def update(self, digest):
+        for chunk in self.chunks():
+            digest.update(chunk)
+
+    # Qt devices are read only in their thread, so they are not hashed in workers
+    def thread_safe(self) -> bool:
+        return self._buffer is not None or not isinstance(self.source, QIODevice)
+
+    def chunks(self) -> Iterator[Buffer]:
+        if self._buffer is not None:
+            yield from _buffer_chunks(self._buffer)
+            return
+
+        if isinstance(self.source, os.PathLike):
+            chunks = _file_chunks(self.source)
+        elif isinstance(self.source, QIODevice) and not self.source.isSequential():
+            chunks = _device_chunks(self.source, self._start)
+        else:
+            chunks = self._buffered_chunks()
+
+        size = 0
+        head = []
+        for chunk in chunks:
+            head_rest = UPLOAD_HEAD_SIZE - size
+            if head_rest > 0:
+                head.append(bytes(chunk[:head_rest]))
+            size += len(chunk)
+            yield chunk
+
+        self.size = size
+        self.head = b"".join(head)
+        self._read = True
+
+    def _buffered_chunks(self) -> Iterator[Buffer]:
+        buffer = QByteArray()
+        chunks: Iterator[Buffer]
+        if isinstance(self.source, QIODevice):
+            chunks = _device_chunks(self.source, None)
+        else:  # Paths are not buffered, see chunks()
+            chunks = iter(cast(Iterable, self.source))
+
+        for chunk in chunks:
+            if not isinstance(chunk, (bytes, bytearray, memoryview)):
+                raise ValueError(
+                    f"Body chunk type: '{type(chunk).__name__}' must be bytes, "
+                    f"bytearray or memoryview"
+                )
+            buffer.append(bytes(chunk))
+            yield chunk
+        self._buffer = buffer
+
+    # The device to send, the caller owns it unless it is the source itself
+    def device(self) -> QIODevice:
+        if not self._read:
+            for _ in self.chunks():
+                pass
+
+        if self._buffer is not None:
+            device = QBuffer()
+            device.setData(self._buffer)
+        elif isinstance(self.source, os.PathLike):
+            device = QFile(os.fspath(self.source))
+        else:  # The random access device
+            device = cast(QIODevice, self.source)
+            device.seek(self._start)
+            return device
+
+        device.open(QIODevice.ReadOnly)
+        return device
+
+    def owns(self, device: QIODevice) -> bool:
+        return device is not self.source
+
+
+def _file_chunks(path: os.PathLike) -> Iterator[bytes]:
+    with open(path, "rb") as file:
+        while True:
+            chunk = file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+# Reads from the start position, if it is set, and moves back to it after reading
+def _device_chunks(device: QIODevice, start: Optional[int]) -> Iterator[bytes]:
+    if start is not None:
+        device.seek(start)
+    while True:
+        chunk = device.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+    if start is not None:
+        device.seek(start)
+
+
+def _buffer_chunks(buffer: QByteArray) -> Iterator[memoryview]:
+    view = memoryview(buffer)
+    for start in range(0, len(view), UPLOAD_CHUNK_SIZE):
+        end = start + UPLOAD_CHUNK_SIZE
+        yield view[start:end]
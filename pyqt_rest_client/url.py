@@ -1,19 +1,133 @@
-from urllib.parse import urljoin
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import quote, quote_plus, urljoin, urlparse
 
 import pyqt_rest_client as client
 
 
-def url(url_parts: list, args: dict = None) -> str:
+# The base_url of the client.login_data by default
+def url(url_parts: list, args: dict = None, base_url: str = None) -> str:
     if not url_parts:
         raise ValueError("url_parts: [] are empty")
 
     if "" in url_parts:
         raise ValueError(f"some parts of url are empty: {url_parts}")
 
-    relative_url = f'{"/".join(url_parts)}/'
+    relative_url = quote(f'{"/".join(url_parts)}/')
 
-    if args:
-        args_pairs = [f"{k}={v}" for k, v in args.items() if v]
-        relative_url += "?" + "&".join(args_pairs)  # args_path
+    if base_url is None:
+        base_url = client.login_data.base_url
+    return _join(base_url, relative_url) + query(args)
 
-    return urljoin(client.login_data.base_url, relative_url)
+
+# "?name=value&..." or "", the values are percent-encoded and None is skipped
+# The args with the names in skip are skipped too, like the params of the path
+def query(args: Optional[dict], skip: FrozenSet[str] = frozenset()) -> str:
+    if not args:
+        return ""
+
+    pairs = []
+    for name, value in args.items():
+        if value is None or name in skip:
+            continue
+        if isinstance(value, (list, tuple)):
+            encoded_name = _encode_name(name)
+            pairs += [f"{encoded_name}={_encode(item, quote_plus)}" for item in value]
+        else:
+            pairs.append(f"{_encode_name(name)}={_encode(value, quote_plus)}")
+    return "?" + "&".join(pairs) if pairs else ""
+
+
+# Most of the values are plain words and numbers, they are not quoted at all
+def _encode(value, quote_function=quote) -> str:
+    if type(value) is int:  # Like ids, the digits and "-" need no quoting
+        return str(value)
+    text = value if type(value) is str else str(value)
+    if text.isalnum() and text.isascii():
+        return text
+    return quote_function(text, safe="")
+
+
+# The same names are sent again and again, unlike the values
+@lru_cache(maxsize=256)
+def _encode_name(name) -> str:
+    return _encode(name, quote_plus)
+
+
+# Plain relative paths are appended to the cached directory of the base url
+# The rest ("/path", "../path" and so on) are resolved by urljoin
+def _join(base_url: str, relative_url: str) -> str:
+    directory = _base_directory(base_url)
+    if directory is None or relative_url.startswith("/") or "." in relative_url:
+        return urljoin(base_url, relative_url)
+    return directory + relative_url
+
+
+# None if the base url is not absolute, like "" before login(), urljoin("", ".")
+# is ".", so such bases are joined by urljoin
+@lru_cache(maxsize=64)
+def _base_directory(base_url: str) -> Optional[str]:
+    parts = urlparse(base_url)
+    if not parts.scheme or not parts.netloc:
+        return None
+    return urljoin(base_url, ".")
+
+
+# Url template like "pet/{id}" or "store/order/{order_id}", it is parsed once
+# The literal prefix, joined with the base url, is cached, so only the path
+# params and the query are encoded and appended per url
+class UrlTemplate:
+    def __init__(self, template: str):
+        if not template.strip("/"):
+            raise ValueError(f"template: '{template}' is empty")
+
+        self.template = template.strip("/") + "/"
+        # (literal, param name or None) pieces, literals are already encoded
+        pieces: List[Tuple[str, Optional[str]]] = [
+            (quote(literal), name)
+            for literal, name, _, _ in Formatter().parse(self.template)
+        ]
+        if any(name == "" or name and not name.isidentifier() for _, name in pieces):
+            raise ValueError(f"template: '{template}' has wrong params")
+
+        self.params = [name for _, name in pieces if name]
+        self._param_names = frozenset(self.params)
+        self._prefix = pieces[0][0]  # The literal till the first param
+        # The rest of the path with {} in place of the params
+        self._path_format = "".join(
+            ("" if index == 0 else literal) + ("" if name is None else "{}")
+            for index, (literal, name) in enumerate(pieces)
+        )
+        # base url -> (the joined prefix, the path template for the metrics)
+        self._prefixes: Dict[str, Tuple[str, str]] = {}
+
+    def prefix(self, base_url: str) -> Tuple[str, str]:
+        prefix = self._prefixes.get(base_url)
+        if prefix is None:
+            joined = urljoin(base_url, self._prefix)
+            path_template = urlparse(urljoin(base_url, self.template)).path
+            prefix = self._prefixes[base_url] = joined, path_template
+        return prefix
+
+    # The params that are not in the path are added to the query
+    def url(self, base_url: str, params: dict) -> str:
+        return self.url_and_path_template(base_url, params)[0]
+
+    # The url and the path template for the metrics, from one prefix lookup
+    def url_and_path_template(self, base_url: str, params: dict) -> Tuple[str, str]:
+        values = []
+        for name in self.params:
+            value = params.get(name)
+            if value is None:
+                raise ValueError(
+                    f"The params {self.params} of '{self.template}' are needed"
+                )
+            values.append(_encode(value))
+
+        prefix, path_template = self._prefixes.get(base_url) or self.prefix(base_url)
+        url = prefix + self._path_format.format(*values)
+        # The same param can be in the path several times, like "a/{id}/b/{id}"
+        if len(params) > len(self._param_names):
+            url += query(params, skip=self._param_names)
+        return url, path_template
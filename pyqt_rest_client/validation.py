@@ -0,0 +1,81 @@
+import json
+from functools import lru_cache
+from typing import Any, Union, get_args, get_origin
+
+import pydantic
+from pydantic import BaseModel
+
+PYDANTIC_V2 = pydantic.VERSION.startswith("2.")
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+# json.loads() does not accept memoryview, so it is decoded without a bytes copy
+def json_loads(data: Buffer) -> Any:
+    if isinstance(data, memoryview):
+        return json.loads(str(data, "utf-8"))
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj).encode("utf-8")
+
+
+# It is built once per res_type, unlike parse_obj_as() that builds
+# a wrapper model and validates through its instance on every call
+class Validator:
+    def __init__(self, res_type):
+        self.res_type = res_type
+
+        if PYDANTIC_V2:
+            self._adapter = pydantic.TypeAdapter(res_type)
+        else:
+            self._model = pydantic.create_model(
+                f"Validator[{getattr(res_type, '__name__', res_type)}]",
+                __root__=(res_type, ...),
+            )
+            self._field = self._model.__fields__["__root__"]
+
+    def validate_python(self, obj) -> Any:
+        if PYDANTIC_V2:
+            return self._adapter.validate_python(obj)
+
+        value, errors = self._field.validate(obj, {}, loc="__root__")
+        if errors:
+            raise pydantic.ValidationError([errors], self._model)
+        return value
+
+    # Pydantic 2 validates right from bytes, without python json.loads()
+    def validate_json(self, data: Buffer) -> Any:
+        if PYDANTIC_V2:
+            if isinstance(data, memoryview):
+                data = bytes(data)
+            return self._adapter.validate_json(data)
+        return self.validate_python(json_loads(data))
+
+    # Trusted data of models, or lists of them, is not validated at all
+    # Note that nested models are left as dicts, other types are validated
+    def construct(self, obj) -> Any:
+        model = _model_type(self.res_type)
+        if model is None:
+            return self.validate_python(obj)
+
+        construct = model.model_construct if PYDANTIC_V2 else model.construct
+        if model is self.res_type:
+            return construct(**obj)
+        return [construct(**item) for item in obj]
+
+
+@lru_cache(maxsize=None)
+def validator(res_type) -> Validator:
+    return Validator(res_type)
+
+
+# Returns the model for Model and List[Model], otherwise None
+def _model_type(res_type):
+    if get_origin(res_type) is list and get_args(res_type):
+        res_type = get_args(res_type)[0]
+
+    if isinstance(res_type, type) and issubclass(res_type, BaseModel):
+        return res_type
+    return None
@@ -1,45 +1,36 @@
-from PyQt5.QtCore import QByteArray, QTimer
-from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkReply
+from typing import Dict
 
-from pyqt_rest_client.request import Request
+from PyQt5.QtNetwork import QNetworkReply
 
+import pyqt_rest_client as client
+from pyqt_rest_client.memory_transport import MemoryResponse, MemoryTransport
 
+
+# Something like `requests-mock`, but for qt network based requests
+# The replies are sent by MemoryTransport, that is set as the network manager
+# of the default session, and its clones are the ones of the Clients
 class QtRequestsMock:
     def __init__(self, mocker):
-        self.registered_urls = {}
         self.mocker = mocker
-        self.mocker.patch.object(
-            Request, "to_patch", side_effect=self._patch_registered_replies
+        self.transport = MemoryTransport()
+        self.mocker.patch.object(client, "network_manager", self.transport)
+        self.mocker.patch(
+            "pyqt_rest_client.session.QNetworkAccessManager",
+            side_effect=self.transport.clone,
         )
 
-    def _patch_registered_replies(self, reply: QNetworkReply):
-        try:
-            url = reply.url().url()
-            if url[-1] != "/":
-                url += "/"
-
-            text, status_code, qt_err = self.registered_urls[(url, reply.operation())]
-            self.mocker.patch.object(reply, "error", return_value=qt_err)
-            self.mocker.patch.object(reply, "attribute", return_value=status_code)
-            self.mocker.patch.object(
-                reply, "readAll", return_value=QByteArray(text.encode("utf-8"))
-            )
-            QTimer.singleShot(1, reply.close)
-        except KeyError:
-            pass
-
     def _register_mock(
         self,
-        operation,
+        operation: str,
         url: str,
         text: str,
         status_code: int,
         qt_err: QNetworkReply.NetworkError,
+        headers: Dict[str, str],
     ):
-        if url[-1] != "/":
-            url += "/"
-
-        self.registered_urls[(url, operation)] = text, status_code, qt_err
+        self.transport.add(
+            operation, url, MemoryResponse(text, status_code, headers, qt_err)
+        )
 
     def get(
         self,
@@ -47,10 +38,9 @@ class QtRequestsMock:
         text: str = "",
         status_code: int = 200,
         qt_err: QNetworkReply.NetworkError = QNetworkReply.NoError,
+        headers: Dict[str, str] = None,
     ):
-        self._register_mock(
-            QNetworkAccessManager.GetOperation, url, text, status_code, qt_err
-        )
+        self._register_mock("GET", url, text, status_code, qt_err, headers or {})
 
     def post(
         self,
@@ -58,10 +48,9 @@ class QtRequestsMock:
         text: str = "",
         status_code: int = 200,
         qt_err: QNetworkReply.NetworkError = QNetworkReply.NoError,
+        headers: Dict[str, str] = None,
     ):
-        self._register_mock(
-            QNetworkAccessManager.PostOperation, url, text, status_code, qt_err
-        )
+        self._register_mock("POST", url, text, status_code, qt_err, headers or {})
 
     def put(
         self,
@@ -69,10 +58,9 @@ class QtRequestsMock:
         text: str = "",
         status_code: int = 200,
         qt_err: QNetworkReply.NetworkError = QNetworkReply.NoError,
+        headers: Dict[str, str] = None,
     ):
-        self._register_mock(
-            QNetworkAccessManager.PutOperation, url, text, status_code, qt_err
-        )
+        self._register_mock("PUT", url, text, status_code, qt_err, headers or {})
 
     def delete(
         self,
@@ -80,7 +68,6 @@ class QtRequestsMock:
         text: str = "",
         status_code: int = 200,
         qt_err: QNetworkReply.NetworkError = QNetworkReply.NoError,
+        headers: Dict[str, str] = None,
     ):
-        self._register_mock(
-            QNetworkAccessManager.DeleteOperation, url, text, status_code, qt_err
-        )
+        self._register_mock("DELETE", url, text, status_code, qt_err, headers or {})
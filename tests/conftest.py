@@ -1,3 +1,7 @@
+import socket
+import threading
+from http.server import ThreadingHTTPServer
+
 import pytest
 import qasync
 from pytestqt.qtbot import QtBot
@@ -26,6 +30,37 @@ def login_mock():
     return client
 
 
+# Starts a local HTTP server with the BaseHTTPRequestHandler subclass and
+# returns its url, "http://127.0.0.1:<port>/", the servers are stopped after
+# the test. The requests are not logged
+@pytest.fixture
+def local_server():
+    servers = []
+
+    def serve(handler) -> str:
+        quiet_handler = type(
+            handler.__name__, (handler,), {"log_message": lambda *args: None}
+        )
+        server = ThreadingHTTPServer(("127.0.0.1", 0), quiet_handler)
+        threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/"
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def silent_server_url():
+    # It accepts connections, but never replies
+    with socket.socket() as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        yield f"http://127.0.0.1:{server.getsockname()[1]}/items/"
+
+
 @pytest.fixture
 def qt_requests_mock(mocker, qtbot):
     return QtRequestsMock(mocker)
@@ -17,12 +17,58 @@ async def async_function_that_we_run_as_synch():
 
 def test_async_task_decorator(qtbot):
     async_function_that_we_run_as_synch()
-    qtbot.wait_until(lambda: async_action_completed)
+    qtbot.wait_until(
+        lambda: async_action_completed and not asyncio_integration._task_groups
+    )
 
 
 def test_connect_async_task_decorator_as_a_slot(qtbot):
+    global async_action_completed
+    async_action_completed = False
+
     QTimer.singleShot(1, async_function_that_we_run_as_synch)
     qtbot.wait_until(
-        lambda: async_action_completed
-        and not asyncio_integration._release_exceptions_timers
+        lambda: async_action_completed and not asyncio_integration._task_groups
     )
+
+
+@asyncio_integration.async_task
+async def async_function_that_fails():
+    raise RuntimeError("Some error")
+
+
+def test_exceptions_are_released(qtbot):
+    with qtbot.capture_exceptions() as exceptions:
+        async_function_that_fails()
+        qtbot.wait_until(lambda: bool(exceptions))
+
+    assert type(exceptions[0][1]) is RuntimeError
+    assert not asyncio_integration._task_groups
+
+
+async def endless_task():
+    await sleep(100)
+
+
+endless_window_task = asyncio_integration.async_task(endless_task, group="window")
+
+
+def test_cancel_task_group(qtbot):
+    qtbot.wait_until(lambda: not asyncio_integration._task_groups)
+
+    first = endless_window_task()
+    second = endless_window_task()
+    other = asyncio_integration.async_task(endless_task)()
+    assert asyncio_integration.running_tasks_count("window") == 2
+    assert asyncio_integration.running_tasks_count() == 3
+
+    with qtbot.capture_exceptions() as exceptions:
+        asyncio_integration.cancel_task_group("window")
+        qtbot.wait_until(lambda: first.cancelled() and second.cancelled())
+
+    assert not exceptions  # Cancellation is not an error
+    assert asyncio_integration.running_tasks_count("window") == 0
+    assert not other.done()
+
+    other.cancel()
+    qtbot.wait_until(lambda: not asyncio_integration._task_groups)
@@ -0,0 +1,96 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import pyqt_rest_client as client
+from pyqt_rest_client import Sha256Signer, Signer, endpoint
+from pyqt_rest_client.cache import ResponseCache
+from pyqt_rest_client.request import create_authentication_header
+from pyqt_rest_client.upload import UploadBody
+
+
+def expected_headers(body: bytes) -> dict:
+    return {b"Authentication": create_authentication_header("user", b"secret", body)}
+
+
+async def test_sha256_signer(qtbot):
+    signer = Sha256Signer("user", b"secret")
+
+    assert await signer.sign(b"") == expected_headers(b"")
+    assert await signer.sign(b"") is await signer.sign(b"")
+    assert await signer.sign(b"body") == expected_headers(b"body")
+    assert await signer.sign(b"other") == expected_headers(b"other")
+
+
+async def test_big_bodies_are_signed_in_worker(qtbot, mocker):
+    executor = ThreadPoolExecutor(1)
+    submit = mocker.spy(executor, "submit")
+    signer = Sha256Signer("user", b"secret", worker_min_size=4, executor=executor)
+
+    assert await signer.sign(b"abc") == expected_headers(b"abc")
+    assert submit.call_count == 0
+    assert await signer.sign(b"abcd") == expected_headers(b"abcd")
+    assert submit.call_count == 1
+    executor.shutdown()
+
+
+async def test_upload_body_is_signed_once(qtbot, mocker):
+    signer = Sha256Signer("user", b"secret")
+    body = UploadBody(iter([b"a", b"b"]))
+    update = mocker.spy(body, "update")
+
+    assert await signer.sign(body) == expected_headers(b"ab")
+    assert await signer.sign(body) == expected_headers(b"ab")
+    assert update.call_count == 1
+
+
+class TokenSigner(Signer):
+    def __init__(self):
+        self.bodies = []
+
+    async def sign(self, body):
+        self.bodies.append(body)
+        return {b"Authorization": b"Bearer token"}
+
+
+@pytest.mark.parametrize("operation", ["post", "put"])
+async def test_endpoint_signer(qtbot, login_mock, qt_requests_mock, operation):
+    signer = TokenSigner()
+    pet_endpoint = endpoint(str, ["pet"], signer=signer)
+    getattr(qt_requests_mock, operation)(pet_endpoint.url, text="ok")
+
+    assert await getattr(pet_endpoint, operation)(b"{}", "") == "ok"
+    assert signer.bodies == [b"{}"]
+    sent_headers = qt_requests_mock.transport.requests[0].headers
+    assert sent_headers[b"Authorization"] == b"Bearer token"
+    assert b"Authentication" not in sent_headers
+    assert client.login_data.signer is not signer
+
+
+def test_signer_is_abstract():
+    with pytest.raises(TypeError):
+        Signer()
+
+
+@pytest.mark.parametrize("with_cache", [False, True])
+async def test_gets_of_other_signers_are_not_shared(
+    qtbot, login_mock, qt_requests_mock, monkeypatch, with_cache
+):
+    if with_cache:
+        monkeypatch.setattr(client, "response_cache", ResponseCache())
+    qt_requests_mock.get(
+        endpoint(str, ["pet"]).url,
+        text="ok",
+        headers={"Cache-Control": "max-age=60"},
+    )
+
+    signed_by_login = endpoint(str, ["pet"]).get("")
+    signed_by_token = endpoint(str, ["pet"], signer=TokenSigner()).get("")
+    assert await asyncio.gather(signed_by_login, signed_by_token) == ["ok", "ok"]
+    assert await endpoint(str, ["pet"], signer=TokenSigner()).get("") == "ok"
+
+    headers = [request.headers for request in qt_requests_mock.transport.requests]
+    assert len(headers) == 3
+    assert b"Authentication" in headers[0]
+    assert headers[1][b"Authorization"] == headers[2][b"Authorization"]
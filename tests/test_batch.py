@@ -0,0 +1,87 @@
+import pytest
+from pydantic import BaseModel
+from PyQt5.QtNetwork import QNetworkReply
+
+import pyqt_rest_client as client
+from pyqt_rest_client import (
+    Client,
+    MemoryResponse,
+    MemoryTransport,
+    endpoint,
+    gather_requests,
+    requests_as_completed,
+)
+from pyqt_rest_client.reply import ReplyGotError
+
+BASE_URL = "http://server:1234/api/v1.8/"
+
+
+class _Item(BaseModel):
+    id: int
+
+
+@pytest.fixture
+def items_mock(login_mock, qt_requests_mock):
+    for item_id in range(5):
+        qt_requests_mock.get(f"{BASE_URL}items/{item_id}/", text=f'{{"id": {item_id}}}')
+    qt_requests_mock.get(
+        f"{BASE_URL}items/404/", qt_err=QNetworkReply.ContentNotFoundError
+    )
+
+
+async def test_gather_requests(qtbot, items_mock):
+    items = [(["items", str(item_id)], None) for item_id in [0, 1, 404, 2]]
+
+    result = await gather_requests(items, _Item, max_parallel=2)
+
+    assert not result.ok()
+    assert result.successes == {0: _Item(id=0), 1: _Item(id=1), 3: _Item(id=2)}
+    assert list(result.errors) == [2]
+    assert type(result.errors[2]) is ReplyGotError
+
+
+async def test_gather_requests_from_request_objects(qtbot, items_mock):
+    requests = [endpoint(_Item, ["items", "0"]), endpoint(dict, ["items", "1"])]
+
+    result = await gather_requests(requests)
+
+    assert result.ok()
+    assert result.successes == {0: _Item(id=0), 1: {"id": 1}}
+
+
+async def test_requests_as_completed_reports_progress(qtbot, items_mock):
+    items = [(["items", str(item_id)], None) for item_id in range(5)]
+    progress = []
+    client.request_notifier.batch_progress.connect(lambda *args: progress.append(args))
+
+    with qtbot.wait_signal(client.request_notifier.request_finished):
+        results = [
+            result
+            async for result in requests_as_completed(
+                items, _Item, max_parallel=2, descr="items"
+            )
+        ]
+
+    assert sorted(results, key=lambda result: result[0]) == [
+        (item_id, _Item(id=item_id)) for item_id in range(5)
+    ]
+    assert progress == [("items", done, 5) for done in range(1, 6)]
+
+
+async def test_batch_of_client(qtbot):
+    transport = MemoryTransport()
+    transport.add("GET", "items/{id}", lambda request: MemoryResponse(request.params))
+    session = Client(BASE_URL, network_manager=transport)
+    progress = []
+    session.request_notifier.batch_progress.connect(lambda *args: progress.append(args))
+    client.request_notifier.batch_progress.connect(lambda *args: progress.append(None))
+
+    result = await gather_requests(
+        [(["items", "1"], None), session.endpoint(dict, ["items", "2"])],
+        dict,
+        descr="items",
+        session=session,
+    )
+
+    assert result.successes == {0: {"id": "1"}, 1: {"id": "2"}}
+    assert progress == [("items", 1, 2), ("items", 2, 2)]
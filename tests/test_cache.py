@@ -0,0 +1,169 @@
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+import pyqt_rest_client as client
+from pyqt_rest_client import endpoint
+from pyqt_rest_client.cache import ResponseCache, expiration_time
+from pyqt_rest_client.reply import Reply, ReplyGotError
+
+
+def fake_reply(mocker, data: bytes = b"", headers: dict = None) -> Reply:
+    mocker.patch.object(Reply, "__init__", return_value=None)
+    # noinspection PyArgumentList
+    reply = Reply()  # type: ignore
+    reply.data = data
+    mocker.patch.object(
+        reply, "header", side_effect=lambda name: (headers or {}).get(name, "")
+    )
+    return reply
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({}, None),
+        ({"Cache-Control": "no-store, max-age=60"}, None),
+        ({"Cache-Control": "max-age=60"}, "fresh"),
+        ({"Cache-Control": "public, max-age=60"}, "fresh"),
+        ({"Cache-Control": "no-cache, max-age=60", "ETag": '"1"'}, "stale"),
+        ({"ETag": '"1"'}, "stale"),
+        ({"Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"}, "stale"),
+    ],
+)
+def test_expiration_time(mocker, headers, expected):
+    expires_at = expiration_time(fake_reply(mocker, headers=headers))
+
+    if expected is None:
+        assert expires_at is None
+    else:
+        cache = ResponseCache()
+        entry = cache.store(("url", ""), fake_reply(mocker, b"data", headers))
+        assert entry.is_fresh() == (expected == "fresh")
+
+
+def test_validation_headers(mocker):
+    cache = ResponseCache()
+    entry = cache.store(
+        ("url", ""),
+        fake_reply(mocker, headers={"ETag": '"1"', "Last-Modified": "yesterday"}),
+    )
+
+    assert entry.validation_headers() == {
+        b"If-None-Match": b'"1"',
+        b"If-Modified-Since": b"yesterday",
+    }
+
+
+def test_lru_eviction(mocker):
+    cache = ResponseCache(max_size=20)
+    reply = fake_reply(mocker, b"0123456789", {"Cache-Control": "max-age=60"})
+
+    cache.store(("first", ""), reply)
+    cache.store(("second", ""), reply)
+    cache.lookup(("first", ""))  # Now "second" is the least recently used
+    cache.store(("third", ""), reply)
+
+    assert cache.size == 20
+    assert cache.lookup(("first", ""))
+    assert not cache.lookup(("second", ""))
+    assert cache.lookup(("third", ""))
+
+
+def test_too_big_replies_are_not_stored(mocker):
+    cache = ResponseCache(max_size=5)
+    cache.store(
+        ("url", ""), fake_reply(mocker, b"0123456789", {"Cache-Control": "max-age=60"})
+    )
+
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_invalidate(mocker):
+    cache = ResponseCache()
+    reply = fake_reply(mocker, b"data", {"Cache-Control": "max-age=60"})
+    cache.store(("url", "user"), reply)
+    cache.store(("url", "another user"), reply)
+    cache.store(("another url", "user"), reply)
+
+    cache.invalidate("url")
+
+    assert len(cache) == 1
+    assert cache.size == 4
+
+
+class _Item(BaseModel):
+    id: int
+
+
+@pytest.fixture
+def response_cache(login_mock):
+    client.use_response_cache()
+    yield client.response_cache
+    client.use_response_cache(None)
+
+
+@pytest.fixture
+def items_endpoint():
+    return endpoint(List[_Item], ["items"])
+
+
+async def test_fresh_replies_are_taken_from_cache(
+    qtbot, qt_requests_mock, response_cache, items_endpoint
+):
+    qt_requests_mock.get(
+        items_endpoint.url,
+        text='[{"id": 1}]',
+        headers={"Cache-Control": "max-age=60"},
+    )
+
+    first = await items_endpoint.get("")
+    second = await items_endpoint.get("")
+
+    assert first == second == [_Item(id=1)]
+    assert response_cache.misses == 1
+    assert response_cache.hits == 1
+    assert response_cache.resource_hits == 1
+    assert response_cache.saved_bytes == len(b'[{"id": 1}]')
+
+
+async def test_stale_replies_are_revalidated(
+    qtbot, qt_requests_mock, response_cache, items_endpoint
+):
+    qt_requests_mock.get(items_endpoint.url, text='[{"id": 1}]', headers={"ETag": "1"})
+    assert await items_endpoint.get("") == [_Item(id=1)]
+
+    qt_requests_mock.get(items_endpoint.url, status_code=304, headers={"ETag": "1"})
+    assert await items_endpoint.get("") == [_Item(id=1)]
+
+    assert response_cache.misses == 1
+    assert response_cache.revalidations == 1
+    assert response_cache.hits == 0
+
+
+async def test_modifications_invalidate_cache(
+    qtbot, qt_requests_mock, response_cache, items_endpoint
+):
+    headers = {"Cache-Control": "max-age=60"}
+    qt_requests_mock.get(items_endpoint.url, text='[{"id": 1}]', headers=headers)
+    qt_requests_mock.post(items_endpoint.url, text="[]")
+
+    await items_endpoint.get("")
+    await items_endpoint.post(b"", "")
+    await items_endpoint.get("")
+
+    assert response_cache.misses == 2
+    assert response_cache.hits == 0
+
+
+async def test_errors_are_not_cached(
+    qtbot, qt_requests_mock, response_cache, items_endpoint
+):
+    qt_requests_mock.get(items_endpoint.url, status_code=500, qt_err=401)
+
+    with pytest.raises(ReplyGotError):
+        await items_endpoint.get("")
+
+    assert len(response_cache) == 0
@@ -0,0 +1,215 @@
+import asyncio
+import os
+import time
+
+import pytest
+from PyQt5.QtNetwork import QNetworkReply
+
+from pyqt_rest_client import (
+    Cassette,
+    Client,
+    MemoryResponse,
+    MemoryTransport,
+    RecordingTransport,
+    ReplayTransport,
+)
+from pyqt_rest_client.cassette import ENTRY, Exchange, body_sha256
+from pyqt_rest_client.reply import Reply, ReplyGotError
+
+BASE_URL = "http://server:1234/api/"
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "session.cassette")
+
+
+def exchange(url: str, body: bytes = b"[]") -> Exchange:
+    return Exchange(
+        "GET", url, body_sha256(b""), 200, [("ETag", '"1"')], 0, "", 0, 0.01, 0.02, body
+    )
+
+
+def test_cassette_is_reopened(path):
+    cassette = Cassette(path)
+    cassette.append(exchange(f"{BASE_URL}pet/1", b'{"id": 1}'))
+    cassette.append(exchange(f"{BASE_URL}pet/1", b'{"id": 2}'))
+    cassette.append(exchange(f"{BASE_URL}pet/2"))
+    cassette.close()
+
+    cassette = Cassette(path)
+    offsets = cassette.offsets("GET", f"{BASE_URL}pet/1", body_sha256(b""))
+    assert len(cassette) == 3
+    assert [cassette.read(offset).body for offset in offsets] == [
+        b'{"id": 1}',
+        b'{"id": 2}',
+    ]
+    assert cassette.read(offsets[0]).headers == [("ETag", '"1"')]
+    assert cassette.offsets("GET", f"{BASE_URL}pet/3", body_sha256(b"")) == []
+
+
+def test_index_is_rebuilt(path):
+    cassette = Cassette(path)
+    for id in range(3):
+        cassette.append(exchange(f"{BASE_URL}pet/{id}"))
+    cassette.close()
+    with open(path + ".index", "r+b") as index:
+        index.truncate(ENTRY.size + 5)  # The second entry is not written
+
+    cassette = Cassette(path)
+    assert len(cassette) == 3
+    assert cassette.offsets("GET", f"{BASE_URL}pet/2", body_sha256(b""))
+    assert os.path.getsize(path + ".index") == 3 * ENTRY.size
+    cassette.close()
+
+    os.remove(path + ".index")
+    assert len(Cassette(path)) == 3
+
+
+def test_cut_record_is_dropped(path):
+    cassette = Cassette(path)
+    cassette.append(exchange(f"{BASE_URL}pet/1"))
+    cassette.append(exchange(f"{BASE_URL}pet/2"))
+    cassette.close()
+    size = os.path.getsize(path)
+    with open(path, "r+b") as file:
+        file.truncate(size - 3)
+
+    cassette = Cassette(path)
+    assert len(cassette) == 1
+    cassette.append(exchange(f"{BASE_URL}pet/3"))
+    assert [item.url for item in cassette] == [f"{BASE_URL}pet/1", f"{BASE_URL}pet/3"]
+
+
+def test_not_cassette(path):
+    with open(path, "wb") as file:
+        file.write(b"something else")
+
+    with pytest.raises(ValueError):
+        Cassette(path)
+
+
+GONE_HEADERS = {"X-Id": "1", "X-Name": "caf\xe9"}  # Headers are latin-1
+
+
+async def record(path: str) -> MemoryTransport:
+    server = MemoryTransport()
+    server.add("GET", "pet/{id}", lambda request: MemoryResponse(request.params))
+    server.add("POST", "pet", lambda request: MemoryResponse(request.json()))
+    server.add("GET", "slow", MemoryResponse("slow", latency_ms=100))
+    server.add("GET", "gone", MemoryResponse(status=410, headers=GONE_HEADERS))
+
+    cassette = Cassette(path)
+    session = Client(BASE_URL, network_manager=RecordingTransport(cassette, server))
+    assert await session.endpoint(dict, ["pet", "1"]).get("") == {"id": "1"}
+    assert await session.endpoint(dict, ["pet"]).post({"name": "a"}, "") == {
+        "name": "a"
+    }
+    assert await session.endpoint(dict, ["pet"]).post({"name": "b"}, "") == {
+        "name": "b"
+    }
+    assert await session.endpoint(str, ["slow"]).get("") == "slow"
+    with pytest.raises(ReplyGotError):
+        await session.endpoint(str, ["gone"]).get("")
+    cassette.close()
+    return server
+
+
+async def test_replay(qtbot, path):
+    await record(path)
+    session = Client(BASE_URL, network_manager=ReplayTransport(Cassette(path)))
+
+    assert await session.endpoint(dict, ["pet"]).post({"name": "b"}, "") == {
+        "name": "b"
+    }
+    assert await session.endpoint(dict, ["pet", "1"]).get("") == {"id": "1"}
+    assert await session.endpoint(dict, ["pet"]).post({"name": "a"}, "") == {
+        "name": "a"
+    }
+
+    with pytest.raises(ReplyGotError) as error:
+        await session.endpoint(str, ["gone"]).get("")
+    reply = Reply(error.value)
+    assert reply.http_code() == 410
+    assert reply.reply.error() == QNetworkReply.ContentGoneError
+    assert reply.header("X-Id") == "1"
+    assert reply.reply.rawHeader(b"X-Name").data() == b"caf\xe9"
+
+
+async def test_replay_timings(qtbot, path):
+    await record(path)
+    cassette = Cassette(path)
+    request = Client(BASE_URL, network_manager=ReplayTransport(cassette)).endpoint(
+        str, ["slow"]
+    )
+    fast_request = Client(
+        BASE_URL, network_manager=ReplayTransport(cassette, realtime=False)
+    ).endpoint(str, ["slow"])
+
+    start = time.perf_counter()
+    assert await request.get("") == "slow"
+    realtime = time.perf_counter() - start
+    assert await fast_request.get("") == "slow"
+    fast = time.perf_counter() - start - realtime
+
+    assert realtime >= 0.095 and fast < 0.05
+
+
+async def test_same_requests_are_replayed_in_order(qtbot, path):
+    cassette = Cassette(path)
+    cassette.append(exchange(f"{BASE_URL}pet/", b"first"))
+    cassette.append(exchange(f"{BASE_URL}pet/", b"second"))
+    request = Client(BASE_URL, network_manager=ReplayTransport(cassette)).endpoint(
+        str, ["pet"]
+    )
+
+    assert [await request.get("") for _ in range(3)] == ["first", "second", "second"]
+
+
+async def test_not_recorded_request(qtbot, path):
+    await record(path)
+    transport = ReplayTransport(Cassette(path))
+    session = Client(BASE_URL, network_manager=transport)
+
+    with pytest.raises(ReplyGotError) as error:
+        await session.endpoint(dict, ["pet"]).post({"name": "c"}, "")
+
+    assert Reply(error.value).http_code() == 404
+    assert [request.url for request in transport.missed] == [f"{BASE_URL}pet/"]
+
+
+async def test_aborted_request_is_not_recorded(qtbot, path):
+    server = MemoryTransport()
+    server.add("GET", "pet", MemoryResponse("late", latency_ms=10_000))
+    cassette = Cassette(path)
+    transport = RecordingTransport(cassette, server)
+    session = Client(BASE_URL, network_manager=transport)
+
+    task = asyncio.ensure_future(session.endpoint(str, ["pet"]).get(""))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.sleep(0.01)
+
+    assert session.active_requests == []
+    assert transport._replies == {} and server._timers == {}
+    assert len(cassette) == 0
+
+
+async def test_clone_replays_by_itself(qtbot, path):
+    cassette = Cassette(path)
+    cassette.append(exchange(f"{BASE_URL}pet/", b"first"))
+    cassette.append(exchange(f"{BASE_URL}pet/", b"second"))
+    transport = ReplayTransport(cassette, realtime=False)
+    transport.add("GET", "added", MemoryResponse("added"))
+    clone = transport.clone()
+    session = Client(BASE_URL, network_manager=transport)
+    clone_session = Client(BASE_URL, network_manager=clone)
+
+    assert await session.endpoint(str, ["pet"]).get("") == "first"
+    assert await clone_session.endpoint(str, ["pet"]).get("") == "first"
+    assert await clone_session.endpoint(str, ["added"]).get("") == "added"
+    with pytest.raises(ReplyGotError):
+        await clone_session.endpoint(str, ["other"]).get("")
+
+    assert [request.url for request in clone.missed] == [f"{BASE_URL}other/"]
+    assert transport.missed == []
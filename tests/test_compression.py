@@ -0,0 +1,136 @@
+import gzip
+import hashlib
+import json
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from typing import List
+
+import pytest
+
+from pyqt_rest_client import Client, Compression, MetricsCollector
+from pyqt_rest_client.compression import DecompressionError
+
+ITEMS = [{"id": i, "name": "doggie", "status": "available"} for i in range(1000)]
+ITEMS_JSON = json.dumps(ITEMS).encode("utf-8")
+
+
+class _CompressingHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        accept = self.headers.get("Accept-Encoding", "")
+        if self.path.startswith("/corrupted"):
+            self._reply(b"not gzip at all", {"Content-Encoding": "gzip"})
+        elif "gzip" in accept:
+            self._reply(gzip.compress(ITEMS_JSON), {"Content-Encoding": "gzip"})
+        elif "deflate" in accept:
+            self._reply(zlib.compress(ITEMS_JSON), {"Content-Encoding": "deflate"})
+        else:
+            self._reply(ITEMS_JSON)
+
+    # Replies the encoding and the sha256 of the decompressed body
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        encoding = self.headers.get("Content-Encoding", "")
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        self._reply(
+            json.dumps(
+                {"encoding": encoding, "sha256": hashlib.sha256(body).hexdigest()}
+            ).encode("utf-8")
+        )
+
+    def _reply(self, body: bytes, headers: dict = None):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def session(qtbot, local_server):
+    return Client(local_server(_CompressingHandler), metrics=MetricsCollector())
+
+
+@pytest.fixture
+def measured(session):
+    measured = []
+    session.metrics.request_measured.connect(measured.append)
+    return measured
+
+
+def test_unavailable_encoding():
+    with pytest.raises(ValueError):
+        Compression(accept=["gzip", "lzma"])
+    with pytest.raises(ValueError):
+        Compression(request_encoding="lzma")
+
+
+def test_decompressor_is_incremental():
+    compressed = gzip.compress(ITEMS_JSON)
+    decompress = Compression().decompressor("gzip")
+
+    offsets = list(range(0, len(compressed), 100)) + [len(compressed)]
+    data = b"".join(
+        decompress(compressed[start:end]) for start, end in zip(offsets, offsets[1:])
+    )
+
+    assert data == ITEMS_JSON
+    with pytest.raises(ValueError):
+        Compression().decompressor("gzip")(b"not gzip at all")
+
+
+@pytest.mark.parametrize("accept", [["gzip"], ["deflate"]])
+@pytest.mark.parametrize("worker_min_size", [0, 256 * 1024])
+async def test_reply_is_decompressed(session, measured, accept, worker_min_size):
+    compression = Compression(accept=accept, worker_min_size=worker_min_size)
+    items = session.endpoint(List[dict], ["items"], compression=compression)
+
+    assert await items.get("") == ITEMS
+    assert measured[0].bytes_received < len(ITEMS_JSON) / 10
+    assert measured[0].uncompressed_bytes_received == len(ITEMS_JSON)
+
+
+async def test_reply_is_streamed_and_decompressed(session, measured):
+    compression = Compression(accept=["gzip"])
+    items = session.endpoint(List[dict], ["items"], compression=compression)
+
+    assert [item async for item in items.stream_get("")] == ITEMS
+    assert measured[0].bytes_received < len(ITEMS_JSON) / 10
+    assert measured[0].uncompressed_bytes_received == len(ITEMS_JSON)
+
+
+async def test_corrupted_reply(session):
+    corrupted = session.endpoint(
+        List[dict], ["corrupted"], compression=Compression(accept=["gzip"])
+    )
+
+    with pytest.raises(DecompressionError):
+        await corrupted.get("")
+
+
+@pytest.mark.parametrize("worker_min_size", [0, 256 * 1024])
+async def test_body_is_compressed(session, measured, worker_min_size):
+    compression = Compression(
+        request_encoding="gzip",
+        worker_min_size=worker_min_size,
+        executor=ThreadPoolExecutor(1),
+    )
+    items = session.endpoint(dict, ["items"], compression=compression)
+
+    assert await items.post(ITEMS, "") == {
+        "encoding": "gzip",
+        "sha256": hashlib.sha256(ITEMS_JSON).hexdigest(),
+    }
+    assert measured[0].bytes_sent < len(ITEMS_JSON) / 10
+    assert measured[0].uncompressed_bytes_sent == len(ITEMS_JSON)
+
+
+async def test_small_body_is_not_compressed(session):
+    compression = Compression(request_encoding="gzip")
+    items = session.endpoint(dict, ["items"], compression=compression)
+
+    reply = await items.post({"id": 1}, "")
+
+    assert reply["encoding"] == ""
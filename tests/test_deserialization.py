@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+import pyqt_rest_client as client
+from pyqt_rest_client import endpoint
+from pyqt_rest_client.deserialization import DeserializationPool
+
+
+class _Item(BaseModel):
+    id: int
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield executor
+
+
+async def test_small_data_is_casted_inline(mocker, executor):
+    submit = mocker.spy(executor, "submit")
+    pool = DeserializationPool(executor, min_size=1024)
+
+    assert await pool.cast(b'[{"id": 1}]', List[_Item]) == [_Item(id=1)]
+    submit.assert_not_called()
+
+
+async def test_big_data_is_casted_in_executor(mocker, executor):
+    submit = mocker.spy(executor, "submit")
+    pool = DeserializationPool(executor, min_size=0)
+
+    assert await pool.cast(b'[{"id": 1}]', List[_Item]) == [_Item(id=1)]
+    submit.assert_called_once()
+
+
+async def test_request_uses_deserialization_pool(
+    login_mock, qtbot, qt_requests_mock, executor
+):
+    items_endpoint = endpoint(List[_Item], ["items"])
+    qt_requests_mock.get(items_endpoint.url, text='[{"id": 1}, {"id": 2}]')
+
+    client.use_deserialization_pool(executor, min_size=0)
+    try:
+        assert type(client.deserialization_pool) is DeserializationPool
+        assert await items_endpoint.get("") == [_Item(id=1), _Item(id=2)]
+    finally:
+        client.use_deserialization_pool(None)
+
+    assert client.deserialization_pool is None
@@ -0,0 +1,124 @@
+import hashlib
+import mmap
+from http.server import BaseHTTPRequestHandler
+from typing import List
+
+import pytest
+from PyQt5.QtNetwork import QNetworkReply
+
+import pyqt_rest_client as client
+from pyqt_rest_client import endpoint
+from pyqt_rest_client.download import DownloadChecksumError
+from pyqt_rest_client.reply import ReplyGotError
+from pyqt_rest_client.request import Request
+
+DATA = bytes(range(256)) * 1000
+
+
+@pytest.fixture
+def export_endpoint(login_mock, qt_requests_mock):
+    export_endpoint = endpoint(bytes, ["export"])
+    qt_requests_mock.get(export_endpoint.url, text=DATA.decode("latin-1"))
+    return export_endpoint
+
+
+@pytest.fixture
+def latin1_data():
+    # QtRequestsMock encodes the text to utf-8, so the binary data is simpler
+    # to check as the utf-8 encoded latin-1 text
+    return DATA.decode("latin-1").encode("utf-8")
+
+
+async def test_download_to_file(qtbot, export_endpoint, latin1_data, tmp_path):
+    path = str(tmp_path / "export.bin")
+
+    size = await export_endpoint.download(
+        path, "", expected_sha256=hashlib.sha256(latin1_data).hexdigest()
+    )
+
+    assert size == len(latin1_data)
+    with open(path, "rb") as file:
+        assert file.read() == latin1_data
+
+
+async def test_download_to_mmap(qtbot, export_endpoint, latin1_data):
+    buffer = mmap.mmap(-1, len(latin1_data))
+
+    assert await export_endpoint.download(buffer, "") == len(latin1_data)
+    assert buffer[:] == latin1_data
+
+
+async def test_download_to_too_small_mmap(qtbot, export_endpoint):
+    with pytest.raises(ValueError):
+        await export_endpoint.download(mmap.mmap(-1, 10), "")
+
+
+async def test_download_checksum_mismatch(qtbot, export_endpoint, tmp_path):
+    with pytest.raises(DownloadChecksumError):
+        await export_endpoint.download(
+            str(tmp_path / "export.bin"), "", expected_sha256="0" * 64
+        )
+
+
+async def test_download_error(qtbot, login_mock, qt_requests_mock, tmp_path):
+    export_endpoint = endpoint(bytes, ["export"])
+    qt_requests_mock.get(
+        export_endpoint.url,
+        text="Not found",
+        status_code=404,
+        qt_err=QNetworkReply.ContentNotFoundError,
+    )
+    path = tmp_path / "export.bin"
+
+    with pytest.raises(ReplyGotError):
+        await export_endpoint.download(str(path), "")
+    assert path.read_bytes() == b""
+
+
+class _InterruptingHandler(BaseHTTPRequestHandler):
+    # The first request is interrupted in the middle, the next ones are resumed
+    requests_ranges: List[str] = []
+
+    def do_GET(self):
+        range_header = self.headers.get("Range", "")
+        self.requests_ranges.append(range_header)
+
+        if not range_header:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(DATA)))
+            self.end_headers()
+            self.wfile.write(DATA[: len(DATA) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        start = int(range_header.split("=")[1].rstrip("-"))
+        self.send_response(206)
+        self.send_header("Content-Length", str(len(DATA) - start))
+        self.end_headers()
+        self.wfile.write(DATA[start:])
+
+
+@pytest.fixture
+def interrupting_server_url(local_server):
+    _InterruptingHandler.requests_ranges = []
+    return local_server(_InterruptingHandler) + "export"
+
+
+async def test_download_is_resumed(qtbot, interrupting_server_url, tmp_path):
+    path = tmp_path / "export.bin"
+    progress = []
+    client.request_notifier.download_progress.connect(
+        lambda *args: progress.append(args)
+    )
+
+    size = await Request(interrupting_server_url, bytes).download(
+        str(path), "export", expected_sha256=hashlib.sha256(DATA).hexdigest()
+    )
+
+    assert size == len(DATA)
+    assert path.read_bytes() == DATA
+    # Qt itself can send the request again, if the connection is closed early
+    assert _InterruptingHandler.requests_ranges[0] == ""
+    assert f"bytes={len(DATA) // 2}-" in _InterruptingHandler.requests_ranges
+    assert progress[-1] == ("export", len(DATA), len(DATA))
@@ -0,0 +1,215 @@
+import asyncio
+from enum import Enum
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+from PyQt5.QtCore import Qt
+
+from pyqt_rest_client import (
+    Client,
+    CursorPagination,
+    MemoryResponse,
+    MemoryTransport,
+    OffsetPagination,
+    PagedTableModel,
+)
+from pyqt_rest_client.reply import ReplyGotError
+from pyqt_rest_client.retry import CircuitBreaker, CircuitOpenError
+
+ROWS = 250
+
+
+class Status(Enum):
+    available = "available"
+    sold = "sold"
+
+
+class Category(BaseModel):
+    name: str
+
+
+class Pet(BaseModel):
+    id: int
+    name: str
+    status: Status
+    category: Category
+
+
+def pet(id: int) -> dict:
+    return {
+        "id": id,
+        "name": f"pet {id}",
+        "status": "sold" if id % 2 else "available",
+        "category": {"name": "cats"},
+    }
+
+
+def offset_page(request) -> MemoryResponse:
+    offset, limit = int(request.query["offset"]), int(request.query["limit"])
+    return MemoryResponse([pet(id) for id in range(offset, min(offset + limit, ROWS))])
+
+
+@pytest.fixture
+def transport(qtbot):
+    transport = MemoryTransport()
+    transport.add("GET", "pet", offset_page)
+    return transport
+
+
+@pytest.fixture
+def pets_request(transport):
+    session = Client("http://server:1234/api/", network_manager=transport)
+    return session.endpoint(List[Pet], ["pet"])
+
+
+async def fetched(model: PagedTableModel):
+    while model._fetching:
+        await asyncio.gather(*model._fetching.values())
+
+
+async def fetch_all(model: PagedTableModel):
+    while model.canFetchMore():
+        model.fetchMore()
+        await fetched(model)
+
+
+async def test_rows_are_fetched_by_pages(pets_request, transport):
+    model = PagedTableModel(pets_request, pagination=OffsetPagination(limit=100))
+    assert model.rowCount() == 0 and model.canFetchMore()
+
+    model.fetchMore()
+    model.fetchMore()  # The page is already being fetched
+    await fetched(model)
+    assert model.rowCount() == 100
+    assert len(transport.requests) == 1
+
+    await fetch_all(model)
+    assert model.rowCount() == ROWS
+    assert not model.canFetchMore()
+    assert [request.query["offset"] for request in transport.requests] == [
+        "0",
+        "100",
+        "200",
+    ]
+
+
+async def test_columns(pets_request):
+    model = PagedTableModel(pets_request, ["name", "status", "category.name"])
+    await fetch_all(model)
+
+    assert model.columnCount() == 3
+    assert model.headerData(2, Qt.Horizontal) == "category.name"
+    assert [model.data(model.index(1, column)) for column in range(3)] == [
+        "pet 1",
+        "sold",
+        "cats",
+    ]
+    assert model.data(model.index(1, 0), PagedTableModel.ItemRole) == Pet(**pet(1))
+
+
+async def test_columns_of_the_model_fields(pets_request):
+    model = PagedTableModel(pets_request)
+
+    assert model.columns == ["id", "name", "status", "category"]
+
+
+def test_columns_of_dicts(pets_request):
+    pets_request.res_type = List[dict]
+
+    with pytest.raises(ValueError):
+        PagedTableModel(pets_request)
+
+
+async def test_pages_are_evicted(pets_request, transport):
+    model = PagedTableModel(
+        pets_request, ["name"], OffsetPagination(limit=100), max_pages=2
+    )
+    await fetch_all(model)
+    assert list(model._pages) == [1, 2]
+    transport.requests.clear()
+
+    assert model.data(model.index(0, 0)) is None  # Evicted
+    with_changed_rows = []
+    model.dataChanged.connect(
+        lambda top_left, bottom_right: with_changed_rows.append(
+            (top_left.row(), bottom_right.row())
+        )
+    )
+    await fetched(model)
+
+    assert model.data(model.index(0, 0)) == "pet 0"
+    assert with_changed_rows == [(0, 99)]
+    assert [request.query["offset"] for request in transport.requests] == ["0"]
+    assert list(model._pages) == [2, 0]  # The least recently shown is evicted
+
+
+async def test_evicted_cursor_pages(pets_request, transport):
+    def cursor_page(request) -> MemoryResponse:
+        start = int(request.query.get("cursor", 0))
+        end = min(start + 100, ROWS)
+        return MemoryResponse(
+            {
+                "items": [pet(id) for id in range(start, end)],
+                "next_cursor": str(end) if end < ROWS else None,
+            }
+        )
+
+    transport.add("GET", "pet", cursor_page)
+    model = PagedTableModel(pets_request, ["name"], CursorPagination(), max_pages=1)
+    await fetch_all(model)
+    transport.requests.clear()
+
+    model.data(model.index(150, 0))
+    await fetched(model)
+
+    assert model.data(model.index(150, 0)) == "pet 150"
+    assert [request.query for request in transport.requests] == [{"cursor": "100"}]
+
+
+async def test_failed_fetch(pets_request, transport):
+    transport.add("GET", "pet", MemoryResponse(status=503))
+    model = PagedTableModel(pets_request)
+    errors = []
+    model.fetch_failed.connect(errors.append)
+
+    model.fetchMore()
+    await fetched(model)
+
+    assert len(errors) == 1
+    assert model.rowCount() == 0 and model.canFetchMore()
+
+
+async def test_reset(pets_request):
+    model = PagedTableModel(pets_request, pagination=OffsetPagination(limit=100))
+    await fetch_all(model)
+    model.data(model.index(0, 0))  # Not evicted, nothing is fetched
+    model.reset()
+    model.fetchMore()
+    model.reset()  # While the page is fetched
+
+    assert model.rowCount() == 0 and model.canFetchMore()
+    await asyncio.sleep(0.01)
+    await fetch_all(model)
+    assert model.rowCount() == ROWS
+
+
+async def test_model_is_valid(qtmodeltester, pets_request):
+    model = PagedTableModel(pets_request, ["id", "name"], max_pages=2)
+    await fetch_all(model)
+
+    qtmodeltester.check(model)
+
+
+async def test_open_circuit_fails_the_fetch(pets_request, transport):
+    pets_request.session.circuit_breaker = CircuitBreaker(failure_threshold=1)
+    transport.add("GET", "pet", MemoryResponse(status=503))
+    model = PagedTableModel(pets_request)
+    errors = []
+    model.fetch_failed.connect(errors.append)
+
+    for _ in range(2):
+        model.fetchMore()
+        await fetched(model)
+
+    assert [type(error) for error in errors] == [ReplyGotError, CircuitOpenError]
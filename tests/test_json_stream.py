@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from pyqt_rest_client.json_stream import JsonArrayDecoder
+
+ARRAY = [1, -2.5e3, "s,]", {"a": [1, {"b": None}]}, [], True, "юникод"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1000])
+def test_decode_array_by_chunks(chunk_size):
+    data = json.dumps(ARRAY).encode("utf-8")
+    decoder = JsonArrayDecoder()
+
+    items = []
+    for start in range(0, len(data), chunk_size):
+        end = start + chunk_size
+        items += decoder.feed(data[start:end])
+    decoder.close()
+
+    assert items == ARRAY
+
+
+def test_items_are_returned_as_soon_as_they_are_received():
+    decoder = JsonArrayDecoder()
+
+    assert decoder.feed(b'[{"id": 1}, {"id"') == [{"id": 1}]
+    assert decoder.feed(b": 2}, 3") == [{"id": 2}]
+    assert decoder.feed(b"4]") == [34]
+    decoder.close()
+
+
+@pytest.mark.parametrize("data", [b"[]", b" [ \n ] ", b"\t[]\n"])
+def test_empty_array(data):
+    decoder = JsonArrayDecoder()
+    assert decoder.feed(data) == []
+    decoder.close()
+
+
+@pytest.mark.parametrize("data", [b'{"a": 1}', b"[1 2]", b"[1] 2"])
+def test_bad_array(data):
+    with pytest.raises(ValueError):
+        JsonArrayDecoder().feed(data)
+
+
+@pytest.mark.parametrize("data", [b"", b"[1, 2", b"[1,]"])
+def test_incomplete_array(data):
+    decoder = JsonArrayDecoder()
+    decoder.feed(data)
+
+    with pytest.raises(ValueError):
+        decoder.close()
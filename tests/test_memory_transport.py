@@ -0,0 +1,171 @@
+import asyncio
+import re
+import time
+from typing import List
+
+import pytest
+from PyQt5.QtNetwork import QNetworkReply
+
+from pyqt_rest_client import Client, MemoryResponse, MemoryTransport
+from pyqt_rest_client.reply import Reply, ReplyGotError
+
+
+@pytest.fixture
+def transport(qtbot):
+    return MemoryTransport()
+
+
+@pytest.fixture
+def session(transport):
+    return Client("http://server:1234/api/", network_manager=transport)
+
+
+def echo(request) -> MemoryResponse:
+    return MemoryResponse(
+        {
+            "params": request.params,
+            "query": request.query,
+            "body": request.body.decode(),
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "pet/{id}",
+        "api/pet/{id}/",
+        "http://server:1234/api/pet/{id}",
+        re.compile(r".*/pet/(?P<id>[^/]+)/\?.*"),
+    ],
+)
+async def test_route_templates(session, transport, template):
+    transport.add("GET", template, echo)
+
+    reply = await session.endpoint(dict, ["pet", "a b"], {"status": "sold"}).get("")
+
+    assert reply["params"] == {"id": "a b"}
+    assert reply["query"] == {"status": "sold"}
+
+
+async def test_route_query_should_match(session, transport):
+    transport.add("GET", "pet?status=sold&limit=2", MemoryResponse("sold"))
+
+    assert await session.endpoint(str, ["pet"], {"limit": 2, "status": "sold"}).get(
+        ""
+    ) == ("sold")
+    with pytest.raises(ReplyGotError):
+        await session.endpoint(str, ["pet"], {"status": "sold"}).get("")
+
+
+async def test_last_added_route_wins(session, transport):
+    transport.add("GET", "pet/{id}", MemoryResponse("any pet"))
+    transport.add("GET", "pet/1", MemoryResponse("first pet"))
+
+    assert await session.endpoint(str, ["pet", "1"]).get("") == "first pet"
+    assert await session.endpoint(str, ["pet", "2"]).get("") == "any pet"
+
+
+async def test_operations_and_bodies(session, transport):
+    transport.add("POST", "pet", echo)
+    transport.add("PUT", "pet", echo)
+
+    assert (await session.endpoint(dict, ["pet"]).post({"id": 1}, ""))["body"] == (
+        '{"id": 1}'
+    )
+    assert (await session.endpoint(dict, ["pet"]).put(iter([b"a", b"b"]), ""))[
+        "body"
+    ] == "ab"
+    assert [request.operation for request in transport.requests] == ["POST", "PUT"]
+    assert transport.requests[0].headers[b"Content-Type"] == b"application/json"
+    assert transport.requests[0].json() == {"id": 1}
+
+
+async def test_not_matched_request(session, transport):
+    transport.add("POST", "pet", MemoryResponse("ok"))
+
+    with pytest.raises(ReplyGotError) as error:
+        await session.endpoint(str, ["pet"]).get("")
+
+    reply = Reply(error.value)
+    assert reply.http_code() == 404
+    assert reply.reply.error() == QNetworkReply.ContentNotFoundError
+
+
+@pytest.mark.parametrize(
+    "response, http_code, error",
+    [
+        (MemoryResponse(status=503), 503, QNetworkReply.ServiceUnavailableError),
+        (MemoryResponse(status=422), 422, QNetworkReply.UnknownContentError),
+        (
+            MemoryResponse(status=None, error=QNetworkReply.ConnectionRefusedError),
+            None,
+            QNetworkReply.ConnectionRefusedError,
+        ),
+    ],
+)
+async def test_errors(session, transport, response, http_code, error):
+    transport.add("GET", "pet", response)
+
+    with pytest.raises(ReplyGotError) as raised:
+        await session.endpoint(str, ["pet"]).get("")
+
+    reply = Reply(raised.value)
+    assert reply.http_code() == http_code
+    assert reply.reply.error() == error
+
+
+async def test_headers(session, transport):
+    transport.add("GET", "pet", MemoryResponse("ok", headers={"ETag": '"1"'}))
+
+    reply = await session.endpoint(str, ["pet"]).get_and_return_bare_reply("")
+
+    assert reply.header("ETag") == '"1"'
+
+
+async def test_latency(session, transport):
+    transport.latency_ms = 50
+    transport.add("GET", "fast", MemoryResponse("fast", latency_ms=0))
+    transport.add("GET", "slow", MemoryResponse("slow"))
+
+    start = time.perf_counter()
+    assert await session.endpoint(str, ["fast"]).get("") == "fast"
+    fast = time.perf_counter() - start
+    assert await session.endpoint(str, ["slow"]).get("") == "slow"
+    slow = time.perf_counter() - start - fast
+
+    assert fast < 0.04 and slow >= 0.045  # Qt timers are precise up to 1 ms
+
+
+async def test_streamed_chunks(session, transport):
+    transport.add(
+        "GET",
+        "pet",
+        MemoryResponse(chunks=[b'[{"id": 1}, ', b'{"id": 2}]'], chunk_delay_ms=100),
+    )
+    request = session.endpoint(List[dict], ["pet"])
+
+    start = time.perf_counter()
+    items = []
+    async for item in request.stream_get(""):
+        items.append((item, time.perf_counter() - start))
+
+    assert [item for item, _ in items] == [{"id": 1}, {"id": 2}]
+    assert items[0][1] < 0.09 and items[1][1] >= 0.095
+
+
+async def test_cancelled_request_is_aborted(session, transport):
+    transport.add("GET", "pet", MemoryResponse("late", latency_ms=10_000))
+
+    task = asyncio.ensure_future(session.endpoint(str, ["pet"]).get(""))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.sleep(0.01)
+
+    assert session.active_requests == []
+    assert transport._timers == {}
+
+
+def test_unknown_operation(transport):
+    with pytest.raises(ValueError):
+        transport.add("FETCH", "pet", MemoryResponse())
@@ -0,0 +1,98 @@
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+import pyqt_rest_client as client
+from pyqt_rest_client import endpoint
+from pyqt_rest_client.metrics import (
+    PHASES,
+    Histogram,
+    MetricsCollector,
+    endpoint_template,
+)
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("http://server/api/pet/findByStatus/?status=sold", "/api/pet/findByStatus/"),
+        ("http://server/api/pet/123/", "/api/pet/{id}/"),
+        ("http://server/api/pet/123", "/api/pet/{id}"),
+        (
+            "http://server/api/db/0f8fad5b-d9cb-469f-a165-70867728950e/tables",
+            "/api/db/{id}/tables",
+        ),
+        ("http://server/api/v2/pets2/", "/api/v2/pets2/"),
+    ],
+)
+def test_endpoint_template(url, expected):
+    assert endpoint_template(url) == expected
+
+
+def test_histogram():
+    histogram = Histogram()
+    for value in [0.0005] * 90 + [0.3] * 9 + [20.0]:
+        histogram.add(value)
+
+    assert histogram.count == 100
+    assert histogram.max == 20.0
+    assert histogram.mean() == pytest.approx((0.045 + 2.7 + 20) / 100)
+    assert histogram.percentile(0.5) == 0.001
+    assert histogram.percentile(0.95) == 0.5
+    assert histogram.percentile(1.0) == 20.0
+    assert Histogram().percentile(0.5) == 0.0
+
+
+class _Item(BaseModel):
+    id: int
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    collector = MetricsCollector()
+    monkeypatch.setattr(client, "metrics", collector)
+    return collector
+
+
+async def test_requests_are_measured(qtbot, qt_requests_mock, metrics):
+    items_endpoint = endpoint(List[_Item], ["items", "42"])
+    qt_requests_mock.get(items_endpoint.url, text='[{"id": 1}]')
+
+    with qtbot.wait_signal(metrics.request_measured) as measured:
+        await items_endpoint.get("")
+
+    request_metrics = measured.args[0]
+    assert request_metrics.template == "/api/v1.8/items/{id}/"
+    assert request_metrics.operation == "GET"
+    assert request_metrics.http_code == 200
+    assert request_metrics.bytes_received == len(b'[{"id": 1}]')
+    assert request_metrics.json_parse > 0
+    assert request_metrics.validation > 0
+    assert request_metrics.total >= request_metrics.time_to_first_byte > 0
+    assert set(request_metrics.as_dict()) >= set(PHASES)
+
+    summary = metrics.summary()["/api/v1.8/items/{id}/"]
+    assert summary["total"]["count"] == 1
+    assert metrics.endpoints["/api/v1.8/items/{id}/"].http_codes == {200: 1}
+
+
+async def test_bare_reply_requests_are_measured(qtbot, qt_requests_mock, metrics):
+    items_endpoint = endpoint(list, ["items"])
+    items_endpoint.template = "items"
+    qt_requests_mock.post(items_endpoint.url, text="[]")
+
+    reply = await items_endpoint.post_and_return_bare_reply({"id": 1}, "")
+
+    assert reply.metrics.bytes_sent == len(b'{"id": 1}')
+    assert reply.metrics.json_parse == 0
+    assert metrics.endpoints["items"].bytes_sent == len(b'{"id": 1}')
+
+
+async def test_no_metrics_if_disabled(qtbot, qt_requests_mock):
+    items_endpoint = endpoint(list, ["items"])
+    qt_requests_mock.get(items_endpoint.url, text="[]")
+
+    reply = await items_endpoint.get_and_return_bare_reply("")
+
+    assert reply.metrics is None
@@ -0,0 +1,123 @@
+import json
+from http.server import BaseHTTPRequestHandler
+from typing import List
+
+import pytest
+from PyQt5.QtCore import QThread
+from PyQt5.QtNetwork import QNetworkReply
+
+import pyqt_rest_client as client
+from pyqt_rest_client import Client
+from pyqt_rest_client.network_threads import ThreadedNetworkManager, ThreadedReply
+from pyqt_rest_client.reply import Reply, ReplyGotError, ReplyTimeoutError
+
+ITEMS = [{"id": i} for i in range(1000)]
+
+
+class _ItemsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/missing"):
+            self._reply(404, b"Not found")
+        else:
+            self._reply(200, json.dumps(ITEMS).encode("utf-8"))
+
+    def do_POST(self):
+        self._reply(200, self.rfile.read(int(self.headers["Content-Length"])))
+
+    def _reply(self, code: int, body: bytes):
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Items", "items")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server_url(local_server):
+    return local_server(_ItemsHandler)
+
+
+@pytest.fixture
+def threaded_client(qtbot, server_url):
+    threaded_client = Client(server_url)
+    threaded_client.use_network_threads(2)
+    yield threaded_client
+    threaded_client.use_network_threads(0)
+
+
+async def test_get(threaded_client, mocker):
+    manager = threaded_client.network_manager
+    assert isinstance(manager, ThreadedNetworkManager)
+    assert all(thread is not QThread.currentThread() for thread in manager.threads())
+
+    request = threaded_client.endpoint(List[dict], ["items"])
+    reply = await request.get_and_return_bare_reply("")
+
+    assert isinstance(reply.reply, ThreadedReply)
+    assert reply.http_code() == 200
+    assert reply.header("X-Items") == "items"
+    assert reply.json() == ITEMS
+    assert await request.get("") == ITEMS
+    assert manager.in_flight_count() == 0
+    assert threaded_client.active_requests == []
+
+
+async def test_post(threaded_client, tmp_path):
+    request = threaded_client.endpoint(dict, ["items"])
+    path = tmp_path / "body.json"
+    path.write_bytes(b'{"from": "file"}')
+
+    assert await request.post({"id": 1}, "") == {"id": 1}
+    assert await request.post(iter([b'{"from": ', b'"chunks"}']), "") == {
+        "from": "chunks"
+    }
+    assert await request.post(path, "") == {"from": "file"}
+
+
+async def test_error(threaded_client):
+    request = threaded_client.endpoint(str, ["missing"])
+
+    with pytest.raises(ReplyGotError) as error:
+        await request.get("")
+
+    reply = Reply(error.value)
+    assert reply.http_code() == 404
+    assert reply.reply.error() == QNetworkReply.ContentNotFoundError
+    assert reply.text() == "Not found"
+
+
+async def test_stream_and_download(threaded_client, tmp_path):
+    request = threaded_client.endpoint(List[dict], ["items"])
+    path = tmp_path / "items.json"
+
+    assert [item async for item in request.stream_get("")] == ITEMS
+    assert await request.download(str(path), "") == path.stat().st_size
+    assert json.loads(path.read_bytes()) == ITEMS
+
+
+async def test_deadline_aborts_the_reply(threaded_client, silent_server_url):
+    request = threaded_client.endpoint(list, ["items"])
+    request.url = silent_server_url
+    request.timeout = 100
+
+    with pytest.raises(ReplyTimeoutError):
+        await request.get("")
+    assert threaded_client.network_manager.in_flight_count() == 0
+
+
+def test_shutdown(qtbot):
+    manager = ThreadedNetworkManager(1)
+    threads = manager.threads()
+    manager.shutdown()
+
+    assert all(thread.isFinished() for thread in threads)
+    with pytest.raises(ValueError):
+        manager.get(None)
+
+
+def test_disk_cache_is_not_supported(qtbot, tmp_path, mocker):
+    mocker.patch.object(client, "network_manager", ThreadedNetworkManager(1))
+
+    with pytest.raises(ValueError):
+        client.use_response_cache(disk_cache_dir=str(tmp_path))
+    client.network_manager.shutdown()
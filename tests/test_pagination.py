@@ -0,0 +1,219 @@
+import asyncio
+import json
+import time
+from http.server import BaseHTTPRequestHandler
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+from PyQt5.QtNetwork import QNetworkReply
+
+import pyqt_rest_client as client
+from pyqt_rest_client import (
+    Client,
+    CursorPagination,
+    LinkHeaderPagination,
+    OffsetPagination,
+    endpoint,
+    paginate,
+)
+from pyqt_rest_client.pagination import next_link, with_query
+from pyqt_rest_client.reply import ReplyGotError
+
+
+class Pet(BaseModel):
+    id: int
+
+
+def pets(*ids: int) -> str:
+    return json.dumps([{"id": i} for i in ids])
+
+
+async def collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+@pytest.fixture
+def pets_endpoint(login_mock):
+    return endpoint(List[Pet], ["pet"], {"status": "sold"})
+
+
+def test_with_query():
+    assert with_query("http://s/pet/?status=sold", {"offset": 4, "limit": 2}) == (
+        "http://s/pet/?status=sold&offset=4&limit=2"
+    )
+    assert with_query("http://s/pet/?cursor=a", {"cursor": "b c"}) == (
+        "http://s/pet/?cursor=b+c"
+    )
+    assert with_query("http://s/pet/?status=a&status=b&offset=0", {"offset": 2}) == (
+        "http://s/pet/?status=a&status=b&offset=2"
+    )
+
+
+@pytest.mark.parametrize(
+    "link_header, expected",
+    [
+        ("", ""),
+        ('<http://s/pet/?page=2>; rel="next"', "http://s/pet/?page=2"),
+        (
+            '<http://s/pet/?page=1>; rel="prev", <http://s/pet/?page=3>; rel="next"',
+            "http://s/pet/?page=3",
+        ),
+        ('<http://s/pet/?page=1>; rel="first"', ""),
+        ("<http://s/pet/?page=2>; rel=next", "http://s/pet/?page=2"),
+    ],
+)
+def test_next_link(link_header, expected):
+    assert next_link(link_header) == expected
+
+
+async def test_offset_pagination(qtbot, pets_endpoint, qt_requests_mock):
+    base = pets_endpoint.url
+    qt_requests_mock.get(f"{base}&offset=0&limit=2", text=pets(1, 2))
+    qt_requests_mock.get(f"{base}&offset=2&limit=2", text=pets(3, 4))
+    qt_requests_mock.get(f"{base}&offset=4&limit=2", text=pets(5))
+
+    items = await collect(paginate(pets_endpoint, OffsetPagination(limit=2)))
+
+    assert items == [Pet(id=i) for i in range(1, 6)]
+
+
+async def test_offset_pagination_ends_on_empty_page(
+    qtbot, pets_endpoint, qt_requests_mock
+):
+    base = pets_endpoint.url
+    qt_requests_mock.get(f"{base}&offset=0&limit=2", text=pets(1, 2))
+    qt_requests_mock.get(f"{base}&offset=2&limit=2", text=pets())
+    qt_requests_mock.get(
+        f"{base}&offset=4&limit=2", qt_err=QNetworkReply.ContentNotFoundError
+    )
+
+    items = await collect(paginate(pets_endpoint, OffsetPagination(limit=2)))
+
+    assert items == [Pet(id=1), Pet(id=2)]
+
+
+async def test_cursor_pagination(qtbot, pets_endpoint, qt_requests_mock):
+    base = pets_endpoint.url
+    qt_requests_mock.get(
+        base, text=json.dumps({"items": [{"id": 1}], "next_cursor": "a b"})
+    )
+    qt_requests_mock.get(
+        f"{base}&cursor=a+b", text=json.dumps({"items": [{"id": 2}], "next_cursor": 3})
+    )
+    qt_requests_mock.get(
+        f"{base}&cursor=3", text=json.dumps({"items": [{"id": 3}], "next_cursor": None})
+    )
+
+    items = await collect(paginate(pets_endpoint, CursorPagination()))
+
+    assert items == [Pet(id=1), Pet(id=2), Pet(id=3)]
+
+
+async def test_cursor_pagination_of_list(qtbot, pets_endpoint, qt_requests_mock):
+    qt_requests_mock.get(pets_endpoint.url, text=pets(1, 2))
+
+    with pytest.raises(ValueError):
+        await collect(paginate(pets_endpoint, CursorPagination()))
+
+
+async def test_link_header_pagination(qtbot, pets_endpoint, qt_requests_mock):
+    base = pets_endpoint.url
+    qt_requests_mock.get(
+        base,
+        text=pets(1),
+        headers={"Link": f'<{base}&page=2>; rel="next", <{base}>; rel="first"'},
+    )
+    qt_requests_mock.get(f"{base}&page=2", text=pets(2))
+
+    items = await collect(paginate(pets_endpoint, LinkHeaderPagination()))
+
+    assert items == [Pet(id=1), Pet(id=2)]
+
+
+async def test_pages_are_prefetched(qtbot, pets_endpoint, qt_requests_mock):
+    base = pets_endpoint.url
+    for offset in range(0, 20, 2):
+        qt_requests_mock.get(f"{base}&offset={offset}&limit=2", text=pets(1, 2))
+    started = client.scheduler.started
+
+    iterator = paginate(pets_endpoint, OffsetPagination(limit=2), prefetch=3)
+    assert await iterator.__anext__() == Pet(id=1)
+    await asyncio.sleep(0.1)
+
+    assert client.scheduler.started - started == 4  # The page and 3 next ones
+    await iterator.aclose()
+
+
+async def test_prefetch_is_limited_by_buffered_bytes(
+    qtbot, pets_endpoint, qt_requests_mock
+):
+    base = pets_endpoint.url
+    for offset in range(0, 20, 2):
+        qt_requests_mock.get(f"{base}&offset={offset}&limit=2", text=pets(1, 2))
+    page_size = len(pets(1, 2))
+    started = client.scheduler.started
+
+    iterator = paginate(
+        pets_endpoint,
+        OffsetPagination(limit=2),
+        prefetch=5,
+        max_buffered_bytes=page_size * 2,
+    )
+    assert await iterator.__anext__() == Pet(id=1)
+    await asyncio.sleep(0.1)
+
+    assert client.scheduler.started - started == 3  # The page and 2 next ones
+    await iterator.aclose()
+
+
+async def test_error_page_raises(qtbot, pets_endpoint, qt_requests_mock):
+    base = pets_endpoint.url
+    qt_requests_mock.get(f"{base}&offset=0&limit=2", text=pets(1, 2))
+    qt_requests_mock.get(
+        f"{base}&offset=2&limit=2",
+        status_code=500,
+        qt_err=QNetworkReply.InternalServerError,
+    )
+
+    items = []
+    with pytest.raises(ReplyGotError):
+        async for item in paginate(pets_endpoint, OffsetPagination(limit=2)):
+            items.append(item)
+
+    assert items == [Pet(id=1), Pet(id=2)]
+
+
+class _SlowPagesHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if "offset=0&" not in self.path:
+            time.sleep(1)  # Only the first page is needed by the test
+        body = pets(1, 2).encode("utf-8")
+        try:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except ConnectionError:
+            pass  # The prefetch is cancelled
+
+
+@pytest.fixture
+def slow_server_url(local_server):
+    return local_server(_SlowPagesHandler)
+
+
+async def test_early_stop_cancels_prefetches(qtbot, slow_server_url):
+    session = Client(slow_server_url)
+    pets_endpoint = session.endpoint(List[Pet], ["pet"])
+
+    async for pet in paginate(pets_endpoint, OffsetPagination(limit=2), prefetch=3):
+        await asyncio.sleep(0.1)  # The prefetches are sent meanwhile
+        assert session.active_requests
+        break
+
+    for _ in range(50):
+        if not session.active_requests:
+            break
+        await asyncio.sleep(0.01)
+    assert session.active_requests == []
@@ -3,7 +3,7 @@ from PyQt5.QtCore import QByteArray, QUrl
 from PyQt5.QtNetwork import QNetworkReply, QNetworkRequest
 
 import pyqt_rest_client as client
-from pyqt_rest_client.reply import Reply, ReplyGotError
+from pyqt_rest_client.reply import ERROR_BODY_LIMIT, Reply, ReplyGotError
 
 
 def qt_reply() -> QNetworkReply:
@@ -64,3 +64,34 @@ def test_methods_that_depends_on_qt_reply(mocker):
 
     mocker.patch.object(mocked_qt_reply, "errorString", return_value="Some error")
     assert reply.qt_error_string() == "Some error"
+
+
+def test_body_is_not_copied_until_data_is_needed(mocker):
+    mocked_qt_reply = qt_reply()
+    mocker.patch.object(
+        mocked_qt_reply, "readAll", return_value=QByteArray(b'{"some": "data"}')
+    )
+    reply = Reply(mocked_qt_reply)
+
+    assert type(reply.body()) is memoryview
+    assert reply.body_size() == len(b'{"some": "data"}')
+    assert reply.json() == {"some": "data"}
+    assert reply._data is None
+
+    assert reply.data == b'{"some": "data"}'
+    assert reply.data is reply.data  # It is copied only once
+    assert reply.body() == b'{"some": "data"}'
+
+
+def test_error_reply_body_is_limited(mocker):
+    mocked_qt_reply = qt_reply()
+    mocker.patch.object(
+        mocked_qt_reply, "readAll", return_value=QByteArray(b"e" * 100_000)
+    )
+    reply = Reply(mocked_qt_reply)
+    reply.request_body = b"r" * 100_000
+
+    error_reply = Reply(reply.exception())
+
+    assert error_reply.data == b"e" * ERROR_BODY_LIMIT
+    assert error_reply.request_body == b"r" * ERROR_BODY_LIMIT
@@ -1,11 +1,16 @@
+import asyncio
 from typing import Dict, List
 
 import pytest
 from pydantic import BaseModel
+from PyQt5.QtCore import QTimer
 from PyQt5.QtNetwork import QNetworkReply
 
-from pyqt_rest_client.reply import Reply, ReplyGotError
+import pyqt_rest_client as client
+from pyqt_rest_client.reply import Reply, ReplyGotError, ReplyTimeoutError
 from pyqt_rest_client.request import (
+    Request,
+    _in_flight_gets,
     cast_body_to_bytes,
     cast_reply_to_resource,
     endpoint,
@@ -136,3 +141,155 @@ def test_to_patch():
     # By default, Request.to_patch() do nothing and returns None
     request_object = endpoint(str, ["url_part"])
     assert request_object.to_patch("QNetworkReply should be here") is None
+
+
+class _Item(BaseModel):
+    id: int
+
+
+@pytest.mark.parametrize(
+    "res_type, expected",
+    [
+        (List[_Item], [_Item(id=1), _Item(id=2)]),
+        (list, [{"id": 1}, {"id": 2}]),
+    ],
+)
+async def test_stream_get(qtbot, qt_requests_mock, res_type, expected):
+    items_endpoint = endpoint(res_type, ["items"])
+    qt_requests_mock.get(items_endpoint.url, text='[{"id": 1}, {"id": 2}]')
+
+    assert [item async for item in items_endpoint.stream_get("")] == expected
+
+
+async def test_stream_get_error(qtbot, qt_requests_mock):
+    items_endpoint = endpoint(List[_Item], ["items"])
+    qt_requests_mock.get(
+        items_endpoint.url, text="Not found", qt_err=QNetworkReply.ContentNotFoundError
+    )
+
+    with pytest.raises(ReplyGotError):
+        async for _ in items_endpoint.stream_get(""):
+            pass
+
+
+@pytest.mark.parametrize("res_type", [dict, str, _Item])
+async def test_stream_get_not_a_list(res_type):
+    with pytest.raises(ValueError):
+        async for _ in endpoint(res_type, ["items"]).stream_get(""):
+            pass
+
+
+async def test_identical_gets_are_coalesced(qtbot, qt_requests_mock, mocker):
+    items_endpoint = endpoint(List[_Item], ["items"])
+    qt_requests_mock.get(items_endpoint.url, text='[{"id": 1}]')
+    send = mocker.spy(Request, "_send")
+
+    results = await asyncio.gather(
+        items_endpoint.get(""),
+        endpoint(List[_Item], ["items"]).get(""),
+        endpoint(list, ["items"]).get(""),  # Another res_type
+    )
+
+    assert results[0] is results[1]
+    assert results[2] == [{"id": 1}]
+    assert send.call_count == 2
+    assert not _in_flight_gets
+
+
+async def test_coalesced_gets_share_errors(qtbot, qt_requests_mock):
+    items_endpoint = endpoint(List[_Item], ["items"])
+    qt_requests_mock.get(items_endpoint.url, qt_err=QNetworkReply.ContentNotFoundError)
+
+    results = await asyncio.gather(
+        items_endpoint.get(""), items_endpoint.get(""), return_exceptions=True
+    )
+
+    assert all(type(result) is ReplyGotError for result in results)
+
+
+async def test_cancel_of_coalesced_get_does_not_cancel_others(qtbot, qt_requests_mock):
+    items_endpoint = endpoint(List[_Item], ["items"])
+    qt_requests_mock.get(items_endpoint.url, text='[{"id": 1}]')
+
+    cancelled = asyncio.ensure_future(items_endpoint.get(""))
+    awaited = asyncio.ensure_future(items_endpoint.get(""))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await awaited == [_Item(id=1)]
+    assert cancelled.cancelled()
+
+
+async def test_get_after_cancelled_coalesced_get(qtbot, qt_requests_mock):
+    items_endpoint = endpoint(List[_Item], ["items"])
+    qt_requests_mock.get(items_endpoint.url, text='[{"id": 1}]')
+
+    cancelled = asyncio.ensure_future(items_endpoint.get(""))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)  # The request task is cancelled, but not done yet
+    awaited = asyncio.ensure_future(items_endpoint.get(""))
+
+    assert await awaited == [_Item(id=1)]
+    assert cancelled.cancelled()
+
+
+async def test_gets_are_not_coalesced_if_disabled(
+    qtbot, qt_requests_mock, mocker, monkeypatch
+):
+    monkeypatch.setattr(client, "coalesce_gets", False)
+    items_endpoint = endpoint(List[_Item], ["items"])
+    qt_requests_mock.get(items_endpoint.url, text='[{"id": 1}]')
+    send = mocker.spy(Request, "_send")
+
+    results = await asyncio.gather(items_endpoint.get(""), items_endpoint.get(""))
+
+    assert results[0] == results[1]
+    assert results[0] is not results[1]
+    assert send.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "timeouts, expected_phase",
+    [
+        ({"timeout_ms": 100}, "total"),
+        ({"first_byte_timeout_ms": 100}, "first byte"),
+    ],
+)
+async def test_deadlines(qtbot, silent_server_url, timeouts, expected_phase):
+    request = Request(silent_server_url, list, **{"timeout_ms": 0, **timeouts})
+
+    with pytest.raises(ReplyTimeoutError) as error:
+        await request.get("")
+
+    reply = Reply(error.value)
+    assert reply.timeout_phase == expected_phase
+    assert not reply.ok()
+    assert not client.active_requests
+
+
+async def test_finished_reply_stops_deadline_timers(qtbot, qt_requests_mock):
+    request = Request("http://server:1234/api/v1.8/items/", list, timeout_ms=50)
+    qt_requests_mock.get(request.url, text="[]")
+
+    reply = await request.get_and_return_bare_reply("")
+    await asyncio.sleep(0.1)
+
+    assert reply.timeout_phase == ""
+    assert not [timer for timer in reply.reply.findChildren(QTimer) if timer.isActive()]
+
+
+async def test_cancel_aborts_the_reply(qtbot, silent_server_url):
+    task = asyncio.ensure_future(Request(silent_server_url, list).get(""))
+    while not client.active_requests:
+        await asyncio.sleep(0.01)
+    qt_reply = client.active_requests[0]
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert qt_reply.error() == QNetworkReply.OperationCanceledError
+    assert not client.active_requests
+    await asyncio.sleep(0)  # For done callbacks
+    assert not _in_flight_gets
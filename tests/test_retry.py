@@ -0,0 +1,169 @@
+import pytest
+from PyQt5.QtNetwork import QNetworkReply
+
+import pyqt_rest_client as client
+from pyqt_rest_client import endpoint, gather_requests
+from pyqt_rest_client.reply import Reply, ReplyGotError
+from pyqt_rest_client.request import Request
+from pyqt_rest_client.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    RetryPolicy,
+    retry_after_delay,
+)
+
+
+@pytest.fixture
+def retry_policy(monkeypatch):
+    policy = RetryPolicy(max_retries=2, base_delay=0.001)
+    monkeypatch.setattr(client, "retry_policy", policy)
+    return policy
+
+
+@pytest.fixture
+def circuit_breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    monkeypatch.setattr(client, "circuit_breaker", breaker)
+    return breaker
+
+
+@pytest.fixture
+def dbs_endpoint():
+    return endpoint(list, ["dbs"])
+
+
+@pytest.mark.parametrize(
+    "status_code, qt_err",
+    [
+        (503, QNetworkReply.ServiceUnavailableError),
+        (429, QNetworkReply.UnknownContentError),
+        (0, QNetworkReply.RemoteHostClosedError),
+    ],
+)
+async def test_transient_failures_are_retried(
+    qtbot, qt_requests_mock, retry_policy, dbs_endpoint, mocker, status_code, qt_err
+):
+    qt_requests_mock.get(dbs_endpoint.url, status_code=status_code, qt_err=qt_err)
+    send = mocker.spy(Request, "_send")
+
+    with pytest.raises(ReplyGotError):
+        await dbs_endpoint.get("")
+
+    assert send.call_count == 3
+    assert retry_policy.retries == 2
+    assert retry_policy.gave_up == 1
+
+
+async def test_not_transient_failures_are_not_retried(
+    qtbot, qt_requests_mock, retry_policy, dbs_endpoint, mocker
+):
+    qt_requests_mock.get(
+        dbs_endpoint.url, status_code=404, qt_err=QNetworkReply.ContentNotFoundError
+    )
+    send = mocker.spy(Request, "_send")
+
+    with pytest.raises(ReplyGotError):
+        await dbs_endpoint.get("")
+
+    assert send.call_count == 1
+    assert retry_policy.retries == 0
+
+
+@pytest.mark.parametrize("retry_post, expected_calls", [(False, 1), (True, 3)])
+async def test_post_is_retried_only_if_allowed(
+    qtbot,
+    qt_requests_mock,
+    retry_policy,
+    dbs_endpoint,
+    mocker,
+    retry_post,
+    expected_calls,
+):
+    retry_policy.retry_post = retry_post
+    qt_requests_mock.post(
+        dbs_endpoint.url, status_code=503, qt_err=QNetworkReply.ServiceUnavailableError
+    )
+    send = mocker.spy(Request, "_send")
+
+    with pytest.raises(ReplyGotError):
+        await dbs_endpoint.post(b"", "")
+
+    assert send.call_count == expected_calls
+
+
+async def test_retry_after_header(qtbot, qt_requests_mock, retry_policy, dbs_endpoint):
+    qt_requests_mock.get(
+        dbs_endpoint.url,
+        status_code=503,
+        qt_err=QNetworkReply.ServiceUnavailableError,
+        headers={"Retry-After": "0"},
+    )
+    retry_policy.base_delay = 100  # It would hang the test without Retry-After
+
+    with pytest.raises(ReplyGotError):
+        await dbs_endpoint.get("")
+
+    assert retry_policy.retries == 2
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("", None),
+        ("5", 5.0),
+        ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),  # In the past
+        ("not a date", None),
+    ],
+)
+def test_retry_after_delay(header, expected):
+    assert retry_after_delay(header) == expected
+
+
+async def test_circuit_breaker(qtbot, qt_requests_mock, circuit_breaker, dbs_endpoint):
+    qt_requests_mock.get(
+        dbs_endpoint.url, status_code=503, qt_err=QNetworkReply.ServiceUnavailableError
+    )
+    host = "server:1234"
+
+    for _ in range(2):
+        with pytest.raises(ReplyGotError):
+            await dbs_endpoint.get("")
+    assert circuit_breaker.state(host) is CircuitState.OPEN
+    assert circuit_breaker.opened == 1
+
+    with pytest.raises(CircuitOpenError):
+        await dbs_endpoint.get("")
+    assert circuit_breaker.rejected == 1
+
+    # After the reset timeout a successful trial closes the circuit
+    circuit_breaker.reset_timeout = 0
+    assert circuit_breaker.state(host) is CircuitState.HALF_OPEN
+    qt_requests_mock.get(dbs_endpoint.url, text="[]")
+    assert await dbs_endpoint.get("") == []
+    assert circuit_breaker.state(host) is CircuitState.CLOSED
+
+
+async def test_open_circuit_is_a_failed_request(
+    qtbot, login_mock, qt_requests_mock, circuit_breaker, dbs_endpoint
+):
+    qt_requests_mock.get(
+        dbs_endpoint.url, status_code=503, qt_err=QNetworkReply.ServiceUnavailableError
+    )
+    qt_requests_mock.get(endpoint(list, ["other"]).url, text="[]")
+    items = [(["other"], None)] + [(["dbs"], None)] * 4
+
+    result = await gather_requests(items, list, max_parallel=1)
+
+    assert result.successes == {0: []}
+    assert [type(error) for error in result.errors.values()] == [
+        ReplyGotError,
+        ReplyGotError,
+        CircuitOpenError,
+        CircuitOpenError,
+    ]
+    reply = Reply(result.errors[4])  # Like the other failed requests
+    assert not reply.ok()
+    assert reply.http_code() is None
+    assert reply.header("Retry-After") == "" and reply.data == b""
+    assert "are failing" in reply.qt_error_string()
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from pyqt_rest_client import Client, MemoryResponse, MemoryTransport, endpoint
+from pyqt_rest_client.scheduler import Priority, RequestScheduler
+
+
+async def test_requests_over_the_limit_are_queued():
+    scheduler = RequestScheduler(max_per_host=2)
+
+    await scheduler.acquire("host")
+    await scheduler.acquire("host")
+    await scheduler.acquire("another_host")
+
+    queued = asyncio.ensure_future(scheduler.acquire("host"))
+    await asyncio.sleep(0)
+    assert not queued.done()
+    assert scheduler.queue_depth() == 1
+    assert scheduler.active_count("host") == 2
+
+    scheduler.release("host")
+    await queued
+    assert scheduler.queue_depth() == 0
+    assert scheduler.active_count("host") == 2
+    assert scheduler.started == 4
+    assert scheduler.max_wait_time > 0
+
+
+async def test_queued_requests_are_started_by_priority_and_fifo():
+    scheduler = RequestScheduler(max_per_host=1)
+    await scheduler.acquire("host")
+    started = []
+
+    async def request(name: str, priority: Priority):
+        await scheduler.acquire("host", priority)
+        started.append(name)
+        scheduler.release("host")
+
+    tasks = [
+        asyncio.ensure_future(request("background 1", Priority.BACKGROUND)),
+        asyncio.ensure_future(request("interactive 1", Priority.INTERACTIVE)),
+        asyncio.ensure_future(request("background 2", Priority.BACKGROUND)),
+        asyncio.ensure_future(request("interactive 2", Priority.INTERACTIVE)),
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.queue_depth(Priority.BACKGROUND) == 2
+    assert scheduler.queue_depth(Priority.INTERACTIVE) == 2
+
+    scheduler.release("host")
+    await asyncio.gather(*tasks)
+
+    assert started == ["interactive 1", "interactive 2", "background 1", "background 2"]
+    assert scheduler.active_count("host") == 0
+
+
+async def test_cancelled_requests_leave_the_queue():
+    scheduler = RequestScheduler(max_per_host=1)
+    await scheduler.acquire("host")
+
+    queued = asyncio.ensure_future(scheduler.acquire("host"))
+    await asyncio.sleep(0)
+    queued.cancel()
+    await asyncio.sleep(0)
+
+    assert scheduler.queue_depth() == 0
+    scheduler.release("host")
+    assert scheduler.active_count("host") == 0
+
+
+async def test_requests_accept_priority(qtbot, qt_requests_mock):
+    dbs_endpoint = endpoint(list, ["dbs"])
+    qt_requests_mock.get(dbs_endpoint.url, text="[]")
+    qt_requests_mock.post(dbs_endpoint.url, text="[]")
+
+    assert await dbs_endpoint.get("", priority=Priority.BACKGROUND) == []
+    assert await dbs_endpoint.post(b"", "", priority=Priority.BACKGROUND) == []
+
+
+async def test_slot_is_released_if_the_request_is_not_started(qtbot):
+    def broken_handler(request):
+        raise RuntimeError("The transport failed")
+
+    transport = MemoryTransport()
+    transport.add("GET", "dbs", broken_handler)
+    session = Client("http://server:1234/api/", network_manager=transport)
+
+    for _ in range(session.scheduler.max_per_host):
+        with pytest.raises(RuntimeError):
+            await session.endpoint(list, ["dbs"]).get("")
+
+    assert session.scheduler.active_count("server:1234") == 0
+
+
+async def test_in_flight_and_queued_requests_are_cancelled_together(qtbot):
+    transport = MemoryTransport()
+    transport.add("GET", "dbs", MemoryResponse([], latency_ms=50))
+    session = Client(
+        "http://server:1234/api/",
+        network_manager=transport,
+        scheduler=RequestScheduler(max_per_host=1),
+        coalesce_gets=False,
+    )
+    request = session.endpoint(list, ["dbs"])
+    tasks = [asyncio.ensure_future(request.get("")) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    assert session.scheduler.queue_depth() == 1
+
+    for task in tasks:  # Like cancel_task_group()
+        task.cancel()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert [type(result) for result in results] == [asyncio.CancelledError] * 2
+    assert session.scheduler.active_count("server:1234") == 0
+    assert session.scheduler.queue_depth() == 0
+    assert await request.get("") == []
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+import pyqt_rest_client as client
+from pyqt_rest_client import Client, EndpointTemplate, MetricsCollector, endpoint
+
+
+@pytest.fixture
+def eu_client():
+    return Client(
+        "http://eu.server:1234/api/", "eu_user", "", metrics=MetricsCollector()
+    )
+
+
+@pytest.fixture
+def us_client():
+    return Client("http://us.server:1234/api/", "us_user", "")
+
+
+def test_endpoint_is_bound_to_client(login_mock, eu_client):
+    assert eu_client.endpoint(str, ["pet"]).url == "http://eu.server:1234/api/pet/"
+    assert eu_client.endpoint(str, ["pet"]).session is eu_client
+    assert endpoint(str, ["pet"]).url == "http://server:1234/api/v1.8/pet/"
+    assert endpoint(str, ["pet"]).session is None
+
+
+def test_unknown_client_setting():
+    with pytest.raises(ValueError):
+        Client(retries=3)
+
+
+async def test_clients_are_independent(
+    qtbot, login_mock, qt_requests_mock, mocker, eu_client, us_client
+):
+    eu_pet, us_pet = eu_client.endpoint(str, ["pet"]), us_client.endpoint(str, ["pet"])
+    qt_requests_mock.get(eu_pet.url, text="eu")
+    qt_requests_mock.get(us_pet.url, text="us")
+    eu_get = mocker.spy(eu_client.network_manager, "get")
+    default_get = mocker.spy(client.network_manager, "get")
+    eu_started, default_started = [], []
+    eu_client.request_notifier.request_started.connect(eu_started.append)
+    client.request_notifier.request_started.connect(default_started.append)
+    us_client.use_response_cache()
+
+    assert await asyncio.gather(eu_pet.get("eu pet"), us_pet.get("us pet")) == [
+        "eu",
+        "us",
+    ]
+    assert eu_get.call_count == 1
+    assert default_get.call_count == 0
+    assert eu_started == ["eu pet"]
+    assert default_started == []
+    assert list(eu_client.metrics.summary()) == ["/api/pet/"]
+    assert client.metrics is None
+    assert us_client.response_cache.misses == 1
+    assert client.response_cache is None
+    assert eu_client.scheduler.started == 1
+    assert eu_client.active_requests == us_client.active_requests == []
+
+
+async def test_clients_sign_with_their_login(
+    qtbot, login_mock, qt_requests_mock, mocker, eu_client
+):
+    eu_pet = eu_client.endpoint(str, ["pet"])
+    qt_requests_mock.post(eu_pet.url, text="ok")
+    sign = mocker.spy(eu_client.login_data.signer, "sign")
+
+    assert await eu_pet.post(b"{}", "") == "ok"
+    sign.assert_called_once_with(b"{}")
+    assert eu_client.login_data.username == "eu_user"
+    assert client.login_data.username == "user"
+
+
+async def test_gets_are_coalesced_per_client(
+    qtbot, login_mock, qt_requests_mock, eu_client
+):
+    eu_client.login("http://server:1234/api/v1.8/", "user", "")
+    default_pet, eu_pet = endpoint(str, ["pet"]), eu_client.endpoint(str, ["pet"])
+    assert default_pet.url == eu_pet.url
+    qt_requests_mock.get(eu_pet.url, text="pet")
+
+    assert await asyncio.gather(default_pet.get(""), eu_pet.get("")) == ["pet", "pet"]
+    assert eu_client.scheduler.started == 1
+
+
+def test_endpoint_template(login_mock, eu_client):
+    pet_by_id = EndpointTemplate(dict, "pet/{id}", trusted=True)
+    request = pet_by_id(id=0, fields="name")
+
+    assert request.url == "http://server:1234/api/v1.8/pet/0/?fields=name"
+    assert request.template == "/api/v1.8/pet/{id}/"
+    assert request.res_type is dict
+    assert request.trusted
+    assert request.session is None
+
+    request = eu_client.template(dict, "pet/{id}")(id=1)
+    assert request.url == "http://eu.server:1234/api/pet/1/"
+    assert request.template == "/api/pet/{id}/"
+    assert request.session is eu_client
@@ -0,0 +1,233 @@
+from typing import Dict, List, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from pyqt_rest_client import (
+    Client,
+    ConditionalSync,
+    MemoryResponse,
+    MemoryTransport,
+    OffsetPagination,
+    PageETagSync,
+    SyncedCollection,
+    UpdatedSinceSync,
+)
+from pyqt_rest_client.reply import ReplyGotError
+from pyqt_rest_client.retry import CircuitBreaker, CircuitOpenError
+
+
+class Pet(BaseModel):
+    id: int
+    name: str
+    updated_at: int = 0
+    deleted: bool = False
+
+
+# The server side collection, the version changes with every modification
+class Pets:
+    def __init__(self, *names: str):
+        self.pets: Dict[int, dict] = {}
+        self.version = 0
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str):
+        self.version += 1
+        id = len(self.pets) + 1
+        self.pets[id] = {"id": id, "name": name, "updated_at": self.version}
+
+    def rename(self, id: int, name: str):
+        self.version += 1
+        self.pets[id].update(name=name, updated_at=self.version)
+
+    def delete(self, id: int):
+        self.version += 1
+        self.pets[id].update(deleted=True, updated_at=self.version)
+
+    def alive(self) -> List[dict]:
+        return [pet for pet in self.pets.values() if not pet.get("deleted")]
+
+
+class Recorder:
+    def __init__(self, collection: SyncedCollection):
+        self.added: List[list] = []
+        self.changed: List[list] = []
+        self.removed: List[list] = []
+        collection.items_added.connect(self.added.append)
+        collection.items_changed.connect(self.changed.append)
+        collection.items_removed.connect(self.removed.append)
+
+    def names(self, signal: str) -> List[List[str]]:
+        return [[pet.name for pet in items] for items in getattr(self, signal)]
+
+
+@pytest.fixture
+def transport(qtbot):
+    return MemoryTransport()
+
+
+@pytest.fixture
+def session(transport):
+    return Client("http://server:1234/api/", network_manager=transport)
+
+
+def names(collection: SyncedCollection) -> List[str]:
+    return sorted(pet.name for pet in collection)
+
+
+async def test_conditional_sync(session, transport):
+    pets = Pets("cat", "dog", "fish")
+
+    def handler(request):
+        etag = f'"{pets.version}"'
+        if request.headers.get(b"If-None-Match") == etag.encode():
+            return MemoryResponse(status=304)
+        return MemoryResponse(pets.alive(), headers={"ETag": etag})
+
+    transport.add("GET", "pet", handler)
+    collection = SyncedCollection(session.endpoint(List[Pet], ["pet"]))
+    recorder = Recorder(collection)
+
+    await collection.sync()
+    assert names(collection) == ["cat", "dog", "fish"]
+    assert recorder.names("added") == [["cat", "dog", "fish"]]
+
+    await collection.sync()
+    assert transport.requests[-1].headers[b"If-None-Match"] == b'"3"'
+    assert recorder.names("added") == [["cat", "dog", "fish"]]
+    assert recorder.changed == [] and recorder.removed == []
+
+    pets.rename(2, "puppy")
+    pets.delete(3)
+    pets.add("parrot")
+    await collection.sync()
+    assert names(collection) == ["cat", "parrot", "puppy"]
+    assert recorder.names("changed") == [["puppy"]]
+    assert recorder.names("removed") == [["fish"]]
+    assert recorder.names("added") == [["cat", "dog", "fish"], ["parrot"]]
+    assert collection[2].name == "puppy" and 3 not in collection
+
+
+async def test_updated_since_sync(session, transport):
+    pets = Pets("cat", "dog", "fish")
+    since_values: List[Optional[str]] = []
+
+    def handler(request):
+        since = request.query.get("updated_since")
+        since_values.append(since)
+        return MemoryResponse(
+            [
+                pet
+                for pet in pets.pets.values()
+                if since is None or pet["updated_at"] > int(since)
+            ]
+        )
+
+    transport.add("GET", "pet", handler)
+    collection = SyncedCollection(
+        session.endpoint(List[Pet], ["pet"]), UpdatedSinceSync()
+    )
+    recorder = Recorder(collection)
+
+    await collection.sync()
+    pets.rename(1, "kitten")
+    pets.delete(2)
+    await collection.sync()
+    await collection.sync()
+
+    assert since_values == [None, "3", "5"]
+    assert names(collection) == ["fish", "kitten"]
+    assert recorder.names("added") == [["cat", "dog", "fish"]]
+    assert recorder.names("changed") == [["kitten"]]
+    assert recorder.names("removed") == [["dog"]]
+
+
+async def test_page_etag_sync(session, transport):
+    pets = Pets("a", "b", "c", "d", "e")
+    statuses: List[int] = []
+
+    def handler(request):
+        offset, limit = int(request.query["offset"]), int(request.query["limit"])
+        page = pets.alive()[offset:][:limit]
+        etag = '"{}"'.format(
+            ",".join(f'{pet["id"]}.{pet["updated_at"]}' for pet in page)
+        )
+        if request.headers.get(b"If-None-Match") == etag.encode():
+            statuses.append(304)
+            return MemoryResponse(status=304)
+        statuses.append(200)
+        return MemoryResponse(page, headers={"ETag": etag})
+
+    transport.add("GET", "pet", handler)
+    collection = SyncedCollection(
+        session.endpoint(List[Pet], ["pet"]), PageETagSync(OffsetPagination(limit=2))
+    )
+    recorder = Recorder(collection)
+
+    await collection.sync()
+    assert names(collection) == ["a", "b", "c", "d", "e"]
+    assert len(transport.requests) == 3
+
+    pets.rename(4, "D")
+    await collection.sync()
+    assert names(collection) == ["D", "a", "b", "c", "e"]
+    assert recorder.names("changed") == [["D"]]
+    assert statuses[3:] == [304, 200, 304]
+
+    pets.delete(1)
+    await collection.sync()
+    assert names(collection) == ["D", "b", "c", "e"]
+    assert recorder.names("removed") == [["a"]]
+    assert recorder.names("added") == [["a", "b", "c", "d", "e"]]
+
+
+async def test_failed_sync_changes_nothing(session, transport):
+    transport.add("GET", "pet", MemoryResponse([{"id": 1, "name": "cat"}]))
+    collection = SyncedCollection(session.endpoint(List[Pet], ["pet"]))
+    await collection.sync()
+
+    transport.add("GET", "pet", MemoryResponse(status=503))
+    with pytest.raises(ReplyGotError):
+        await collection.sync()
+
+    assert names(collection) == ["cat"]
+
+
+async def test_dict_items(session, transport):
+    transport.add("GET", "pet", MemoryResponse([{"name": "cat"}, {"name": "dog"}]))
+    collection = SyncedCollection(
+        session.endpoint(List[dict], ["pet"]), ConditionalSync(), key="name"
+    )
+
+    await collection.sync()
+
+    assert collection["dog"] == {"name": "dog"}
+
+
+async def test_open_circuit_fails_the_sync(session, transport):
+    session.circuit_breaker = CircuitBreaker(failure_threshold=1)
+    transport.add("GET", "pet", MemoryResponse(status=503))
+    collection = SyncedCollection(session.endpoint(List[Pet], ["pet"]))
+
+    with pytest.raises(ReplyGotError):
+        await collection.sync()
+    with pytest.raises(CircuitOpenError):
+        await collection.sync()
+
+
+async def test_updated_since_keeps_repeated_args(session, transport):
+    transport.add(
+        "GET", "pet", MemoryResponse([{"id": 1, "name": "a", "updated_at": 1}])
+    )
+    collection = SyncedCollection(
+        session.endpoint(List[Pet], ["pet"], {"status": ["available", "sold"]}),
+        UpdatedSinceSync(),
+    )
+
+    await collection.sync()
+    await collection.sync()
+
+    assert transport.requests[1].url.endswith(
+        "?status=available&status=sold&updated_since=1"
+    )
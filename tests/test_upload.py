@@ -0,0 +1,171 @@
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from typing import List
+
+import pytest
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+
+import pyqt_rest_client as client
+from pyqt_rest_client.request import Request, create_authentication_header
+from pyqt_rest_client.upload import UPLOAD_CHUNK_SIZE, UploadBody, is_upload_source
+
+DATA = bytes(range(256)) * 4000  # Several chunks
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    # Replies 503 to the first fail_first requests, then the body sha256
+    fail_first = 0
+    bodies: List[bytes] = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.bodies.append(body)
+        if len(self.bodies) <= self.fail_first:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        reply = json.dumps(
+            {
+                "size": len(body),
+                "sha256": hashlib.sha256(body).hexdigest(),
+                "authentication": self.headers["Authentication"],
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    do_PUT = do_POST
+
+
+@pytest.fixture
+def echo_server_url(login_mock, local_server):
+    _EchoHandler.fail_first = 0
+    _EchoHandler.bodies = []
+    return local_server(_EchoHandler) + "upload"
+
+
+def expected_echo(data: bytes) -> dict:
+    return {
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "authentication": create_authentication_header(
+            client.login_data.username, client.login_data.secret, data
+        ).decode("utf-8"),
+    }
+
+
+def test_authentication_header_is_not_changed():
+    secret = b"secret"
+    assert create_authentication_header("user", secret, b"body") == (
+        b"user:" + hashlib.sha256(secret + b"body").hexdigest().encode("utf-8")
+    )
+
+
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        (b"", False),
+        ([], False),
+        ({}, False),
+        ("text", False),
+        (iter([b""]), True),
+        ((chunk for chunk in [b""]), True),
+        (QBuffer(), True),
+    ],
+)
+def test_is_upload_source(tmp_path, body, expected):
+    assert is_upload_source(body) is expected
+    assert is_upload_source(tmp_path)
+
+
+async def test_upload_file(qtbot, echo_server_url, tmp_path):
+    path = tmp_path / "upload.bin"
+    path.write_bytes(DATA)
+
+    assert await Request(echo_server_url, dict).post(path, "") == expected_echo(DATA)
+
+
+async def test_upload_chunks(qtbot, echo_server_url):
+    chunks = (chunk for chunk in (DATA[:1000], DATA[1000:]))
+
+    assert await Request(echo_server_url, dict).put(chunks, "") == expected_echo(DATA)
+
+
+async def test_upload_device_from_its_position(qtbot, echo_server_url):
+    buffer = QBuffer()
+    buffer.setData(QByteArray(b"skipped" + DATA))
+    buffer.open(QIODevice.ReadOnly)
+    buffer.seek(len(b"skipped"))
+
+    assert await Request(echo_server_url, dict).post(buffer, "") == expected_echo(DATA)
+    assert buffer.isOpen()
+
+
+async def test_upload_is_resent_on_retry(qtbot, echo_server_url, mocker):
+    mocker.patch.object(client, "retry_policy", client.RetryPolicy(base_delay=0))
+    _EchoHandler.fail_first = 1
+
+    echo = await Request(echo_server_url, dict).put(iter([DATA]), "")
+
+    assert echo == expected_echo(DATA)
+    assert _EchoHandler.bodies == [DATA, DATA]
+
+
+def test_upload_body_source_is_read_once():
+    chunks_read = []
+
+    def chunks():
+        for chunk in (b"a", b"b"):
+            chunks_read.append(chunk)
+            yield chunk
+
+    body = UploadBody(chunks())
+
+    for secret in (b"1", b"2"):
+        digest = hashlib.sha256(secret)
+        body.update(digest)
+        assert digest.hexdigest() == hashlib.sha256(secret + b"ab").hexdigest()
+    assert chunks_read == [b"a", b"b"]
+    assert body.size == 2
+    assert body.head == b"ab"
+    assert bytes(body.device().readAll()) == b"ab"
+
+
+def test_buffered_upload_body_is_replayed_by_chunks():
+    body = UploadBody(iter([DATA]))
+    body.update(hashlib.sha256())
+
+    assert [len(chunk) for chunk in body.chunks()] == [
+        UPLOAD_CHUNK_SIZE,
+        UPLOAD_CHUNK_SIZE,
+        UPLOAD_CHUNK_SIZE,
+        len(DATA) - 3 * UPLOAD_CHUNK_SIZE,
+    ]
+
+
+def test_upload_wrong_chunk():
+    with pytest.raises(ValueError):
+        UploadBody(iter(["text"])).update(hashlib.sha256())
+
+
+async def test_big_json_body_is_serialized_in_pool(qtbot, echo_server_url, mocker):
+    executor = ThreadPoolExecutor(1)
+    mocker.patch.object(
+        client, "deserialization_pool", client.DeserializationPool(executor)
+    )
+    submit = mocker.spy(executor, "submit")
+    body = {"items": list(range(2000))}
+    data = json.dumps(body).encode("utf-8")
+
+    assert await Request(echo_server_url, dict).post(body, "") == expected_echo(data)
+    assert submit.call_count == 1
+
+    assert await Request(echo_server_url, dict).post([1], "") == expected_echo(b"[1]")
+    assert submit.call_count == 1
+    executor.shutdown()
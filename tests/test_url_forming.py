@@ -4,21 +4,90 @@ from pyqt_rest_client import url
 
 
 @pytest.mark.parametrize(
-    "expected, url_parts, args",
+    "expected, url_parts, args, base_url",
     [
         (
             "http://server:1234/api/v1.8/projects/ex/?created=once&updated=now",
             ["projects", "ex"],
             {"created": "once", "updated": "now"},
+            None,
         ),
-        ("http://server:1234/api/v1.8/datasets/", ["datasets"], None),
+        ("http://server:1234/api/v1.8/datasets/", ["datasets"], None, None),
+        ("dbs/", ["dbs"], None, ""),  # Before login()
+        ("api/dbs/?a=1", ["dbs"], {"a": 1}, "api/"),
     ],
 )
-def test_url__good_case(login_mock, expected, url_parts, args):
-    assert url.url(url_parts, args) == expected
+def test_url__good_case(login_mock, expected, url_parts, args, base_url):
+    assert url.url(url_parts, args, base_url) == expected
 
 
 @pytest.mark.parametrize("bad_val", [[], ["", ""], ["part", ""]])
 def test_url_value_error(bad_val):
     with pytest.raises(ValueError):
         url.url(bad_val)
+
+
+@pytest.mark.parametrize(
+    "expected, args",
+    [
+        ("pets/?limit=0&offset=10", {"limit": 0, "offset": 10}),
+        ("pets/?name=Rex+%26+Co", {"name": "Rex & Co"}),
+        ("pets/?tag=a&tag=b", {"tag": ["a", "b"]}),
+        ("pets/?flag=False", {"flag": False, "skipped": None}),
+        ("pets/", {"skipped": None}),
+    ],
+)
+def test_url_args_are_encoded(login_mock, expected, args):
+    assert url.url(["pets"], args) == "http://server:1234/api/v1.8/" + expected
+
+
+def test_url_path_is_encoded(login_mock):
+    assert url.url(["pets", "Rex & Co"]) == (
+        "http://server:1234/api/v1.8/pets/Rex%20%26%20Co/"
+    )
+
+
+@pytest.mark.parametrize(
+    "template, params, expected",
+    [
+        ("pet/{id}", {"id": 0}, "pet/0/"),
+        ("/pet/{id}/", {"id": "a/b c"}, "pet/a%2Fb%20c/"),
+        ("pet/findByStatus", {"status": "sold"}, "pet/findByStatus/?status=sold"),
+        ("store/{a}-{b}", {"a": 1, "b": 2, "q": None}, "store/1-2/"),
+        ("{kind}/{id}", {"kind": "pet", "id": 5, "limit": 1}, "pet/5/?limit=1"),
+        ("a/{id}/b/{id}", {"id": 1, "x": 2}, "a/1/b/1/?x=2"),
+        ("pet/{id}", {"id": -1, "tag": ["a b", "c"]}, "pet/-1/?tag=a+b&tag=c"),
+    ],
+)
+def test_url_template(template, params, expected):
+    base_url = "http://server:1234/api/v1.8/"
+    assert url.UrlTemplate(template).url(base_url, params) == base_url + expected
+
+
+@pytest.mark.parametrize("template", ["", "/", "pet/{}", "pet/{0}", "pet/{a.b}"])
+def test_url_template_value_error(template):
+    with pytest.raises(ValueError):
+        url.UrlTemplate(template)
+
+
+@pytest.mark.parametrize("params", [{}, {"id": None}, {"other": 1}])
+def test_url_template_missing_param(params):
+    with pytest.raises(ValueError):
+        url.UrlTemplate("pet/{id}").url("http://server/", params)
+
+
+def test_url_template_prefix_is_cached_per_base_url():
+    template = url.UrlTemplate("pet/{id}")
+
+    assert template.prefix("http://a/api/") == ("http://a/api/pet/", "/api/pet/{id}/")
+    assert template.prefix("http://b/") == ("http://b/pet/", "/pet/{id}/")
+    assert template.prefix("http://a/api/") is template.prefix("http://a/api/")
+
+
+def test_url_and_path_template():
+    template = url.UrlTemplate("pet/{id}")
+
+    assert template.url_and_path_template("http://a/api/", {"id": 1, "x": "y"}) == (
+        "http://a/api/pet/1/?x=y",
+        "/api/pet/{id}/",
+    )
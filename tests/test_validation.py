@@ -0,0 +1,103 @@
+import asyncio
+import json
+from typing import Dict, List
+
+import pytest
+from pydantic import BaseModel, ValidationError, parse_obj_as
+
+import pyqt_rest_client as client
+from pyqt_rest_client import endpoint
+from pyqt_rest_client.cache import ResponseCache
+from pyqt_rest_client.validation import validator
+
+
+class _Tag(BaseModel):
+    name: str
+
+
+class _Pet(BaseModel):
+    id: int
+    tags: List[_Tag] = []
+
+
+def test_validator_is_cached():
+    assert validator(List[_Pet]) is validator(List[_Pet])
+    assert validator(List[_Pet]) is not validator(_Pet)
+
+
+@pytest.mark.parametrize(
+    "res_type, data",
+    [
+        (_Pet, b'{"id": "1", "tags": [{"name": "good"}]}'),
+        (List[_Pet], b'[{"id": 1}, {"id": 2}]'),
+        (list, b"[1, 2]"),
+        (List[int], b'[1, "2"]'),
+        (dict, b'{"q": 2}'),
+        (Dict[str, int], b'{"q": "2"}'),
+    ],
+)
+def test_validate_json_is_the_same_as_parse_obj_as(res_type, data):
+    assert validator(res_type).validate_json(data) == parse_obj_as(
+        res_type, json.loads(data)
+    )
+
+
+@pytest.mark.parametrize(
+    "res_type, data", [(_Pet, b'{"id": "not int"}'), (List[int], b'["a"]')]
+)
+def test_validation_error(res_type, data):
+    with pytest.raises(ValidationError):
+        validator(res_type).validate_json(data)
+
+
+def test_construct_does_not_validate():
+    pets = validator(List[_Pet]).construct([{"id": "not int", "tags": [{}]}])
+
+    assert type(pets[0]) is _Pet
+    assert pets[0].id == "not int"
+    assert pets[0].tags == [{}]  # Nested models are not constructed
+
+
+def test_construct_validates_not_model_types():
+    with pytest.raises(ValidationError):
+        validator(List[int]).construct(["a"])
+
+
+async def test_trusted_endpoint(login_mock, qtbot, qt_requests_mock):
+    pets_endpoint = endpoint(List[_Pet], ["pets"], trusted=True)
+    qt_requests_mock.get(pets_endpoint.url, text='[{"id": "1"}]')
+
+    pets = await pets_endpoint.get("")
+
+    assert pets[0].id == "1"  # Not casted to int, because it is not validated
+
+
+async def test_trusted_get_is_not_coalesced_with_validated_one(
+    login_mock, qtbot, qt_requests_mock
+):
+    qt_requests_mock.get(endpoint(list, ["pets"]).url, text='[{"id": "not-an-int"}]')
+
+    trusted = asyncio.ensure_future(
+        endpoint(List[_Pet], ["pets"], trusted=True).get("")
+    )
+    with pytest.raises(ValidationError):
+        await endpoint(List[_Pet], ["pets"]).get("")
+    assert (await trusted)[0].id == "not-an-int"
+
+
+async def test_trusted_resource_is_not_cached_for_validated_get(
+    login_mock, qtbot, qt_requests_mock, monkeypatch
+):
+    monkeypatch.setattr(client, "response_cache", ResponseCache())
+    qt_requests_mock.get(
+        endpoint(list, ["pets"]).url,
+        text='[{"id": "not-an-int"}]',
+        headers={"Cache-Control": "max-age=60"},
+    )
+
+    assert (await endpoint(List[_Pet], ["pets"], trusted=True).get(""))[0].id == (
+        "not-an-int"
+    )
+    with pytest.raises(ValidationError):
+        await endpoint(List[_Pet], ["pets"]).get("")
+    assert client.response_cache.hits == 1